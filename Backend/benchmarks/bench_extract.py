@@ -0,0 +1,102 @@
+"""Compare the old three-list extraction with the per-article record extractor.
+
+Pages are synthetic (``--articles`` blocks, a share of them missing their
+summary or link) or saved fixtures passed with ``--page``. For each approach
+the best parse-and-build time and the number of articles whose fields end up
+attached to the wrong headline are reported.
+
+    python -m Backend.benchmarks.bench_extract --articles 2000 --missing 0.1
+"""
+import argparse
+import random
+import time
+from Backend.parsers import get_parser
+from Backend.scraper import Article, Source, iter_articles
+
+
+def make_page(articles, missing, seed=0):
+    """Return the page and the Article each block should produce."""
+    rng = random.Random(seed)
+    parts = ["<html><body><main>"]
+    expected = []
+    for i in range(articles):
+        summary = "" if rng.random() < missing else f"Summary {i}"
+        link = "" if rng.random() < missing else f"https://example.com/article-{i}/"
+        parts.append(f"<article><h2>Headline {i}</h2>")
+        if summary:
+            parts.append(f"<p>{summary}</p>")
+        if link:
+            parts.append(f"<a href='{link}'>Read</a>")
+        parts.append("</article>")
+        expected.append(Article(f"Headline {i}", summary, link))
+    parts.append("</main></body></html>")
+    return "".join(parts).encode(), expected
+
+
+def three_lists(html, source, parser):
+    """The extraction scrape() used to do: parallel lists padded at the end."""
+    headlines_text = []
+    summaries_text = []
+    links_text = []
+    for headline, summary, link in get_parser(parser)(html, source):
+        if headline is not None:
+            headlines_text.append(headline)
+        if summary is not None:
+            summaries_text.append(summary)
+        if link:
+            links_text.append(link)
+    summaries_text += [""] * (len(headlines_text) - len(summaries_text))
+    links_text += [""] * (len(headlines_text) - len(links_text))
+    return [{"headline": headline, "summary": summary, "link": link}
+            for headline, summary, link in zip(headlines_text, summaries_text, links_text)]
+
+
+def records(html, source, parser):
+    return list(iter_articles(html, source, parser))
+
+
+def misaligned(articles, expected):
+    found = [Article(article["headline"], article["summary"], article["link"]) if isinstance(article, dict)
+             else article for article in articles]
+    return sum(1 for got, want in zip(found, expected) if got != want) + abs(len(found) - len(expected))
+
+
+def best_time(func, html, source, parser, repeat):
+    best = float("inf")
+    articles = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        articles = func(html, source, parser)
+        best = min(best, time.perf_counter() - start)
+    return best, articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", action="append", help="saved HTML page (repeatable); alignment is not checked")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--missing", type=float, default=0.1, help="chance a summary or link is missing")
+    parser.add_argument("--parser", default="auto")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = Source(name="bench", url="unused")
+    if args.page:
+        pages = []
+        for path in args.page:
+            with open(path, "rb") as page_file:
+                pages.append((path, page_file.read(), None))
+    else:
+        html, expected = make_page(args.articles, args.missing)
+        pages = [(f"synthetic ({args.articles} articles, {args.missing:.0%} missing)", html, expected)]
+
+    for name, html, expected in pages:
+        print(f"{name}, parser {args.parser}, best of {args.repeat}")
+        for label, func in (("three lists", three_lists), ("records", records)):
+            elapsed, articles = best_time(func, html, source, args.parser, args.repeat)
+            wrong = "" if expected is None else f"  {misaligned(articles, expected):6} misaligned"
+            print(f"  {label:12} {elapsed * 1000:10.2f} ms  {len(articles) / elapsed:12.0f} articles/s{wrong}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Time the favorites and headline queries before and after migration 6's indexes.
+
+Builds ``--news`` articles and ``--favorites`` favorites spread over
+``--users`` users in temporary tables on DATABASE_URL (they shadow the
+application tables for this session only; nothing is written to them). Each
+query shape is timed first with only the primary keys, then again after
+running migration 6's statements against the temporary tables.
+
+    python -m Backend.benchmarks.bench_favorites --favorites 1000000 --calls 200
+"""
+import argparse
+import random
+import time
+import psycopg2
+from Backend.config import Config
+from Backend.migrations import MIGRATIONS
+
+FAVORITES_SQL = '''SELECT favArt.id, news.headline, news.summary, news.link
+                   FROM favArt
+                   JOIN news ON favArt.news_id = news.id
+                   WHERE favArt.username = %s'''
+EXISTS_SQL = "SELECT * FROM favArt WHERE username = %s AND news_id = %s"
+INSERT_SQL = "INSERT INTO favArt (username, news_id) VALUES (%s, %s)"
+UPSERT_SQL = '''INSERT INTO favArt (username, news_id) VALUES (%s, %s)
+                ON CONFLICT (username, news_id) DO NOTHING
+                RETURNING id'''
+EDIT_SQL = "UPDATE news SET headline = %s WHERE headline = %s"
+
+
+def build_tables(cursor, news, favorites, users):
+    cursor.execute('''CREATE TEMP TABLE news (
+                        id SERIAL PRIMARY KEY,
+                        headline TEXT NOT NULL,
+                        summary TEXT NOT NULL,
+                        link TEXT NOT NULL)''')
+    cursor.execute('''INSERT INTO news (headline, summary, link)
+                      SELECT 'Headline ' || g, 'Summary ' || g, 'https://example.com/' || g
+                      FROM generate_series(1, %s) AS g''', (news,))
+    cursor.execute('''CREATE TEMP TABLE favArt (
+                        id SERIAL PRIMARY KEY,
+                        username TEXT NOT NULL,
+                        news_id INTEGER NOT NULL REFERENCES news(id) ON DELETE CASCADE)''')
+    # User g % users gets consecutive articles starting at a per-user offset, so no pair repeats
+    cursor.execute('''INSERT INTO favArt (username, news_id)
+                      SELECT 'user' || (g %% %(users)s), 1 + (g / %(users)s + (g %% %(users)s) * 37) %% %(news)s
+                      FROM generate_series(0, %(favorites)s - 1) AS g''',
+                   {"users": users, "news": news, "favorites": favorites})
+    cursor.execute("ANALYZE news")
+    cursor.execute("ANALYZE favArt")
+
+
+def add_two_round_trips(cursor, username, news_id):
+    cursor.execute(EXISTS_SQL, (username, news_id))
+    if cursor.fetchone() is None:
+        cursor.execute(INSERT_SQL, (username, news_id))
+
+
+def add_upsert(cursor, username, news_id):
+    cursor.execute(UPSERT_SQL, (username, news_id))
+    cursor.fetchone()
+
+
+def list_favorites(cursor, username, news_id):
+    cursor.execute(FAVORITES_SQL, (username,))
+    cursor.fetchall()
+
+
+def edit_headline(cursor, username, news_id):
+    headline = f"Headline {news_id}"
+    cursor.execute(EDIT_SQL, (headline, headline))
+
+
+def time_calls(cursor, func, calls, users, news, seed):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(calls):
+        args = (f"user{rng.randrange(users)}", 1 + rng.randrange(news))
+        cursor.execute("SAVEPOINT call")
+        start = time.perf_counter()
+        func(cursor, *args)
+        samples.append(time.perf_counter() - start)
+        # Keep the tables identical between phases
+        cursor.execute("ROLLBACK TO SAVEPOINT call")
+    samples.sort()
+    return sum(samples) / len(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--news", type=int, default=100000)
+    parser.add_argument("--favorites", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(Config.DATABASE_URL)
+    cursor = connection.cursor()
+
+    start = time.perf_counter()
+    build_tables(cursor, args.news, args.favorites, args.users)
+    print(f"built {args.news} news and {args.favorites} favorites ({args.users} users) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    shapes = [
+        ("GET /favorites/<username>", list_favorites, list_favorites),
+        ("POST /addFavorites", add_two_round_trips, add_upsert),
+        ("PUT /editHeadline", edit_headline, edit_headline),
+    ]
+    before = {label: time_calls(cursor, func, args.calls, args.users, args.news, seed=1)
+              for label, func, _ in shapes}
+
+    start = time.perf_counter()
+    migration = next(migration for migration in MIGRATIONS if migration.version == 6)
+    for statement in migration.statements:
+        cursor.execute(statement)
+    print(f"migration {migration.version} ({migration.name}) took {time.perf_counter() - start:.1f}s")
+
+    for label, _, func in shapes:
+        after = time_calls(cursor, func, args.calls, args.users, args.news, seed=1)
+        print(f"  {label:26} before {before[label][0] * 1000:9.3f} ms (p95 {before[label][1] * 1000:9.3f})"
+              f"   after {after[0] * 1000:9.3f} ms (p95 {after[1] * 1000:9.3f})")
+
+    connection.rollback()
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
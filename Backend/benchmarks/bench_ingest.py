@@ -0,0 +1,85 @@
+"""Compare the old per-row INSERT loop with the batched upsert in Backend.ingest.
+
+Runs against DATABASE_URL using a temporary ``news`` table that shadows the
+real one for this session only, so no application data is touched.
+
+    python -m Backend.benchmarks.bench_ingest --rows 500 --repeat 5
+"""
+import argparse
+import time
+import psycopg2
+from Backend.config import Config
+from Backend.ingest import ingest_articles
+from Backend.scraper import Article
+
+
+def make_articles(count):
+    return [Article(f"Headline {i}",
+                    f"Summary for article {i}",
+                    f"https://www.theatlantic.com/ideas/archive/2025/01/article-{i}/")
+            for i in range(count)]
+
+
+def reset_table(cursor):
+    cursor.execute("DROP TABLE IF EXISTS pg_temp.news")
+    cursor.execute('''CREATE TEMP TABLE news (
+                        id SERIAL PRIMARY KEY,
+                        headline TEXT NOT NULL,
+                        summary TEXT NOT NULL,
+                        link TEXT NOT NULL,
+                        link_key TEXT)''')
+    cursor.execute("CREATE UNIQUE INDEX ON pg_temp.news (link_key)")
+
+
+def per_row_loop(connection, articles):
+    cursor = connection.cursor()
+    for headline, summary, link in articles:
+        cursor.execute("INSERT INTO news (headline, summary, link) VALUES (%s, %s, %s)",
+                       (headline, summary, link))
+    return {"inserted": len(articles)}
+
+
+def timed(connection, func, articles, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        reset_table(connection.cursor())
+        connection.commit()
+        start = time.perf_counter()
+        result = func(connection, articles)
+        connection.commit()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(Config.DATABASE_URL)
+    articles = make_articles(args.rows)
+
+    loop_time, _ = timed(connection, per_row_loop, articles, args.repeat)
+    batch_time, batch_result = timed(connection, ingest_articles, articles, args.repeat)
+    # Guards against timing a near-empty upsert when the record shape drifts from ingest_articles
+    assert batch_result["inserted"] == args.rows, f"expected {args.rows} inserted rows, got {batch_result}"
+
+    # Scraping the same page again: the loop duplicates every row, the upsert skips them
+    start = time.perf_counter()
+    rescrape_result = ingest_articles(connection, articles)
+    connection.commit()
+    rescrape_time = time.perf_counter() - start
+
+    connection.close()
+
+    print(f"rows: {args.rows}, best of {args.repeat}")
+    print(f"per-row INSERT loop     {loop_time * 1000:10.2f} ms")
+    print(f"batched upsert          {batch_time * 1000:10.2f} ms  {batch_result}")
+    print(f"batched upsert, rescrape{rescrape_time * 1000:10.2f} ms  {rescrape_result}")
+    print(f"speedup                 {loop_time / batch_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
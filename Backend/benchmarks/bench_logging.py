@@ -0,0 +1,112 @@
+"""Measure the logging overhead each request pays, before and after the queue handler.
+
+A simulated request logs ``--debug`` DEBUG records (a pokemon record, like
+pokemon.py does) and one INFO record, from ``--threads`` threads at once.
+"before" is the old setup: basicConfig at DEBUG with f-strings, writing
+straight to the stream. The other setups use Backend.logs at the level and
+sample rate shown, with lazy %-style arguments. ``--write-delay`` makes every
+write sleep, standing in for a slow or blocked stdout pipe.
+
+    python -m Backend.benchmarks.bench_logging --requests 2000 --threads 8 --write-delay 0.0002
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Backend.logs import configure_logging, shutdown_logging
+
+logger = logging.getLogger("Backend.bench")
+
+RECORD = {"pokemonName": "pikachu", "pokemonType": "electric", "abilities": ["static", "lightning-rod"],
+          "stats": {"hp": 35, "attack": 55, "defense": 40}}
+
+
+class SlowStream:
+    """A write-only sink whose writes take ``delay`` seconds."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.sink = open(os.devnull, "w")
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.sink.write(text)
+
+    def flush(self):
+        self.sink.flush()
+
+
+def request_before(debug):
+    for _ in range(debug):
+        logger.debug(f"Pokemon {RECORD['pokemonName']} details fetched successfully: {RECORD}")
+    logger.info(f"Handled request for {RECORD['pokemonName']}")
+
+
+def request_after(debug):
+    for _ in range(debug):
+        logger.debug("Pokemon %s details fetched successfully: %s", RECORD["pokemonName"], RECORD)
+    logger.info("Handled request for %s", RECORD["pokemonName"])
+
+
+def setup_before(stream):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s", stream=stream)
+
+
+def run(request, debug, total, threads):
+    durations = []
+    lock = threading.Lock()
+
+    def call(_):
+        start = time.perf_counter()
+        request(debug)
+        elapsed = time.perf_counter() - start
+        with lock:
+            durations.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(total)))
+    durations.sort()
+    return sum(durations) / len(durations), durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--debug", type=int, default=5, help="DEBUG records per request")
+    parser.add_argument("--write-delay", type=float, default=0.0, help="seconds each stream write takes")
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    setups = [
+        ("before: DEBUG, f-strings, direct", request_before, lambda stream: setup_before(stream)),
+        ("after: INFO, json, queue", request_after,
+         lambda stream: configure_logging("INFO", "json", stream=stream)),
+        (f"after: DEBUG at {args.sample_rate:.0%}, json, queue", request_after,
+         lambda stream: configure_logging("DEBUG", "json", args.sample_rate, stream=stream)),
+        ("after: DEBUG, json, queue", request_after,
+         lambda stream: configure_logging("DEBUG", "json", stream=stream)),
+    ]
+
+    print(f"{args.requests} requests, {args.threads} threads, {args.debug} DEBUG + 1 INFO records each, "
+          f"write delay {args.write_delay * 1e6:.0f} us")
+    for label, request, setup in setups:
+        stream = SlowStream(args.write_delay)
+        setup(stream)
+        start = time.perf_counter()
+        mean, p99 = run(request, args.debug, args.requests, args.threads)
+        served = time.perf_counter() - start
+        shutdown_logging()
+        drained = time.perf_counter() - start
+        print(f"  {label:34} {mean * 1e6:10.1f} us/request   p99 {p99 * 1e6:10.1f} us"
+              f"   served in {served:6.2f} s   written in {drained:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
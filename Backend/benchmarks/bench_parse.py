@@ -0,0 +1,100 @@
+"""Compare parse time and peak memory of the scraper's HTML parser backends.
+
+Every backend runs in its own subprocess so peak RSS is not shared between
+them. Pages are either saved fixtures (``--page``) or a synthetic page with
+many articles buried in non-article markup.
+
+    python -m Backend.benchmarks.bench_parse --articles 2000 --repeat 5
+    python -m Backend.benchmarks.bench_parse --page saved/atlantic.html
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from Backend.parsers import PARSERS
+from Backend.scraper import Source, extract_articles
+
+NOISE = ("<div class='promo'><ul>" + "<li><a href='/promo'>Related story</a> <span>sponsored</span></li>" * 20
+         + "</ul><script>var tracking = {};</script></div>")
+
+
+def make_page(articles):
+    parts = ["<html><head><title>Most popular</title></head><body><nav>", NOISE, "</nav><main>"]
+    for i in range(articles):
+        parts.append(f"<article><h2>Headline {i} &amp; more</h2><p>Summary for article {i}</p>"
+                     f"<a href='https://example.com/article-{i}/'>Read</a></article>")
+        parts.append(NOISE)
+    parts.append("</main></body></html>")
+    return "".join(parts).encode()
+
+
+def run_backend(name, path, repeat):
+    """Parse the page with one backend; runs inside the child process."""
+    with open(path, "rb") as page_file:
+        page = page_file.read()
+    source = Source(name="bench", url="unused")
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        articles = extract_articles(page, source, name)
+        best = min(best, time.perf_counter() - start)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    extract_articles(page, source, name)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"articles": len(articles), "best": best,
+            "rss_kb": rss_after - rss_before, "traced_kb": traced_peak // 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page", action="append", help="saved HTML page (repeatable)")
+    parser.add_argument("--articles", type=int, default=2000, help="articles in the synthetic page")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(run_backend(args.backend, args.page[0], args.repeat)))
+        return
+
+    pages = args.page
+    if not pages:
+        synthetic = tempfile.NamedTemporaryFile(suffix=".html", delete=False)
+        synthetic.write(make_page(args.articles))
+        synthetic.close()
+        pages = [synthetic.name]
+
+    try:
+        for path in pages:
+            report(path, args.repeat)
+    finally:
+        if not args.page:
+            os.remove(pages[0])
+
+
+def report(path, repeat):
+    with open(path, "rb") as page_file:
+        size = len(page_file.read())
+    print(f"{path}: {size / 1024:.0f} KiB, best of {repeat}")
+    for name in PARSERS:
+        output = subprocess.run([sys.executable, "-m", "Backend.benchmarks.bench_parse", "--backend", name,
+                                 "--page", path, "--repeat", str(repeat)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        print(f"  {name:12} {result['best'] * 1000:10.2f} ms  {result['articles']:6} articles"
+              f"  peak RSS +{result['rss_kb'] / 1024:7.1f} MiB  traced peak {result['traced_kb'] / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare peak memory and latency of /getPokemon's old and streaming bodies.
+
+Fills an unlogged scratch table with ``--rows`` Pokemon spread over
+``--users`` users on DATABASE_URL (dropped again afterwards). The old body
+(``fetchall`` then one ``json.dumps``) and the streaming one (server-side
+cursor through Backend.streaming) each run in their own subprocess so peak
+RSS is not shared. The username filter is then timed without and with
+migration 8's (username, id) index.
+
+    python -m Backend.benchmarks.bench_pokemon --rows 100000
+    python -m Backend.benchmarks.bench_pokemon --rows 1000000 --users 5000
+"""
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import psycopg2
+from Backend.config import Config
+from Backend.streaming import json_array, stream_rows
+
+TABLE = "bench_pokemon"
+FIELDS = ("id", "username", "pokemonName", "image")
+
+
+def build_table(cursor, rows, users):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f'''CREATE UNLOGGED TABLE {TABLE} (
+                         id SERIAL PRIMARY KEY,
+                         username TEXT NOT NULL,
+                         pokemonName TEXT NOT NULL,
+                         image TEXT NOT NULL)''')
+    cursor.execute(f'''INSERT INTO {TABLE} (username, pokemonName, image)
+                       SELECT 'user' || (g %% %s), 'pokemon-' || g,
+                              'https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/' || g || '.png'
+                       FROM generate_series(1, %s) AS g''', (users, rows))
+    cursor.execute(f"ANALYZE {TABLE}")
+
+
+def old_body(connection):
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT * FROM {TABLE}")
+    rows = cursor.fetchall()
+    yield json.dumps([dict(zip(FIELDS, row)) for row in rows])
+
+
+def streamed_body(connection):
+    rows = stream_rows(connection, f"SELECT {', '.join(FIELDS)} FROM {TABLE} ORDER BY id")
+    return json_array(dict(zip(FIELDS, row)) for row in rows)
+
+
+def run_mode(mode):
+    """Produce the whole response body once; runs inside the child process."""
+    connection = psycopg2.connect(Config.DATABASE_URL)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    for chunk in (old_body if mode == "old" else streamed_body)(connection):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if not connection.closed:
+        connection.close()
+    return {"first_byte": first_byte, "total": total, "bytes": size, "rss_kb": rss_after - rss_before}
+
+
+def time_filter(cursor, calls, users):
+    rng = random.Random(1)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        cursor.execute(f"SELECT id, username, pokemonName, image FROM {TABLE} WHERE username = %s ORDER BY id",
+                       (f"user{rng.randrange(users)}",))
+        cursor.fetchall()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return sum(samples) / len(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--mode", choices=("old", "streamed"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode)))
+        return
+
+    connection = psycopg2.connect(Config.DATABASE_URL)
+    connection.autocommit = True
+    cursor = connection.cursor()
+    try:
+        start = time.perf_counter()
+        build_table(cursor, args.rows, args.users)
+        print(f"built {args.rows} Pokemon ({args.users} users) in {time.perf_counter() - start:.1f}s")
+
+        for mode in ("old", "streamed"):
+            output = subprocess.run([sys.executable, "-m", "Backend.benchmarks.bench_pokemon", "--mode", mode],
+                                    check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"  {mode:9} first byte {result['first_byte'] * 1000:9.1f} ms   total {result['total'] * 1000:9.1f} ms"
+                  f"   {result['bytes'] / 1e6:7.1f} MB   peak RSS +{result['rss_kb'] / 1024:7.1f} MiB")
+
+        without_index = time_filter(cursor, args.calls, args.users)
+        cursor.execute(f"CREATE INDEX ON {TABLE} (username, id)")
+        cursor.execute(f"ANALYZE {TABLE}")
+        with_index = time_filter(cursor, args.calls, args.users)
+        print(f"  ?username=  without index {without_index[0] * 1000:9.3f} ms (p95 {without_index[1] * 1000:9.3f})"
+              f"   with index {with_index[0] * 1000:9.3f} ms (p95 {with_index[1] * 1000:9.3f})")
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
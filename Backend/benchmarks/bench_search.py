@@ -0,0 +1,87 @@
+"""Compare the old trigram LIKE search with the ranked full-text search.
+
+Builds a synthetic corpus in temporary tables on DATABASE_URL (nothing is
+written to the application tables) with the same indexes the migrations
+create, then times both query shapes.
+
+    python -m Backend.benchmarks.bench_search --rows 1000000 --repeat 5
+"""
+import argparse
+import time
+import psycopg2
+from Backend.config import Config
+from Backend.search import SEARCH_SQL
+
+WORDS = ["economy", "election", "climate", "america", "science", "culture", "court",
+         "market", "health", "school", "border", "energy", "history", "family", "music"]
+
+LIKE_SQL = '''SELECT id, headline, summary, link FROM news_fts
+              WHERE headline LIKE %s OR summary LIKE %s'''
+
+
+def build_corpus(cursor, rows):
+    words = "ARRAY[" + ",".join(f"'{word}'" for word in WORDS) + "]"
+    cursor.execute('''CREATE TEMP TABLE news (
+                        id SERIAL PRIMARY KEY,
+                        headline TEXT NOT NULL,
+                        summary TEXT NOT NULL,
+                        link TEXT NOT NULL,
+                        headline_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', headline)) STORED,
+                        summary_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', summary)) STORED)''')
+    # Headlines of 6 and summaries of 20 random words plus a unique token
+    cursor.execute(f'''INSERT INTO news (headline, summary, link)
+                       SELECT (SELECT string_agg(({words})[1 + floor(random() * {len(WORDS)})::int], ' ')
+                               FROM generate_series(1, 6) WHERE g > 0) || ' story' || g,
+                              (SELECT string_agg(({words})[1 + floor(random() * {len(WORDS)})::int], ' ')
+                               FROM generate_series(1, 20) WHERE g > 0),
+                              'https://example.com/' || g
+                       FROM generate_series(1, %s) AS g''', (rows,))
+    cursor.execute("CREATE TEMP TABLE news_fts AS SELECT id, headline, summary, link FROM news")
+    cursor.execute("CREATE INDEX ON news_fts USING gin (headline gin_trgm_ops)")
+    cursor.execute("CREATE INDEX ON news_fts USING gin (summary gin_trgm_ops)")
+    cursor.execute("CREATE INDEX ON news USING gin (headline_tsv)")
+    cursor.execute("CREATE INDEX ON news USING gin (summary_tsv)")
+    cursor.execute("ANALYZE news")
+    cursor.execute("ANALYZE news_fts")
+
+
+def best_time(cursor, query, params, repeat):
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(query, params)
+        rows = len(cursor.fetchall())
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(Config.DATABASE_URL)
+    cursor = connection.cursor()
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    start = time.perf_counter()
+    build_corpus(cursor, args.rows)
+    print(f"built {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+    # A common word, a rare token and a two-word phrase
+    for term in ["economy", f"story{args.rows // 2}", "climate court"]:
+        like_time, like_rows = best_time(cursor, LIKE_SQL, (f"%{term}%", f"%{term}%"), args.repeat)
+        fts_params = {"headline_query": term, "summary_query": term, "limit": args.limit}
+        fts_time, fts_rows = best_time(cursor, SEARCH_SQL.format(cursor_filter=""), fts_params, args.repeat)
+        print(f"{term!r:>20}  trigram LIKE {like_time * 1000:10.2f} ms ({like_rows} rows, unranked)"
+              f"   full-text {fts_time * 1000:10.2f} ms (top {fts_rows}, ranked)")
+
+    connection.rollback()
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Load test the sync, threads and gevent serving modes against a slow upstream.
+
+Starts a stub reCAPTCHA endpoint that answers after ``--delay`` seconds, then
+for each mode launches gunicorn with Backend/gunicorn.conf.py pointed at it
+and fires ``--requests`` POST /verifyUser calls from ``--concurrency``
+clients. The app imports Backend.main, so DATABASE_URL must be reachable;
+pass ``--path`` to load test another endpoint (e.g. /news?limit=10).
+
+    python -m Backend.benchmarks.bench_serve --requests 2000 --concurrency 200
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+class SlowUpstream(BaseHTTPRequestHandler):
+    delay = 0.2
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.delay)
+        body = b'{"success": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 4096
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start in time")
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def load(base_url, path, total, concurrency):
+    local = threading.local()
+
+    def call(number):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            if path == "/verifyUser":
+                response = local.session.post(base_url + path, json={"token": f"bench-{number}"}, timeout=60)
+            else:
+                response = local.session.get(base_url + path, timeout=60)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, range(total)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+    return elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default="sync,threads,gevent")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.2, help="upstream response time in seconds")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--path", default="/verifyUser")
+    parser.add_argument("--app", default="Backend.main:app")
+    args = parser.parse_args()
+
+    SlowUpstream.delay = args.delay
+    upstream = UpstreamServer(("127.0.0.1", 0), SlowUpstream)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+
+    print(f"{args.requests} requests to {args.path}, {args.concurrency} clients, "
+          f"{args.workers} workers, upstream delay {args.delay * 1000:.0f} ms")
+    for mode in args.modes.split(","):
+        port = free_port()
+        env = dict(os.environ,
+                   SERVER_MODE=mode,
+                   BIND=f"127.0.0.1:{port}",
+                   WEB_CONCURRENCY=str(args.workers),
+                   WEB_TIMEOUT="120",
+                   RECAPTCHA_VERIFY_URL=f"http://127.0.0.1:{upstream.server_address[1]}/siteverify",
+                   # Every call must wait on the slow upstream, never on a cached answer
+                   RECAPTCHA_CACHE_TTL="0",
+                   RATELIMIT_ENABLED="false",
+                   SCHEDULER_ENABLED="false")
+        process = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", CONFIG, "--log-level", "warning", args.app],
+                                   env=env)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_up(base_url + "/", process)
+            elapsed, latencies, errors = load(base_url, args.path, args.requests, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"  {mode:8} {args.requests / elapsed:9.1f} req/s   p50 {percentile(latencies, 0.5) * 1000:8.1f} ms"
+              f"   p95 {percentile(latencies, 0.95) * 1000:8.1f} ms   p99 {percentile(latencies, 0.99) * 1000:8.1f} ms"
+              f"   errors {errors}")
+
+    upstream.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measure import-to-first-request latency of a fresh worker.
+
+Each run starts a new interpreter, imports Backend.main and serves one
+request to ``--path`` through the test client, timing both steps. "before"
+first runs every migration statement on three separate connections, which
+is what importing main, form and pokemon used to do on every worker boot;
+it needs DATABASE_URL. "after" is the current import, which does no DDL and
+works without a database for paths that do not query it (such as /).
+
+    python -m Backend.benchmarks.bench_startup --runs 10
+    python -m Backend.benchmarks.bench_startup --runs 10 --modes before,after --path "/news?limit=10"
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+if sys.argv[1] == "before":
+    import psycopg2
+    from Backend.config import Config
+    from Backend.migrations import MIGRATIONS
+    # main.setup_database(), form.create_add_fav() and pokemon.create_add_Pokemon()
+    statements = [statement for migration in MIGRATIONS for statement in migration.statements]
+    for chunk in (statements[:1] + statements[3:], statements[1:2], statements[2:3]):
+        connection = psycopg2.connect(Config.DATABASE_URL)
+        cursor = connection.cursor()
+        for statement in chunk:
+            cursor.execute(statement)
+        connection.commit()
+        connection.close()
+from Backend.main import app
+imported = time.perf_counter()
+response = app.test_client().get(sys.argv[2])
+served = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_request": served - imported, "status": response.status_code}))
+"""
+
+
+def run_once(mode, path):
+    output = subprocess.run([sys.executable, "-c", CHILD, mode, path], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default="after", help="comma separated: before, after")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/")
+    args = parser.parse_args()
+
+    print(f"{args.runs} cold starts per mode, first request GET {args.path}")
+    for mode in args.modes.split(","):
+        results = [run_once(mode, args.path) for _ in range(args.runs)]
+        imports = [result["import"] * 1000 for result in results]
+        firsts = [result["first_request"] * 1000 for result in results]
+        totals = [a + b for a, b in zip(imports, firsts)]
+        statuses = sorted({result["status"] for result in results})
+        print(f"  {mode:7} import {statistics.median(imports):8.1f} ms   first request {statistics.median(firsts):8.1f} ms"
+              f"   total {statistics.median(totals):8.1f} ms (median, max {max(totals):.1f})   status {statuses}")
+
+
+if __name__ == "__main__":
+    main()
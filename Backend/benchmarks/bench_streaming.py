@@ -0,0 +1,110 @@
+"""Compare peak memory and latency of buffered and streamed JSON responses.
+
+Fills an unlogged scratch table shaped like ``news`` with ``--rows`` articles
+on DATABASE_URL (dropped again afterwards), then builds the full response
+body once per mode, each in its own subprocess so peak RSS is not shared:
+
+    buffered        fetchall, a list of dicts and one json.dumps (the old views)
+    stream-json     server-side cursor, JSON array encoded with json
+    stream-orjson   server-side cursor, JSON array encoded with orjson
+    ndjson-orjson   server-side cursor, NDJSON encoded with orjson
+
+The orjson modes are skipped when orjson is not installed.
+
+    python -m Backend.benchmarks.bench_streaming --rows 100000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import psycopg2
+from Backend.config import Config
+from Backend.streaming import ENCODERS, json_array, ndjson_lines, stream_rows
+
+TABLE = "bench_streaming_news"
+FIELDS = ("id", "headline", "summary", "link")
+QUERY = f"SELECT id, headline, summary, link FROM {TABLE} ORDER BY id"
+MODES = ("buffered", "stream-json", "stream-orjson", "ndjson-orjson")
+
+
+def build_table(cursor, rows):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f'''CREATE UNLOGGED TABLE {TABLE} (
+                         id SERIAL PRIMARY KEY,
+                         headline TEXT NOT NULL,
+                         summary TEXT NOT NULL,
+                         link TEXT NOT NULL)''')
+    # Roughly the size of a scraped article: a headline, a two-sentence summary and a link
+    cursor.execute(f'''INSERT INTO {TABLE} (headline, summary, link)
+                       SELECT 'Headline number ' || g || ' about the economy',
+                              repeat('Summary sentence for article ' || g || '. ', 6),
+                              'https://example.com/news/2025/article-' || g || '/'
+                       FROM generate_series(1, %s) AS g''', (rows,))
+    cursor.execute(f"ANALYZE {TABLE}")
+
+
+def body(mode, connection):
+    if mode == "buffered":
+        cursor = connection.cursor()
+        cursor.execute(QUERY)
+        rows = cursor.fetchall()
+        return [json.dumps([dict(zip(FIELDS, row)) for row in rows]).encode()]
+    encoder = "json" if mode == "stream-json" else "orjson"
+    items = (dict(zip(FIELDS, row)) for row in stream_rows(connection, QUERY))
+    return (ndjson_lines if mode.startswith("ndjson") else json_array)(items, ENCODERS[encoder])
+
+
+def run_mode(mode):
+    """Produce the whole response body once; runs inside the child process."""
+    connection = psycopg2.connect(Config.DATABASE_URL)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    for chunk in body(mode, connection):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if not connection.closed:
+        connection.close()
+    return {"first_byte": first_byte, "total": total, "bytes": size, "rss_kb": rss_after - rss_before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode)))
+        return
+
+    connection = psycopg2.connect(Config.DATABASE_URL)
+    connection.autocommit = True
+    cursor = connection.cursor()
+    try:
+        start = time.perf_counter()
+        build_table(cursor, args.rows)
+        print(f"built {args.rows} articles in {time.perf_counter() - start:.1f}s")
+
+        for mode in MODES:
+            if "orjson" in mode and "orjson" not in ENCODERS:
+                print(f"  {mode:14} skipped, orjson is not installed")
+                continue
+            output = subprocess.run([sys.executable, "-m", "Backend.benchmarks.bench_streaming", "--mode", mode],
+                                    check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"  {mode:14} first byte {result['first_byte'] * 1000:9.1f} ms   total {result['total'] * 1000:9.1f} ms"
+                  f"   {result['bytes'] / 1e6:7.1f} MB   peak RSS +{result['rss_kb'] / 1024:7.1f} MiB")
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
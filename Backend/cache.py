@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import quote, urlencode
+from flask import current_app, make_response, request
+from Backend.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    __slots__ = ("body", "status", "mimetype", "etag", "last_modified", "expires", "tags")
+
+    def __init__(self, body, status, mimetype, etag, last_modified, expires, tags):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+        self.tags = tags
+
+    def to_json(self):
+        return json.dumps({
+            "body": self.body.decode("latin-1"), "status": self.status, "mimetype": self.mimetype,
+            "etag": self.etag, "last_modified": self.last_modified, "expires": self.expires, "tags": self.tags,
+        })
+
+    @classmethod
+    def from_json(cls, data):
+        data = json.loads(data)
+        data["body"] = data["body"].encode("latin-1")
+        return cls(**data)
+
+
+class MemoryBackend:
+    """Per-process LRU with TTL and a tag -> keys index for invalidation."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, tags):
+        with self._lock:
+            removed = 0
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Cache shared by every worker and replica, so invalidation is global."""
+
+    def __init__(self, url, prefix="newscraper:cache:"):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return CachedResponse.from_json(data) if data else None
+
+    def set(self, key, entry):
+        ttl = max(int(entry.expires - time.time()), 1)
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, entry.to_json(), ex=ttl)
+        for tag in entry.tags:
+            pipe.sadd(self.prefix + "tag:" + tag, key)
+            pipe.expire(self.prefix + "tag:" + tag, ttl)
+        pipe.execute()
+
+    def invalidate(self, tags):
+        removed = 0
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = self.client.smembers(tag_key)
+            if keys:
+                removed += self.client.delete(*[self.prefix + key.decode() for key in keys])
+            self.client.delete(tag_key)
+        return removed
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ResponseCache:
+
+    def __init__(self, backend, default_ttl=60, max_body_size=1024 * 1024):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.max_body_size = max_body_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key():
+        # Path plus the sorted query string, so ?a=1&b=2 and ?b=2&a=1 share an entry. Both are
+        # re-encoded so a decoded "&" or "=" inside a value cannot pass for another query.
+        return f"{quote(request.path)}?{urlencode(sorted(request.args.items(multi=True)))}"
+
+    def cached(self, tags, ttl=None):
+        """Cache 200 responses of a GET view and answer conditional requests with 304.
+
+        ``tags`` is a list of tag names, or a callable receiving the view
+        arguments and returning one, used by invalidate().
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not current_app.config.get("CACHE_ENABLED", True) or request.method != "GET":
+                    return view(*args, **kwargs)
+
+                key = self.make_key()
+                try:
+                    entry = self.backend.get(key)
+                except Exception as e:
+                    logger.warning("Response cache read failed: %s", e)
+                    return view(*args, **kwargs)
+
+                if entry is None:
+                    self.misses += 1
+                    response = make_response(view(*args, **kwargs))
+                    # Streamed bodies are never buffered; that would defeat streaming them
+                    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+                        return response
+                    body = response.get_data()
+                    entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+                    now = time.time()
+                    entry = CachedResponse(body, response.status_code, response.mimetype,
+                                           hashlib.sha1(body).hexdigest(), now,
+                                           now + (ttl or self.default_ttl), list(entry_tags))
+                    if len(body) <= self.max_body_size:
+                        try:
+                            self.backend.set(key, entry)
+                        except Exception as e:
+                            logger.warning("Response cache write failed: %s", e)
+                else:
+                    self.hits += 1
+                    response = current_app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype)
+
+                response.set_etag(entry.etag)
+                response.last_modified = entry.last_modified
+                # Let browsers keep the body but revalidate it with the ETag every time
+                response.cache_control.no_cache = True
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        try:
+            removed = self.backend.invalidate(tags)
+            logger.debug("Invalidated %s cached responses for tags %s", removed, tags)
+        except Exception as e:
+            logger.error("Response cache invalidation failed: %s", e)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+
+def _create_cache():
+    if Config.CACHE_REDIS_URL:
+        backend = RedisBackend(Config.CACHE_REDIS_URL)
+    else:
+        if Config.CACHE_ENABLED:
+            logger.warning("CACHE_ENABLED without CACHE_REDIS_URL: each worker caches on its own and "
+                           "other workers may serve stale responses for up to %ss after a write",
+                           Config.CACHE_TTL)
+        backend = MemoryBackend(max_entries=Config.CACHE_MAX_ENTRIES)
+    return ResponseCache(backend, default_ttl=Config.CACHE_TTL)
+
+
+# Shared by the app and the blueprints
+response_cache = _create_cache()
+cached = response_cache.cached
+invalidate = response_cache.invalidate
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,4 +7,100 @@ load_dotenv()
 class Config:
     DATABASE_URL = os.getenv("DATABASE_URL")
     GOOGLE_CLIENT_KEY = os.getenv("GOOGLE_CLIENT_KEY")
-    BACKEND_KEY = os.getenv("BACKEND_KEY")
\ No newline at end of file
+    BACKEND_KEY = os.getenv("BACKEND_KEY")
+
+    # Google Sign-In: certificates are cached for their Cache-Control max-age, verified tokens briefly
+    GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+    GOOGLE_CERTS_MAX_AGE = float(os.getenv("GOOGLE_CERTS_MAX_AGE", 300))
+    # Least time between early refreshes triggered by tokens with an unknown key id
+    GOOGLE_CERTS_MIN_REFRESH = float(os.getenv("GOOGLE_CERTS_MIN_REFRESH", 60))
+    ID_TOKEN_CACHE_TTL = float(os.getenv("ID_TOKEN_CACHE_TTL", 300))
+    ID_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("ID_TOKEN_CACHE_MAX_ENTRIES", 1024))
+
+    # reCAPTCHA siteverify: bounded timeouts, circuit breaker and a short result cache
+    RECAPTCHA_VERIFY_URL = os.getenv("RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify")
+    RECAPTCHA_CONNECT_TIMEOUT = float(os.getenv("RECAPTCHA_CONNECT_TIMEOUT", 3.05))
+    RECAPTCHA_READ_TIMEOUT = float(os.getenv("RECAPTCHA_READ_TIMEOUT", 5))
+    # Seconds a rejected token is remembered; successful verifications are never cached
+    RECAPTCHA_CACHE_TTL = float(os.getenv("RECAPTCHA_CACHE_TTL", 120))
+    RECAPTCHA_FAILURE_THRESHOLD = int(os.getenv("RECAPTCHA_FAILURE_THRESHOLD", 5))
+    RECAPTCHA_RESET_TIMEOUT = float(os.getenv("RECAPTCHA_RESET_TIMEOUT", 30))
+    # Flask-Limiter reads this from app.config; load tests turn it off
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # Logging: LOG_FORMAT is json or text; LOG_DEBUG_SAMPLE_RATE keeps that fraction of DEBUG records
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))
+
+    # /metrics sums every worker's metrics through snapshot files in METRICS_DIR; gunicorn
+    # creates a fresh directory when it is unset. Without one /metrics reports a single process.
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+
+    # gunicorn's master applies pending schema migrations before forking workers
+    MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "true").lower() in ("1", "true", "yes")
+
+    # Connection pool sizing is per gunicorn worker
+    DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", 1))
+    DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 5))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    DB_POOL_CHECK_AFTER = float(os.getenv("DB_POOL_CHECK_AFTER", 30))
+    DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))
+
+    # /poolStats, /queryStats and /recaptchaStats expose worker internals and query text; off by default
+    DIAGNOSTICS_ENABLED = os.getenv("DIAGNOSTICS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+    # Opt-in query profiling: slow-query log with EXPLAIN plans, Server-Timing header
+    QUERY_PROFILING = os.getenv("QUERY_PROFILING", "false").lower() in ("1", "true", "yes")
+    SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD", 0.2))
+    SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+    # Scraping engine
+    SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", 8))
+    SCRAPE_PER_HOST_LIMIT = int(os.getenv("SCRAPE_PER_HOST_LIMIT", 2))
+    SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", 10))
+    SCRAPE_RETRIES = int(os.getenv("SCRAPE_RETRIES", 2))
+    # auto, selectolax, lxml, html.parser or stream
+    SCRAPE_PARSER = os.getenv("SCRAPE_PARSER", "auto")
+    # ETag/Last-Modified and content hashes of the last stored fetch per source URL
+    SCRAPE_STATE_PATH = os.getenv("SCRAPE_STATE_PATH", os.path.join(tempfile.gettempdir(), "newscraper_scrape_state.db"))
+
+    # Periodic scraping; one worker across all processes and replicas holds the leader lock
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+    SCRAPE_INTERVAL = float(os.getenv("SCRAPE_INTERVAL", 900))
+    SCRAPE_JITTER = float(os.getenv("SCRAPE_JITTER", 0.1))
+    SCRAPE_MAX_BACKOFF = int(os.getenv("SCRAPE_MAX_BACKOFF", 8))
+    SCHEDULER_POLL_INTERVAL = float(os.getenv("SCHEDULER_POLL_INTERVAL", 30))
+
+    # Background jobs; the SQLite file is shared by all workers on a host
+    JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(tempfile.gettempdir(), "newscraper_jobs.db"))
+    JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", 1))
+    JOBS_STALE_AFTER = float(os.getenv("JOBS_STALE_AFTER", 600))
+
+    # /news total count: cached per worker, estimated from pg_class once the table is large
+    NEWS_COUNT_TTL = float(os.getenv("NEWS_COUNT_TTL", 60))
+    NEWS_COUNT_EXACT_BELOW = int(os.getenv("NEWS_COUNT_EXACT_BELOW", 100000))
+
+    # In-process search index for /search and /headlines (built per worker)
+    SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+    SEARCH_INDEX_REFRESH = float(os.getenv("SEARCH_INDEX_REFRESH", 30))
+    SEARCH_INDEX_REBUILD = float(os.getenv("SEARCH_INDEX_REBUILD", 3600))
+
+    # Encoder for streamed JSON responses: auto (orjson when installed), orjson or json
+    JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+
+    # Response cache for read endpoints. On by default only with CACHE_REDIS_URL: a per-worker
+    # memory cache is only invalidated in the worker that handled the write
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true" if CACHE_REDIS_URL else "false").lower() in ("1", "true", "yes")
+    CACHE_TTL = float(os.getenv("CACHE_TTL", 60))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+
+    # PokeAPI lookups: memory + SQLite cache, 404s cached for POKEAPI_NEGATIVE_TTL
+    POKEAPI_CACHE_PATH = os.getenv("POKEAPI_CACHE_PATH", os.path.join(tempfile.gettempdir(), "newscraper_pokeapi.db"))
+    POKEAPI_CACHE_TTL = float(os.getenv("POKEAPI_CACHE_TTL", 86400))
+    POKEAPI_NEGATIVE_TTL = float(os.getenv("POKEAPI_NEGATIVE_TTL", 3600))
+    POKEAPI_CONNECT_TIMEOUT = float(os.getenv("POKEAPI_CONNECT_TIMEOUT", 3.05))
+    POKEAPI_READ_TIMEOUT = float(os.getenv("POKEAPI_READ_TIMEOUT", 10))
@@ -0,0 +1,376 @@
+import os
+import threading
+import time
+import logging
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+from flask import g, has_app_context
+from Backend.config import Config
+from Backend.metrics import record_query, registry
+from Backend.profiler import profiler
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class TimedCursor(extensions.cursor):
+    """Cursor that reports the duration of every statement to Backend.metrics
+    and, when enabled, to the query profiler."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            seconds = time.perf_counter() - start
+            record_query(seconds)
+            profiler.observe(self, query, vars, seconds)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            seconds = time.perf_counter() - start
+            record_query(seconds)
+            profiler.observe(self, query, vars_list, seconds, many=True)
+
+
+class PooledConnection:
+    """Thin proxy around a psycopg2 connection.
+
+    Calling close() hands the connection back to the pool instead of closing
+    the socket, so the existing handlers keep their connect/close pattern.
+    Every checkout gets a new proxy, so closing a proxy again (as request
+    teardown does) can never release a later checkout of the same socket.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.putconn(self)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe and fork-aware pool of PostgreSQL connections.
+
+    Each gunicorn worker gets its own set of connections: when the process id
+    changes the inherited sockets are dropped (never closed, they belong to the
+    parent) and the pool starts over. Connections above ``minconn`` that sat
+    idle for ``idle_timeout`` seconds are closed on the next checkout or return.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=5, timeout=10.0, check_after=30.0, idle_timeout=300.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Invalid pool size: minconn=%s maxconn=%s" % (minconn, maxconn))
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_after = check_after
+        self.idle_timeout = idle_timeout
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []
+        self._in_use = 0
+        self._opening = 0
+        self._waiters = 0
+        self._closed = False
+        self._counters = {
+            "checkouts": 0,
+            "connections_opened": 0,
+            "connections_discarded": 0,
+            "connections_trimmed": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    def _check_fork(self):
+        if os.getpid() != self._pid:
+            logger.info("Process fork detected, reinitializing connection pool")
+            self._reset()
+
+    def _connect(self):
+        raw = psycopg2.connect(self.dsn, cursor_factory=TimedCursor)
+        with self._cond:
+            self._counters["connections_opened"] += 1
+        return raw
+
+    def _is_healthy(self, raw, last_used):
+        if raw.closed:
+            return False
+        # Only ping connections that sat idle long enough to have been dropped
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            raw.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def _discard(self, raw):
+        with self._cond:
+            self._counters["connections_discarded"] += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _take_expired(self):
+        """Remove connections idle past idle_timeout while above minconn; caller holds the lock."""
+        expired = []
+        cutoff = time.monotonic() - self.idle_timeout
+        # Checkouts take from the end, so the longest idle connections are at the front
+        while (self._idle and self._idle[0][1] <= cutoff
+               and len(self._idle) + self._in_use + self._opening > self.minconn):
+            expired.append(self._idle.pop(0)[0])
+        self._counters["connections_trimmed"] += len(expired)
+        return expired
+
+    def _close_expired(self, expired):
+        for raw in expired:
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    def warm(self):
+        """Open connections until minconn are available."""
+        self._check_fork()
+        while True:
+            with self._cond:
+                if len(self._idle) + self._in_use + self._opening >= self.minconn:
+                    return
+                self._opening += 1
+            try:
+                raw = self._connect()
+            finally:
+                with self._cond:
+                    self._opening -= 1
+            with self._cond:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self):
+        self._check_fork()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            if self._closed:
+                raise PoolError("Connection pool is closed")
+            expired = self._take_expired()
+            while True:
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use + self._opening < self.maxconn:
+                    raw = None
+                    self._opening += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout("Timed out after %.1fs waiting for a database connection" % self.timeout)
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            waited = time.monotonic() - start
+            self._counters["checkouts"] += 1
+            self._counters["wait_time_total"] += waited
+            self._counters["wait_time_max"] = max(self._counters["wait_time_max"], waited)
+
+        self._close_expired(expired)
+        if raw is None:
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._opening -= 1
+                self._in_use += 1
+        elif not self._is_healthy(raw, last_used):
+            self._discard(raw)
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+
+        return PooledConnection(self, raw)
+
+    def putconn(self, conn, discard=False):
+        # A connection checked out before a fork belongs to the parent process
+        if os.getpid() != self._pid or conn._pool is not self:
+            return
+
+        raw = conn._raw
+        if not discard and not raw.closed:
+            status = raw.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                # Handlers that return early never commit; don't leak their transaction
+                try:
+                    raw.rollback()
+                except psycopg2.Error:
+                    discard = True
+
+        keep = not (discard or raw.closed or self._closed)
+        if not keep:
+            self._discard(raw)
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+            expired = self._take_expired()
+        self._close_expired(expired)
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._counters["checkouts"]
+            return {
+                "pid": self._pid,
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiters": self._waiters,
+                "checkouts": checkouts,
+                "connections_opened": self._counters["connections_opened"],
+                "connections_discarded": self._counters["connections_discarded"],
+                "connections_trimmed": self._counters["connections_trimmed"],
+                "timeouts": self._counters["timeouts"],
+                "wait_time_total": round(self._counters["wait_time_total"], 6),
+                "wait_time_max": round(self._counters["wait_time_max"], 6),
+                "wait_time_avg": round(self._counters["wait_time_total"] / checkouts, 6) if checkouts else 0.0,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    Config.DATABASE_URL,
+                    minconn=Config.DB_POOL_MIN,
+                    maxconn=Config.DB_POOL_MAX,
+                    timeout=Config.DB_POOL_TIMEOUT,
+                    check_after=Config.DB_POOL_CHECK_AFTER,
+                    idle_timeout=Config.DB_POOL_IDLE_TIMEOUT,
+                )
+    return _pool
+
+
+def _reset_pool_after_fork():
+    global _pool_lock
+    _pool_lock = threading.Lock()
+    if _pool is not None:
+        _pool._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def _collect_pool_metrics():
+    if _pool is None:
+        return []
+    stats = _pool.stats()
+    return [
+        ("db_pool_connections", "gauge", "Connections of this worker's pool by state.",
+         [({"state": "in_use"}, stats["in_use"]), ({"state": "idle"}, stats["idle"])]),
+        ("db_pool_max_connections", "gauge", "Upper bound of the pool.", [({}, stats["max_size"])]),
+        ("db_pool_waiters", "gauge", "Requests waiting for a connection.", [({}, stats["waiters"])]),
+        ("db_pool_checkouts_total", "counter", "Connections handed out.", [({}, stats["checkouts"])]),
+        ("db_pool_timeouts_total", "counter", "Checkouts that timed out.", [({}, stats["timeouts"])]),
+        ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection.",
+         [({}, stats["wait_time_total"])]),
+    ]
+
+
+registry.register_collector(_collect_pool_metrics)
+
+
+def _gevent_wait_callback(connection, timeout=None):
+    from gevent.socket import wait_read, wait_write
+    while True:
+        state = connection.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state == extensions.POLL_READ:
+            wait_read(connection.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(connection.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError("Bad result from poll: %r" % state)
+
+
+def make_green():
+    """Let other greenlets run while psycopg2 waits on the server.
+
+    Called by the gevent serving mode (see gunicorn.conf.py); without it every
+    query would block the whole worker.
+    """
+    extensions.set_wait_callback(_gevent_wait_callback)
+
+
+def get_db_connection():
+    """Check out a pooled connection; close() returns it to the pool.
+
+    Inside a request the connection is also tracked so it gets returned
+    even if the handler raises before closing it.
+    """
+    connection = get_pool().getconn()
+    if has_app_context():
+        g.setdefault("_db_connections", []).append(connection)
+    return connection
+
+
+def release_request_connections(exception=None):
+    for connection in g.pop("_db_connections", []):
+        connection.close()
+
+
+def init_app(app):
+    app.teardown_appcontext(release_request_connections)
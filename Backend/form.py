@@ -1,49 +1,61 @@
 from flask import Blueprint, request, jsonify
-import psycopg2
-from Backend.config import Config
+from Backend.db import get_db_connection
+from Backend.cache import cached, invalidate
 
 form_bp = Blueprint('form', __name__)
 
-def get_db_connection():
-    connection = psycopg2.connect(Config.DATABASE_URL)
-    return connection
-
-# Function to create the favorite article table if it doesn't exist
-def create_add_fav():
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    # Create the favorite article table referencing news.id
-    cursor.execute('''CREATE TABLE IF NOT EXISTS favArt (
-                        id SERIAL PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        news_id INTEGER NOT NULL,
-                        FOREIGN KEY (news_id) REFERENCES news(id) ON DELETE CASCADE)''')
-    connection.commit()
-    connection.close()
-
-# Call the function to initialize the database
-create_add_fav()
+# Upper bounds for page sizes and for the number of items in one batch request
+MAX_PAGE_SIZE = 100
+MAX_BATCH_SIZE = 500
 
 # Handle GET request to retrieve favorite articles
 @form_bp.route('/favorites/<username>', methods=['GET'])
+@cached(tags=lambda username: ["news", f"favorites:{username}"])
 def get_favorites_by_user(username):
-    """Get all favorites for a specific user along with article details."""
+    """Get all favorites for a specific user along with article details.
+
+    With ``limit`` (and ``after=<next_cursor>``) favorites are returned a page
+    at a time in the order they were added, walking the (username, id) index.
+    """
+    paginate = 'limit' in request.args or 'after' in request.args
+    after = request.args.get('after', 0, type=int)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+
     connection = get_db_connection()
     cursor = connection.cursor()
     # Query to get all favorite articles by joining the favArt table with the news table
-    cursor.execute('''SELECT favArt.id, news.headline, news.summary, news.link
-                      FROM favArt
-                      JOIN news ON favArt.news_id = news.id
-                      WHERE favArt.username = %s''', (username,))
+    if paginate:
+        # Fetch one extra row to know whether there is a next page
+        cursor.execute('''SELECT favArt.id, news.headline, news.summary, news.link
+                          FROM favArt
+                          JOIN news ON favArt.news_id = news.id
+                          WHERE favArt.username = %s AND favArt.id > %s
+                          ORDER BY favArt.id
+                          LIMIT %s''', (username, after, limit + 1))
+    else:
+        cursor.execute('''SELECT favArt.id, news.headline, news.summary, news.link
+                          FROM favArt
+                          JOIN news ON favArt.news_id = news.id
+                          WHERE favArt.username = %s''', (username,))
     articles = cursor.fetchall()
+    connection.close()
+
+    if paginate:
+        has_more = len(articles) > limit
+        articles = articles[:limit]
+        favorites_list = [{'id': article[0], 'headline': article[1], 'summary': article[2], 'link': article[3]} for article in articles]
+        # An empty page is not an error; the user may simply have no more favorites
+        return jsonify({
+            'favorites': favorites_list,
+            'limit': limit,
+            'next_cursor': articles[-1][0] if has_more else None,
+        }), 200
 
     if articles:
         # Prepare the response with article details
         favorites_list = [{'id': article[0], 'headline': article[1], 'summary': article[2], 'link': article[3]} for article in articles]
-        connection.close()
         return jsonify({'favorites': favorites_list}), 200
     else:
-        connection.close()
         return jsonify({'error_message': 'No favorites found for this user'}), 404
 
 # Handle POST request to add favorite articles
@@ -58,19 +70,116 @@ def add_favorite():
 
     connection = get_db_connection()
     cursor = connection.cursor()
-    # Check if the favorite already exists
-    cursor.execute('SELECT * FROM favArt WHERE username = %s AND news_id = %s', (username, news_id))
-    if cursor.fetchone():
+    # Insert the new favorite; the unique (username, news_id) constraint turns a repeat into a no-op
+    cursor.execute('''INSERT INTO favArt (username, news_id) VALUES (%s, %s)
+                      ON CONFLICT (username, news_id) DO NOTHING
+                      RETURNING id''', (username, news_id))
+    if cursor.fetchone() is None:
         connection.close()
         return {'error_message': 'This article is already in your favorites'}, 400
 
-    # Insert the new favorite into the favArt table
-    cursor.execute('INSERT INTO favArt (username, news_id) VALUES (%s, %s)', (username, news_id))
     connection.commit()
     connection.close()
+    invalidate(f"favorites:{username}")
 
     return {'message': 'Favorite added successfully'}, 201
 
+# Adds every news_id the user has not saved yet in one statement. Ids are
+# checked against news first so a missing article cannot fail the whole batch.
+BATCH_ADD_SQL = '''WITH input AS (
+                       SELECT news_id, position FROM unnest(%(news_ids)s::int[]) WITH ORDINALITY AS t(news_id, position)),
+                   inserted AS (
+                       INSERT INTO favArt (username, news_id)
+                       SELECT %(username)s, input.news_id
+                       FROM input JOIN news ON news.id = input.news_id
+                       ORDER BY input.position
+                       ON CONFLICT (username, news_id) DO NOTHING
+                       RETURNING id, news_id)
+                   SELECT input.news_id, COALESCE(inserted.id, existing.id),
+                          CASE WHEN inserted.id IS NOT NULL THEN 'added'
+                               WHEN news.id IS NULL THEN 'not_found'
+                               ELSE 'exists' END
+                   FROM input
+                   LEFT JOIN inserted ON inserted.news_id = input.news_id
+                   LEFT JOIN news ON news.id = input.news_id
+                   LEFT JOIN favArt existing ON existing.username = %(username)s AND existing.news_id = input.news_id
+                   ORDER BY input.position'''
+
+# Removes the user's favorites by favorite id or by news_id in one statement
+BATCH_DELETE_SQL = '''WITH input AS (
+                          SELECT value, position FROM unnest(%(values)s::int[]) WITH ORDINALITY AS t(value, position)),
+                      deleted AS (
+                          DELETE FROM favArt USING input
+                          WHERE favArt.{column} = input.value AND favArt.username = %(username)s
+                          RETURNING favArt.{column})
+                      SELECT input.value, deleted.{column} IS NOT NULL
+                      FROM input LEFT JOIN deleted ON deleted.{column} = input.value
+                      ORDER BY input.position'''
+
+def parse_batch(data, key):
+    """Return the de-duplicated list of integers under ``key``, or an error message."""
+    values = data.get(key)
+    if not isinstance(values, list) or not values:
+        return None, f'{key} must be a non-empty list'
+    if len(values) > MAX_BATCH_SIZE:
+        return None, f'At most {MAX_BATCH_SIZE} {key} per request'
+    # Ids are Postgres integers; anything else would fail the cast and the whole batch
+    if not all(isinstance(value, int) and not isinstance(value, bool) and 0 < value < 2 ** 31 for value in values):
+        return None, f'{key} must contain positive integer ids only'
+    # Repeats would be applied once anyway; keep the first occurrence's position
+    return list(dict.fromkeys(values)), None
+
+# Handle POST request to add many favorite articles in one transaction
+@form_bp.route('/addFavorites/batch', methods=['POST'])
+def add_favorites_batch():
+    data = request.get_json(silent=True) or {}
+    username = data.get('username')
+    if not username:
+        return {'error_message': 'Username is required'}, 400
+    news_ids, error = parse_batch(data, 'news_ids')
+    if error:
+        return {'error_message': error}, 400
+
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute(BATCH_ADD_SQL, {'username': username, 'news_ids': news_ids})
+    results = [{'news_id': news_id, 'id': favorite_id, 'status': status}
+               for news_id, favorite_id, status in cursor.fetchall()]
+    connection.commit()
+    connection.close()
+
+    counts = {status: sum(1 for result in results if result['status'] == status)
+              for status in ('added', 'exists', 'not_found')}
+    if counts['added']:
+        invalidate(f"favorites:{username}")
+    return jsonify({'results': results, **counts}), 200
+
+# Handle POST request to remove many favorite articles in one transaction
+@form_bp.route('/deleteFavorites/batch', methods=['POST'])
+def delete_favorites_batch():
+    data = request.get_json(silent=True) or {}
+    username = data.get('username')
+    if not username:
+        return {'error_message': 'Username is required'}, 400
+    # Either favorite ids (as returned by /favorites/<username>) or news ids
+    key, column = ('ids', 'id') if 'ids' in data else ('news_ids', 'news_id')
+    values, error = parse_batch(data, key)
+    if error:
+        return {'error_message': error}, 400
+
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute(BATCH_DELETE_SQL.format(column=column), {'username': username, 'values': values})
+    results = [{column: value, 'status': 'removed' if removed else 'not_found'}
+               for value, removed in cursor.fetchall()]
+    connection.commit()
+    connection.close()
+
+    removed = sum(1 for result in results if result['status'] == 'removed')
+    if removed:
+        invalidate(f"favorites:{username}")
+    return jsonify({'results': results, 'removed': removed, 'not_found': len(results) - removed}), 200
+
 # Handle PUT request to edit the headline of an article
 @form_bp.route('/editHeadline', methods=['PUT'])
 def edit_headline():
@@ -93,6 +202,7 @@ def edit_headline():
 
     connection.commit()
     connection.close()
+    invalidate("news")
 
     return {'message': 'Headline updated successfully'}, 200
 
@@ -102,11 +212,13 @@ def delete_favorite(id):
     connection = get_db_connection()
     cursor = connection.cursor()
     # Delete the favorite from the favArt table
-    cursor.execute('DELETE FROM favArt WHERE id = %s', (id,))
+    cursor.execute('DELETE FROM favArt WHERE id = %s RETURNING username', (id,))
     if cursor.rowcount == 0:
         connection.close()
         return jsonify({'error_message': 'Favorite not found'}), 404
+    username = cursor.fetchone()[0]
 
     connection.commit()
     connection.close()
+    invalidate(f"favorites:{username}")
     return jsonify({'message': 'Favorite deleted successfully'}), 200
@@ -0,0 +1,59 @@
+# Gunicorn settings: gunicorn -c Backend/gunicorn.conf.py Backend.main:app
+#
+# SERVER_MODE picks how each worker handles concurrent requests:
+#   sync    one request at a time per worker (the original setup)
+#   threads a thread per in-flight request (WEB_THREADS per worker)
+#   gevent  cooperative greenlets (WEB_CONNECTIONS per worker); outbound HTTP
+#           and psycopg2 queries yield while waiting, so slow upstreams do not
+#           block each other. Needs the gevent package.
+#
+# Pending schema migrations are applied once by the master before any worker
+# starts (MIGRATE_ON_START=false to leave that to a separate deploy step).
+# /metrics sums all workers through snapshot files in METRICS_DIR (a fresh
+# temporary directory unless set). Every worker opens DB_POOL_MIN database
+# connections right after it is forked.
+import glob
+import os
+import tempfile
+
+mode = os.getenv("SERVER_MODE", "sync")
+if mode not in ("sync", "threads", "gevent"):
+    raise ValueError(f"Unknown SERVER_MODE '{mode}', expected sync, threads or gevent")
+
+bind = os.getenv("BIND", "0.0.0.0:8080")
+workers = int(os.getenv("WEB_CONCURRENCY", 4))
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+
+if mode == "threads":
+    worker_class = "gthread"
+    threads = int(os.getenv("WEB_THREADS", 32))
+elif mode == "gevent":
+    worker_class = "gevent"
+    worker_connections = int(os.getenv("WEB_CONNECTIONS", 1000))
+
+
+def on_starting(server):
+    from Backend.config import Config
+    # Workers sum their metrics through snapshot files; counts from an earlier run must not carry over
+    if Config.METRICS_DIR:
+        for path in glob.glob(os.path.join(Config.METRICS_DIR, "*.json")):
+            os.remove(path)
+    else:
+        # Workers are forked after this and inherit the setting
+        Config.METRICS_DIR = tempfile.mkdtemp(prefix="newscraper-metrics-")
+    if Config.MIGRATE_ON_START:
+        from Backend.migrations import migrate
+        applied = migrate(Config.DATABASE_URL)
+        server.log.info("Applied %d schema migration(s)%s", len(applied),
+                        f": {', '.join(map(str, applied))}" if applied else "")
+
+
+def post_worker_init(worker):
+    from Backend.db import get_pool, make_green
+    if mode == "gevent":
+        make_green()
+    # Each worker opens its own DB_POOL_MIN connections once forked, before taking requests
+    try:
+        get_pool().warm()
+    except Exception as e:
+        worker.log.warning("Could not warm the database pool: %s", e)
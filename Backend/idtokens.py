@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+from google.auth import jwt
+from Backend.metrics import instrument_session, record_outbound_error
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenVerifier:
+    """Verifies Google ID tokens locally against cached signing certificates.
+
+    Certificates are fetched over a pooled session and reused for as long as
+    the response's Cache-Control max-age allows (``default_max_age`` when it
+    has none). A token signed by an unknown key id triggers an early refresh,
+    so key rotation does not wait for the cache to expire; such refreshes run
+    at most once per ``min_refresh_interval`` seconds, so tokens with made-up
+    key ids cannot turn every sign-in into a fetch from Google. Verified claims are
+    kept by token hash for up to ``claims_ttl`` seconds, never past the
+    token's own expiry.
+    """
+
+    def __init__(self, audience, certs_url=GOOGLE_CERTS_URL, session=None, timeout=(3.05, 10),
+                 default_max_age=300, claims_ttl=300, max_claims=1024, clock_skew=0, min_refresh_interval=60,
+                 clock=time.time):
+        self.audience = audience
+        self.certs_url = certs_url
+        self.session = session or self._make_session()
+        self.timeout = timeout
+        self.default_max_age = default_max_age
+        self.claims_ttl = claims_ttl
+        self.max_claims = max_claims
+        self.clock_skew = clock_skew
+        self.min_refresh_interval = min_refresh_interval
+        self.clock = clock
+        self._certs = None
+        self._certs_expire = 0.0
+        self._certs_fetched = float("-inf")
+        self._certs_lock = threading.Lock()
+        self._claims = OrderedDict()
+        self._claims_lock = threading.Lock()
+        self.stats = {"cert_fetches": 0, "claims_hits": 0, "verifications": 0}
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return instrument_session(session)
+
+    def _fetch_certs(self):
+        try:
+            response = self.session.get(self.certs_url, timeout=self.timeout)
+        except requests.RequestException as e:
+            record_outbound_error(self.certs_url, e)
+            raise
+        response.raise_for_status()
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else self.default_max_age
+        self.stats["cert_fetches"] += 1
+        return response.json(), max_age
+
+    def certs(self, refresh=False):
+        """Return the signing certificates by key id, fetching them only when stale.
+
+        ``refresh`` forces a fetch unless the last one was less than
+        ``min_refresh_interval`` seconds ago.
+        """
+        with self._certs_lock:
+            # Checked under the lock so concurrent sign-ins share one fetch
+            now = self.clock()
+            if refresh and now - self._certs_fetched < self.min_refresh_interval:
+                refresh = False
+            if refresh or self._certs is None or self._certs_expire <= now:
+                self._certs, max_age = self._fetch_certs()
+                self._certs_fetched = self.clock()
+                self._certs_expire = self._certs_fetched + max_age
+            return self._certs
+
+    def _decode(self, token):
+        certs = self.certs()
+        header = jwt.decode_header(token)
+        if header.get("kid") not in certs:
+            # Google rotated its keys before our copy expired
+            certs = self.certs(refresh=True)
+            if header.get("kid") not in certs:
+                raise ValueError(f"Unknown signing key id: {header.get('kid')}")
+        return jwt.decode(token, certs=certs, audience=self.audience, clock_skew_in_seconds=self.clock_skew)
+
+    def verify(self, token):
+        """Return the token's claims, raising ValueError if it is invalid or expired."""
+        if isinstance(token, str):
+            token = token.encode()
+        key = hashlib.sha256(token).hexdigest()
+        now = self.clock()
+        with self._claims_lock:
+            entry = self._claims.get(key)
+            if entry is not None:
+                expires, claims = entry
+                if expires > now:
+                    self._claims.move_to_end(key)
+                    self.stats["claims_hits"] += 1
+                    return claims
+                del self._claims[key]
+
+        claims = self._decode(token)
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {claims.get('iss')}")
+
+        with self._claims_lock:
+            self.stats["verifications"] += 1
+            self._claims[key] = (min(now + self.claims_ttl, claims["exp"]), claims)
+            while len(self._claims) > self.max_claims:
+                self._claims.popitem(last=False)
+        return claims
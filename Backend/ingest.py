@@ -0,0 +1,61 @@
+import re
+from psycopg2.extras import execute_values
+
+# Mirrors normalize_link() so existing rows can be backfilled in SQL
+LINK_KEY_SQL = "NULLIF(lower(rtrim(regexp_replace(btrim(link), '[?#].*$', ''), '/')), '')"
+
+_QUERY_OR_FRAGMENT = re.compile(r"[?#].*$")
+
+
+def normalize_link(link):
+    """Canonical form of an article link used for de-duplication.
+
+    Query strings, fragments and trailing slashes are dropped and the result is
+    lower-cased. Articles without a link get no key and are never de-duplicated.
+    """
+    if not link:
+        return None
+    key = _QUERY_OR_FRAGMENT.sub("", link.strip()).rstrip("/").lower()
+    return key or None
+
+
+UPSERT_NEWS_SQL = '''INSERT INTO news (headline, summary, link, link_key) VALUES %s
+                     ON CONFLICT (link_key) DO UPDATE
+                     SET headline = EXCLUDED.headline, summary = EXCLUDED.summary, link = EXCLUDED.link
+                     WHERE (news.headline, news.summary, news.link)
+                           IS DISTINCT FROM (EXCLUDED.headline, EXCLUDED.summary, EXCLUDED.link)
+                     RETURNING id, (xmax = 0) AS inserted'''
+
+
+def ingest_articles(connection, articles):
+    """Upsert a stream of scraped (headline, summary, link) records in a single round trip.
+
+    Rows are keyed on the normalized link: new links are inserted, known links
+    get their headline/summary refreshed when they changed and are otherwise
+    skipped. Returns the inserted/updated/skipped counts. The caller commits.
+    """
+    rows = []
+    seen = set()
+    skipped = 0
+    for headline, summary, link in articles:
+        if not headline:
+            skipped += 1
+            continue
+        key = normalize_link(link)
+        if key is not None:
+            # ON CONFLICT cannot touch the same row twice in one statement
+            if key in seen:
+                skipped += 1
+                continue
+            seen.add(key)
+        rows.append((headline, summary or "", link or "", key))
+
+    inserted = updated = 0
+    if rows:
+        cursor = connection.cursor()
+        returned = execute_values(cursor, UPSERT_NEWS_SQL, rows, page_size=len(rows), fetch=True)
+        inserted = sum(1 for _, was_inserted in returned if was_inserted)
+        updated = len(returned) - inserted
+        skipped += len(rows) - len(returned)
+
+    return {"inserted": inserted, "updated": updated, "skipped": skipped}
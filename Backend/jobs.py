@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobStore:
+    """SQLite-backed job table.
+
+    The file is shared by every gunicorn worker on the host, so any worker can
+    answer a status poll and concurrent triggers coalesce across workers.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                                    id TEXT PRIMARY KEY,
+                                    key TEXT NOT NULL,
+                                    status TEXT NOT NULL,
+                                    created_at REAL NOT NULL,
+                                    started_at REAL,
+                                    finished_at REAL,
+                                    result TEXT,
+                                    error TEXT)''')
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_key_status_idx ON jobs (key, status)')
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create_or_get_active(self, key, stale_after):
+        """Return (job, created). An active job with the same key is reused."""
+        now = time.time()
+        connection = self._connect()
+        try:
+            # IMMEDIATE takes the write lock so two workers cannot both create a job
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute('''SELECT * FROM jobs
+                                        WHERE key = ? AND status IN (?, ?) AND created_at > ?
+                                        ORDER BY created_at DESC LIMIT 1''',
+                                     (key, *ACTIVE_STATUSES, now - stale_after)).fetchone()
+            if row is not None:
+                connection.execute("COMMIT")
+                return self._to_dict(row), False
+            job_id = uuid.uuid4().hex
+            connection.execute('INSERT INTO jobs (id, key, status, created_at) VALUES (?, ?, ?, ?)',
+                               (job_id, key, QUEUED, now))
+            connection.execute("COMMIT")
+            return self.get(job_id), True
+        except Exception:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def mark_running(self, job_id):
+        with closing(self._connect()) as connection:
+            connection.execute('UPDATE jobs SET status = ?, started_at = ? WHERE id = ?',
+                               (RUNNING, time.time(), job_id))
+
+    def mark_finished(self, job_id, status, result=None, error=None):
+        with closing(self._connect()) as connection:
+            connection.execute('UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?',
+                               (status, time.time(), json.dumps(result) if result is not None else None, error, job_id))
+
+    def get(self, job_id):
+        with closing(self._connect()) as connection:
+            return self._to_dict(connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+    def expire(self, job_id, created_before, error):
+        """Mark the job failed if it is still active and was created before the cutoff."""
+        with closing(self._connect()) as connection:
+            connection.execute('''UPDATE jobs SET status = ?, finished_at = ?, error = ?
+                                  WHERE id = ? AND status IN (?, ?) AND created_at < ?''',
+                               (FAILED, time.time(), error, job_id, *ACTIVE_STATUSES, created_before))
+
+    def prune(self, keep_for):
+        with closing(self._connect()) as connection:
+            connection.execute('DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?',
+                               (*ACTIVE_STATUSES, time.time() - keep_for))
+
+
+class JobQueue:
+    """Runs jobs on a worker thread pool, separate from the request threads."""
+
+    def __init__(self, store, max_workers=1, stale_after=600, keep_for=86400):
+        self.store = store
+        self.max_workers = max_workers
+        self.stale_after = stale_after
+        self.keep_for = keep_for
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Threads do not survive a fork, so every gunicorn worker gets its own pool
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jobs")
+                self._pid = os.getpid()
+            return self._executor
+
+    def enqueue(self, key, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) unless a job with the same key is already active.
+
+        Returns (job, created).
+        """
+        job, created = self.store.create_or_get_active(key, self.stale_after)
+        if created:
+            self._get_executor().submit(self._run, job["id"], func, args, kwargs)
+        return job, created
+
+    def _run(self, job_id, func, args, kwargs):
+        self.store.mark_running(job_id)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job_id, e)
+            self.store.mark_finished(job_id, FAILED, error=str(e))
+        else:
+            self.store.mark_finished(job_id, SUCCEEDED, result=result)
+        try:
+            self.store.prune(self.keep_for)
+        except sqlite3.Error as e:
+            logger.warning("Could not prune old jobs: %s", e)
+
+    def get(self, job_id):
+        """Return the job; one still active after stale_after is reported as failed.
+
+        Its worker was most likely recycled or killed mid-run, so it would
+        otherwise stay queued or running forever and keep clients polling.
+        """
+        job = self.store.get(job_id)
+        cutoff = time.time() - self.stale_after
+        if job is not None and job["status"] in ACTIVE_STATUSES and job["created_at"] < cutoff:
+            self.store.expire(job_id, cutoff, f"Job did not finish within {self.stale_after:g}s; its worker probably stopped")
+            job = self.store.get(job_id)
+        return job
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
@@ -1,24 +1,34 @@
 from flask import Flask, render_template, request, jsonify
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from bs4 import BeautifulSoup
-import psycopg2
 import os
 from dotenv import load_dotenv
-from google.auth.transport.requests import Request
-from google.oauth2 import id_token
 from flask_cors import CORS
 from Backend.form import form_bp
 from Backend.pokemon import pokemon
+import Backend.pokemon as pokemon_module
 import logging
-import requests
+import threading
+import time
 from Backend.config import Config
+from Backend.db import get_db_connection, get_pool, init_app as init_db
+from Backend.cache import cached, invalidate, response_cache
+from Backend import metrics, profiler
+from Backend.logs import configure_logging, init_app as init_logging
+from Backend.scraper import FetchStateStore, ScrapeEngine, get_sources
+from Backend.jobs import JobQueue, JobStore
+from Backend.idtokens import GoogleTokenVerifier
+from Backend.recaptcha import CircuitBreaker, RecaptchaUnavailable, RecaptchaVerifier
+from Backend.scheduler import AdvisoryLock, ScheduleStore, ScrapeScheduler
+from Backend.ingest import ingest_articles
+from Backend.search import SEARCH_SQL, SearchIndex, escape_like, parse_search_cursor
+from Backend.streaming import get_encoder, stream_json, stream_rows, wants_ndjson
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+# Configure logging: level and format from Config, written off the request threads
+configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_DEBUG_SAMPLE_RATE)
 logger = logging.getLogger(__name__)
 
 # Initialize the Flask application
@@ -26,43 +36,16 @@ app = Flask(__name__)
 
 # Load configuration settings
 app.config.from_object(Config)
+# Fail at startup rather than on the first streamed response
+get_encoder(Config.JSON_ENCODER)
 
-CORS(app, resources={r"/*": {"origins": ["https://mai-newscraper.vercel.app", "http://localhost:5173"]}})
-
-def get_db_connection():
-    connection = psycopg2.connect(app.config["DATABASE_URL"])
-    return connection
-
-def setup_database():
-    connection = get_db_connection()
-    cursor = connection.cursor()
-
-    # Create the 'news' table
-    cursor.execute('''CREATE TABLE IF NOT EXISTS news (
-                        id SERIAL PRIMARY KEY,
-                        headline TEXT NOT NULL,
-                        summary TEXT NOT NULL,
-                        link TEXT NOT NULL)''')
+# Upper bound for page sizes on list endpoints
+MAX_PAGE_SIZE = 100
 
-    # Enable the pg_trgm extension
-    cursor.execute('''CREATE EXTENSION IF NOT EXISTS pg_trgm''')
-
-    # Create the 'news_fts' table
-    cursor.execute('''CREATE TABLE IF NOT EXISTS news_fts (
-                        id INT PRIMARY KEY,
-                        headline TEXT,
-                        summary TEXT,
-                        link TEXT)''')
-
-    # Create indexes for full-text search
-    cursor.execute('''CREATE INDEX IF NOT EXISTS headline_idx ON news_fts USING gin (headline gin_trgm_ops)''')
-    cursor.execute('''CREATE INDEX IF NOT EXISTS summary_idx ON news_fts USING gin (summary gin_trgm_ops)''')
-
-    connection.commit()
-    connection.close()
+CORS(app, resources={r"/*": {"origins": ["https://mai-newscraper.vercel.app", "http://localhost:5173"]}})
 
-# Call the function to initialize the database
-setup_database()
+# Return pooled connections to the pool at the end of every request
+init_db(app)
 
 # Configure Flask-Limiter to use Redis
 limiter = Limiter(
@@ -72,6 +55,67 @@ limiter = Limiter(
     default_limits=["50 per 3 minutes"],
 )
 
+# Shared engine used to fetch all registered news sources
+scrape_engine = ScrapeEngine(
+    max_workers=Config.SCRAPE_MAX_WORKERS,
+    per_host_limit=Config.SCRAPE_PER_HOST_LIMIT,
+    timeout=Config.SCRAPE_TIMEOUT,
+    retries=Config.SCRAPE_RETRIES,
+    parser=Config.SCRAPE_PARSER,
+    state=FetchStateStore(Config.SCRAPE_STATE_PATH),
+)
+
+# Scrape jobs run off the request path on their own thread pool
+job_queue = JobQueue(
+    JobStore(Config.JOBS_DB_PATH),
+    max_workers=Config.JOBS_MAX_WORKERS,
+    stale_after=Config.JOBS_STALE_AFTER,
+)
+
+# Optional per-worker in-memory index answering /search and /headlines
+search_index = SearchIndex(
+    refresh_interval=Config.SEARCH_INDEX_REFRESH,
+    rebuild_interval=Config.SEARCH_INDEX_REBUILD,
+) if Config.SEARCH_INDEX_ENABLED else None
+
+# Verifies Google Sign-In tokens against cached signing certificates
+token_verifier = GoogleTokenVerifier(
+    Config.GOOGLE_CLIENT_KEY,
+    certs_url=Config.GOOGLE_CERTS_URL,
+    default_max_age=Config.GOOGLE_CERTS_MAX_AGE,
+    claims_ttl=Config.ID_TOKEN_CACHE_TTL,
+    max_claims=Config.ID_TOKEN_CACHE_MAX_ENTRIES,
+    min_refresh_interval=Config.GOOGLE_CERTS_MIN_REFRESH,
+)
+
+# Verifies reCAPTCHA tokens for /verifyUser
+recaptcha_verifier = RecaptchaVerifier(
+    Config.BACKEND_KEY,
+    url=Config.RECAPTCHA_VERIFY_URL,
+    timeout=(Config.RECAPTCHA_CONNECT_TIMEOUT, Config.RECAPTCHA_READ_TIMEOUT),
+    cache_ttl=Config.RECAPTCHA_CACHE_TTL,
+    breaker=CircuitBreaker(Config.RECAPTCHA_FAILURE_THRESHOLD, Config.RECAPTCHA_RESET_TIMEOUT),
+)
+
+# Request ids for log records, echoed back in X-Request-ID
+init_logging(app)
+
+# Request timing for the app and every blueprint, served at /metrics
+metrics.init_app(app, Config.METRICS_DIR, Config.METRICS_FLUSH_INTERVAL)
+metrics.registry.register_collector(metrics.cache_collector(lambda: {
+    "response": (response_cache.hits, response_cache.misses),
+    "news_count": (_news_count["hits"], _news_count["misses"]),
+    "pokeapi": (pokemon_module.pokeapi.stats["memory_hits"] + pokemon_module.pokeapi.stats["store_hits"],
+                pokemon_module.pokeapi.stats["upstream_calls"]),
+    "id_token_claims": (token_verifier.stats["claims_hits"], token_verifier.stats["verifications"]),
+    "recaptcha": (recaptcha_verifier.stats()["cache_hits"], recaptcha_verifier.stats()["upstream_calls"]),
+}))
+
+# Per-request query timings and slow-query log (off unless QUERY_PROFILING is set);
+# /queryStats only with DIAGNOSTICS_ENABLED
+profiler.init_app(app, Config.QUERY_PROFILING, Config.SLOW_QUERY_THRESHOLD, Config.SLOW_QUERY_EXPLAIN,
+                  Config.SERVER_TIMING, serve_stats=Config.DIAGNOSTICS_ENABLED)
+
 # Register the Blueprints
 app.register_blueprint(form_bp)
 app.register_blueprint(pokemon)
@@ -80,86 +124,187 @@ app.register_blueprint(pokemon)
 def index():
     return jsonify({'message': 'Welcome to the API!'})
 
+def run_scrape(source_names=None):
+    """Scrape the given sources (all by default) and store the articles."""
+    # Fetch and parse all sources concurrently
+    results = scrape_engine.run(get_sources(source_names))
+    if results and not any(result.ok for result in results):
+        raise RuntimeError("; ".join(f"{result.source}: {result.error}" for result in results))
+
+    # Sources whose page or articles match the last stored fetch need no writes
+    changed = [result for result in results if result.ok and not result.unchanged]
+    ingested = {"inserted": 0, "updated": 0, "skipped": 0}
+    if changed:
+        # Upsert the whole batch into PostgreSQL in one round trip
+        insert_start = time.perf_counter()
+        connection = get_db_connection()
+        try:
+            ingested = ingest_articles(connection, (article for result in changed for article in result.articles))
+            connection.commit()
+            if search_index is not None and search_index.loaded:
+                search_index.refresh(connection)
+        finally:
+            connection.close()
+        metrics.record_scrape_stage("*", "insert", time.perf_counter() - insert_start)
+    scrape_engine.remember(results)
+    if ingested["inserted"]:
+        invalidate_news_count()
+    if ingested["inserted"] or ingested["updated"]:
+        invalidate("news")
+
+    return {
+        "total_articles": sum(len(result.articles) for result in results),
+        "unchanged_sources": sum(1 for result in results if result.unchanged),
+        "bytes_downloaded": sum(result.bytes for result in results),
+        "saved_bytes": sum(result.saved_bytes for result in results),
+        "saved_seconds": sum(result.saved_seconds for result in results),
+        "ingested": ingested,
+        "sources": [{
+            "source": result.source,
+            "url": result.url,
+            "articles": len(result.articles),
+            "status_code": result.status_code,
+            "attempts": result.attempts,
+            "error": result.error,
+            "unchanged": result.unchanged,
+            "bytes": result.bytes,
+            "saved_bytes": result.saved_bytes,
+            "saved_seconds": result.saved_seconds,
+            "timings": result.timings,
+        } for result in results],
+        "articles": [article._asdict() for result in results for article in result.articles],
+    }
+
+# Periodic scrapes per source cadence; only the worker holding the advisory lock runs them
+scrape_scheduler = ScrapeScheduler(
+    run_scrape,
+    get_sources,
+    default_interval=Config.SCRAPE_INTERVAL,
+    jitter=Config.SCRAPE_JITTER,
+    max_backoff=Config.SCRAPE_MAX_BACKOFF,
+    lock=AdvisoryLock(Config.DATABASE_URL),
+    store=ScheduleStore(Config.JOBS_DB_PATH),
+    poll_interval=Config.SCHEDULER_POLL_INTERVAL,
+)
+if Config.SCHEDULER_ENABLED:
+    scrape_scheduler.start()
+
 @app.route("/scrape")
 def scrape():
     try:
-        # Send GET request to fetch the page content
-        response = requests.get('https://www.theatlantic.com/most-popular/')
-        response.raise_for_status()  # Ensure the request was successful
-
-        # Parse the HTML document
-        soup = BeautifulSoup(response.content, "html.parser")
-        articles = soup.find_all('article')
-        headlines_text = []
-        summaries_text = []
-        links_text = []
-
-        for article in articles:
-            # Find the h2 tag (headline) within the article
-            headline = article.select_one('h2')
-            if headline:
-                headlines_text.append(headline.get_text())
-
-            # Find the p tag (summary) within the article
-            summary = article.select_one('p')
-            if summary:
-                summaries_text.append(summary.get_text())
-
-            # Find the link (<a> tag) within the article
-            link = article.select_one('a')
-            if link and link.get('href'):
-                links_text.append(link['href'])
-
-        # Ensure lists are aligned (handle missing summaries/links)
-        summaries_text += [""] * (len(headlines_text) - len(summaries_text))
-        links_text += [""] * (len(headlines_text) - len(links_text))
-
-        # Insert scraped data into PostgreSQL database
-        connection = get_db_connection()
-        cursor = connection.cursor()
+        # Optionally restrict the run to specific sources (?source=atlantic&source=...)
+        source_names = sorted(set(request.args.getlist('source')))
+        try:
+            get_sources(source_names)
+        except KeyError as e:
+            return jsonify({"error": str(e.args[0])}), 400
 
-        # Insert headlines and descriptions into the news table
-        for headline, summary, link in zip(headlines_text, summaries_text, links_text):
-            cursor.execute("INSERT INTO news (headline, summary, link) VALUES (%s, %s, %s)",
-                (headline, summary, link))
+        # Concurrent triggers for the same sources share one job
+        key = "scrape:" + (",".join(source_names) or "*")
+        job, created = job_queue.enqueue(key, run_scrape, source_names)
 
-        connection.commit()
-        connection.close()
-
-        articles_data = []
-        for headline, summary, link in zip(headlines_text, summaries_text, links_text):
-            articles_data.append({
-            "headline": headline,
-            "summary": summary,
-            "link": link
-            })
-
-        return jsonify(articles_data), 201
+        response = jsonify({"job_id": job["id"], "status": job["status"], "created": created})
+        response.headers["Location"] = f"/scrape/jobs/{job['id']}"
+        return response, 202
 
     except Exception as e:
-        logging.error(f"Error occurred during scraping: {e}")
+        logger.error("Error occurred during scraping: %s", e)
         return render_template("error.html", error_message=f"An error occurred: {e}"), 500
 
+@app.route("/scrape/schedule")
+def scrape_schedule():
+    status = scrape_scheduler.status()
+    status["enabled"] = Config.SCHEDULER_ENABLED
+    return jsonify(status), 200
+
+@app.route("/scrape/jobs/<job_id>")
+def scrape_job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+# Cached size of the news table so paging doesn't run COUNT(*) on every request
+_news_count = {"value": None, "approximate": False, "expires": 0.0, "hits": 0, "misses": 0}
+_news_count_lock = threading.Lock()
+
+def count_news(cursor):
+    """Return (total, approximate) for the news table, cached for NEWS_COUNT_TTL seconds.
+
+    Large tables use the planner's row estimate from pg_class instead of a full count.
+    """
+    with _news_count_lock:
+        if _news_count["value"] is not None and time.monotonic() < _news_count["expires"]:
+            _news_count["hits"] += 1
+            return _news_count["value"], _news_count["approximate"]
+
+    cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = 'news'::regclass")
+    estimate = cursor.fetchone()[0]
+    if estimate >= Config.NEWS_COUNT_EXACT_BELOW:
+        total, approximate = estimate, True
+    else:
+        cursor.execute("SELECT COUNT(*) FROM news")
+        total, approximate = cursor.fetchone()[0], False
+
+    with _news_count_lock:
+        _news_count["misses"] += 1
+        _news_count.update(value=total, approximate=approximate, expires=time.monotonic() + Config.NEWS_COUNT_TTL)
+    return total, approximate
+
+def invalidate_news_count():
+    with _news_count_lock:
+        _news_count["expires"] = 0.0
+
 @app.route('/news', methods=['GET'])
+@cached(tags=["news"])
 def get_news():
     try:
+        # Cursor mode (?after=<id>&limit=) walks the primary key index instead of using OFFSET
+        after = request.args.get('after', type=int)
+        limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_PAGE_SIZE)
+
         # Get pagination parameters from request args,
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), MAX_PAGE_SIZE)
 
         # Connect to the PostgreSQL database
         connection = get_db_connection()
+
+        if wants_ndjson():
+            # Every article after the cursor, streamed from a server-side cursor that closes the connection when done
+            articles = stream_rows(connection, "SELECT id, headline, summary, link FROM news WHERE id > %s ORDER BY id",
+                                   (after or 0,))
+            return stream_json({"id": article[0], "headline": article[1], "summary": article[2], "link": article[3]}
+                               for article in articles)
+
         cursor = connection.cursor()
 
-        # Select all rows from the 'news' table
-        cursor.execute("SELECT COUNT(*) FROM news")
-        total_articles = cursor.fetchone()[0]
+        total_articles, approximate = count_news(cursor)
+
+        if after is not None or 'limit' in request.args:
+            # Fetch one extra row to know whether there is a next page
+            cursor.execute("SELECT id, headline, summary, link FROM news WHERE id > %s ORDER BY id LIMIT %s",
+                           (after or 0, limit + 1))
+            articles = cursor.fetchall()
+            connection.close()
+
+            has_more = len(articles) > limit
+            articles = articles[:limit]
+            articles_data = [{"id": article[0], "headline": article[1], "summary": article[2], "link": article[3]} for article in articles]
+
+            return jsonify({
+                "limit": limit,
+                "next_cursor": articles[-1][0] if has_more else None,
+                "total_articles": total_articles,
+                "total_is_approximate": approximate,
+                "articles": articles_data
+            }), 200
 
         total_pages = (total_articles + per_page - 1) // per_page
 
         # Fetch the paginated results
         start = (page - 1) * per_page
-        cursor.execute("SELECT * FROM news LIMIT %s OFFSET %s", (per_page, start))
+        cursor.execute("SELECT id, headline, summary, link FROM news ORDER BY id LIMIT %s OFFSET %s", (per_page, start))
         articles = cursor.fetchall()
 
         # Close the connection to the database
@@ -173,73 +318,195 @@ def get_news():
             "total_pages": total_pages,
             "per_page": per_page,
             "total_articles": total_articles,
+            "total_is_approximate": approximate,
             "articles": articles_data
         }), 200
 
     except Exception as e:
-        logging.error(f"Error occurred while fetching news: {e}")
+        logger.error("Error occurred while fetching news: %s", e)
         return render_template("error.html", error_message=f"Error occurred while fetching news: {e}"), 500
 
 @app.route("/headlines")
+@cached(tags=["news", "topics"])
 def get_headlines():
     """
-    Fetches all headlines from the 'news' table in the PostgreSQL database
-    that match the specified keywords and returns them as a JSON response.
+    Fetches headlines from the 'news' table that match a topic's keywords and
+    returns them as a JSON response.
+
+    Keywords come from ?keyword=... or from the stored topic named by ?topic=
+    (default: 'default'). Without ?limit/?after every match is returned as a
+    list; with them the result is keyset-paginated like /news. ?format=ndjson
+    streams every match after ?after from a server-side cursor instead.
     """
     try:
+        # Streamed responses bypass the cache, so the plain list stays buffered
+        stream = wants_ndjson()
+        paginated = not stream and ('after' in request.args or 'limit' in request.args)
+        after = request.args.get('after', 0, type=int)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+        keywords = [keyword for keyword in request.args.getlist('keyword') if keyword.strip()]
+
         # Connect to the PostgreSQL database
         connection = get_db_connection()
         cursor = connection.cursor()
 
-        # Define the keywords to filter headlines
-        keywords = ["Trump", "America", "DOGE"]
-
-        # Prepare the SQL query to fetch headlines containing the keywords
-        query = f"SELECT headline FROM news WHERE headline LIKE '%{keywords[0]}%' OR headline LIKE '%{keywords[1]}%' OR headline LIKE '%{keywords[2]}%'"
+        # Load the keywords of the stored topic
+        if not keywords:
+            topic = request.args.get('topic', 'default', type=str)
+            cursor.execute("SELECT keywords FROM topics WHERE name = %s", (topic,))
+            row = cursor.fetchone()
+            if row is None:
+                connection.close()
+                return jsonify({"error": f"Unknown topic: {topic}"}), 404
+            keywords = row[0]
+
+        if search_index is not None:
+            connection.close()
+            search_index.ensure_current(get_db_connection)
+            rows = [(doc_id, search_index.docs[doc_id][0])
+                    for doc_id in search_index.headline_matches(keywords)
+                    if doc_id > after]
+            if paginated:
+                rows = rows[:limit + 1]
+        else:
+            # One trigram-indexed query matching any keyword, case-insensitively
+            patterns = [f"%{escape_like(keyword)}%" for keyword in keywords]
+            query = "SELECT id, headline FROM news WHERE headline ILIKE ANY(%s) AND id > %s ORDER BY id"
+            params = (patterns, after)
+            if paginated:
+                query += " LIMIT %s"
+                params += (limit + 1,)
+
+            if stream:
+                # Every match, streamed from a server-side cursor that closes the connection when done
+                rows = stream_rows(connection, query, params)
+            else:
+                # Execute the SQL query
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+
+                # Close the database connection
+                connection.close()
+
+        if stream:
+            return stream_json({'id': row[0], 'headline': row[1]} for row in rows)
+
+        if not paginated:
+            # Prepare a list of dictionaries, each containing the headline
+            return jsonify([{'headline': row[1]} for row in rows]), 200
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return jsonify({
+            "keywords": keywords,
+            "limit": limit,
+            "next_cursor": rows[-1][0] if has_more else None,
+            "headlines": [{'id': row[0], 'headline': row[1]} for row in rows]
+        }), 200
+    except Exception as e:
+        logger.error("Error occurred while fetching summaries: %s", e)
+        return render_template("error.html", error_message=f"Error occurred while fetching summaries: {e}"), 500
 
-        # Execute the SQL query
-        cursor.execute(query)
-        rows = cursor.fetchall()
+@app.route("/topics", methods=['GET'])
+def get_topics():
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute("SELECT name, keywords FROM topics ORDER BY name")
+    rows = cursor.fetchall()
+    connection.close()
+    return jsonify([{"name": row[0], "keywords": row[1]} for row in rows]), 200
 
-        # Prepare a list of dictionaries, each containing the headline
-        headlines_data = [{'headline': row[0]} for row in rows]
+@app.route("/topics/<name>", methods=['PUT'])
+def save_topic(name):
+    data = request.get_json(silent=True) or {}
+    keywords = data.get('keywords')
+    if not isinstance(keywords, list) or not keywords or not all(isinstance(keyword, str) and keyword.strip() for keyword in keywords):
+        return jsonify({"error": "keywords must be a non-empty list of strings"}), 400
 
-        # Close the database connection
-        connection.close()
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute('''INSERT INTO topics (name, keywords) VALUES (%s, %s)
+                      ON CONFLICT (name) DO UPDATE SET keywords = EXCLUDED.keywords''', (name, keywords))
+    connection.commit()
+    connection.close()
+    invalidate("topics")
+    return jsonify({"name": name, "keywords": keywords}), 200
 
-        # Return the fetched headlines as a JSON response
-        return jsonify(headlines_data), 200
-    except Exception as e:
-        logging.error(f"Error occurred while fetching summaries: {e}")
-        return render_template("error.html", error_message=f"Error occurred while fetching summaries: {e}"), 500
+def pool_stats():
+    return jsonify(get_pool().stats()), 200
 
 # Complex search
 @app.route('/search', methods=['GET'])
+@cached(tags=["news"])
 def search_articles():
     try:
         # Get the search query for headline and summary from request args
-        headline_query = request.args.get('headline_query', '', type=str)
-        summary_query = request.args.get('summary_query', '', type=str)
-
-        # Connect to the PostgreSQL database
-        connection = get_db_connection()
-        cursor = connection.cursor()
-
-        # Perform full-text search on the 'news_fts' table for both headline and summary
-        cursor.execute('''SELECT id, headline, summary, link FROM news_fts
-                          WHERE headline LIKE %s OR summary LIKE %s''', (f'%{headline_query}%', f'%{summary_query}%'))
-        articles = cursor.fetchall()
-
-        # Close the connection to the database
-        connection.close()
+        query = request.args.get('q', '', type=str)
+        headline_query = request.args.get('headline_query', query, type=str)
+        summary_query = request.args.get('summary_query', query, type=str)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+
+        if not headline_query.strip() and not summary_query.strip():
+            return jsonify({"error": "Missing search query"}), 400
+
+        after = None
+        if request.args.get('cursor'):
+            try:
+                after = parse_search_cursor(request.args['cursor'])
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+
+        # ?format=ndjson streams every match after the cursor instead of one page
+        stream = wants_ndjson()
+
+        if search_index is not None:
+            # Answer from the in-process index without a database round trip
+            search_index.ensure_current(get_db_connection)
+            articles = [(doc_id, headline, summary, link, rank) for rank, doc_id, headline, summary, link
+                        in search_index.search(headline_query, summary_query,
+                                               limit=None if stream else limit + 1, after=after)]
+        else:
+            # LIMIT NULL means no limit
+            params = {"headline_query": headline_query, "summary_query": summary_query,
+                      "limit": None if stream else limit + 1}
+            cursor_filter = ""
+            if after is not None:
+                params["after_rank"], params["after_id"] = after
+                cursor_filter = "WHERE (rank, id) < (%(after_rank)s, %(after_id)s)"
+
+            # Connect to the PostgreSQL database
+            connection = get_db_connection()
+
+            # Perform full-text search on the GIN-indexed tsvector columns
+            if stream:
+                # Streamed from a server-side cursor that closes the connection when done
+                articles = stream_rows(connection, SEARCH_SQL.format(cursor_filter=cursor_filter), params)
+            else:
+                cursor = connection.cursor()
+                cursor.execute(SEARCH_SQL.format(cursor_filter=cursor_filter), params)
+                articles = cursor.fetchall()
+
+                # Close the connection to the database
+                connection.close()
+
+        if stream:
+            return stream_json({"id": article[0], "headline": article[1], "summary": article[2], "link": article[3], "rank": article[4]}
+                               for article in articles)
+
+        has_more = len(articles) > limit
+        articles = articles[:limit]
 
         # Format the data into a list of dictionaries for JSON response
-        articles_data = [{"id": article[0], "headline": article[1], "summary": article[2], "link": article[3]} for article in articles]
+        articles_data = [{"id": article[0], "headline": article[1], "summary": article[2], "link": article[3], "rank": article[4]} for article in articles]
 
-        return jsonify(articles_data), 200
+        return jsonify({
+            "limit": limit,
+            "next_cursor": f"{articles[-1][4]!r}:{articles[-1][0]}" if has_more else None,
+            "articles": articles_data
+        }), 200
 
     except Exception as e:
-        logging.error(f"Error occurred during search: {e}")
+        logger.error("Error occurred during search: %s", e)
         return render_template("error.html", error_message=f"Error occurred during search: {e}"), 500
 
 @app.route('/verifyUser', methods=['POST'])
@@ -247,26 +514,30 @@ def verify_user():
     try:
         data = request.get_json()  # Correctly get JSON data from the request
         token = data.get('token')
-        secret = app.config["BACKEND_KEY"]
-
-        # Send the POST request to Google's reCAPTCHA verification endpoint
-        recaptcha_response = requests.post(
-            'https://www.google.com/recaptcha/api/siteverify',
-            data={
-                'secret': secret,
-                'response': token
-            }
-        )
-        result = recaptcha_response.json()
+        if not token:
+            return jsonify(message='Failed to verify reCAPTCHA.'), 400
+
+        result = recaptcha_verifier.verify(token, request.remote_addr)
 
         if result.get('success'):
             return jsonify(message='reCAPTCHA verified successfully!'), 200
         else:
             return jsonify(message='Failed to verify reCAPTCHA.'), 400
+    except RecaptchaUnavailable as e:
+        logger.warning("reCAPTCHA verification unavailable: %s", e)
+        return jsonify(error="Server issue cannot validate at this time!"), 503
     except Exception as e:
-        logging.error(f"Error occurred during reCAPTCHA verification: {e}")
+        logger.error("Error occurred during reCAPTCHA verification: %s", e)
         return jsonify(error="Server issue cannot validate at this time!"), 500
 
+def recaptcha_stats():
+    return jsonify(recaptcha_verifier.stats()), 200
+
+# Diagnostics expose the pid, pool sizes and upstream counters; only served when enabled
+if Config.DIAGNOSTICS_ENABLED:
+    app.add_url_rule('/poolStats', 'pool_stats', pool_stats)
+    app.add_url_rule('/recaptchaStats', 'recaptcha_stats', recaptcha_stats)
+
 # Function to handle User Sign-In with Google
 @app.route('/userSignIn', methods=['POST'])
 def userSignIn():
@@ -274,12 +545,12 @@ def userSignIn():
     if not token:
         return jsonify(message="No token provided"), 404
     try:
-        id_token.verify_oauth2_token(token, Request(), app.config["GOOGLE_CLIENT_KEY"]), 200
+        token_verifier.verify(token)
 
         return jsonify(message='Google Sign-In successful!'), 200
 
     except Exception as e:
-        logging.error(f"Error occurred during Google Sign-In: {e}")
+        logger.error("Error occurred during Google Sign-In: %s", e)
         return render_template("error.html", error_message="Invalid token or no token provided", error=str(e)), 500
 
 # Route to explicitly serve the 500 error page with a custom error message
@@ -295,20 +566,23 @@ def handle_exception(e):
 # 404 Not Found Error handler
 @app.errorhandler(404)
 def not_found(e):
-    logging.error(f"404 error: Page is not found")
+    logger.error("404 error: Page is not found")
     return render_template("404.html", error_message="Page not found"), 404
 
 # 500 Internal Server Error handler
 @app.errorhandler(500)
 def internal_server_error(e):
-    logging.error(f"500 error: {e}")
+    logger.error("500 error: %s", e)
     return render_template("500.html", error_message = "Internal server error, please try again later."), 500
 
 @app.errorhandler(Exception)
 def handle_exception(e):
-    logging.error(f"Unexpected error: {e}")
+    logger.error("Unexpected error: %s", e)
     return render_template("error.html", error_message="An unexpected error occurred. Please try again later."), 500
 
 if __name__ == '__main__':
+    # gunicorn migrates from its master process; do the same for the development server
+    from Backend.migrations import migrate
+    migrate(Config.DATABASE_URL)
     # Run the Flask app in debug mode on port 5000
     app.run(debug=True, port=8080)
@@ -0,0 +1,346 @@
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from flask import Response, g, has_app_context, request
+
+logger = logging.getLogger(__name__)
+
+# Default latency buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def snapshot(self):
+        with self._lock:
+            samples = [(dict(zip(self.labels, label_values)), value)
+                       for label_values, value in sorted(self._values.items())]
+        return {"name": self.name, "type": "counter", "help": self.help, "samples": samples}
+
+    def render(self):
+        return _render_entry(self.snapshot())
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[2] if series else 0
+
+    def snapshot(self):
+        with self._lock:
+            samples = [(dict(zip(self.labels, label_values)), [list(counts), total, count])
+                       for label_values, (counts, total, count) in sorted(self._series.items())]
+        return {"name": self.name, "type": "histogram", "help": self.help, "buckets": list(self.buckets),
+                "samples": samples}
+
+    def render(self):
+        return _render_entry(self.snapshot())
+
+
+def _render_entry(entry):
+    """Prometheus text lines of one snapshot entry."""
+    name = entry["name"]
+    lines = [f"# HELP {name} {entry['help']}", f"# TYPE {name} {entry['type']}"]
+    for labels, value in entry["samples"]:
+        if entry["type"] != "histogram":
+            lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+            continue
+        counts, total, count = value
+        cumulative = 0
+        for bound, bucket_count in zip(list(entry["buckets"]) + [float("inf")], counts):
+            cumulative += bucket_count
+            bucket_labels = _format_labels(labels.keys(), labels.values(), [("le", _format_value(bound))])
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        plain_labels = _format_labels(labels.keys(), labels.values())
+        lines.append(f"{name}_sum{plain_labels} {_format_value(total)}")
+        lines.append(f"{name}_count{plain_labels} {count}")
+    return lines
+
+
+def merge_snapshots(snapshots):
+    """Sum snapshots of several processes, given as (entries, alive) pairs.
+
+    Counters and histograms of exited workers are kept so totals never go
+    backwards; their gauges (pool size and the like) no longer apply and are
+    dropped.
+    """
+    merged = {}
+    for entries, alive in snapshots:
+        for entry in entries:
+            if entry["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(entry["name"], {**entry, "samples": {}})
+            for labels, value in entry["samples"]:
+                key = tuple(sorted(labels.items()))
+                current = target["samples"].get(key)
+                if entry["type"] != "histogram":
+                    target["samples"][key] = (current or 0) + value
+                elif current is None:
+                    target["samples"][key] = [list(value[0]), value[1], value[2]]
+                else:
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                    current[2] += value[2]
+    return [{**entry, "samples": [(dict(key), value) for key, value in sorted(entry["samples"].items())]}
+            for entry in merged.values()]
+
+
+class Registry:
+    """Metrics of this process, rendered in the Prometheus text format.
+
+    Collectors are callables returning ``(name, type, help, samples)`` tuples,
+    where samples is a list of ``(labels dict, value)``; they report values
+    other components already keep, such as pool and cache statistics.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get_or_create(Counter, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=BUCKETS):
+        return self._get_or_create(Histogram, name, help, labels, buckets)
+
+    def register_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        entries = [metric.snapshot() for metric in metrics]
+        for collector in collectors:
+            for name, kind, help, samples in collector():
+                entries.append({"name": name, "type": kind, "help": help, "samples": list(samples)})
+        return entries
+
+    def render(self, entries=None):
+        lines = []
+        for entry in self.snapshot() if entries is None else entries:
+            lines.extend(_render_entry(entry))
+        return "\n".join(lines) + "\n"
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SharedSnapshots:
+    """Combines the metrics of all gunicorn workers through files in one directory.
+
+    Each worker writes its registry to ``<pid>.json`` at most every
+    ``flush_interval`` seconds after a request, and right before answering
+    /metrics. Whichever worker is scraped sums every file, so Prometheus sees
+    one set of series for the whole deployment; other workers' values may be
+    up to ``flush_interval`` seconds old.
+    """
+
+    def __init__(self, registry, directory, flush_interval=5.0):
+        self.registry = registry
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._next_flush = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def flush(self):
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with self._lock:
+            with open(temporary, "w") as snapshot_file:
+                json.dump(self.registry.snapshot(), snapshot_file)
+            os.replace(temporary, path)
+            self._next_flush = time.monotonic() + self.flush_interval
+
+    def maybe_flush(self):
+        if time.monotonic() >= self._next_flush:
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning("Could not write metrics snapshot: %s", e)
+
+    def render(self):
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path) as snapshot_file:
+                    entries = json.load(snapshot_file)
+            except (OSError, ValueError):
+                continue
+            pid = int(os.path.basename(path).split(".")[0])
+            snapshots.append((entries, pid == os.getpid() or _alive(pid)))
+        return self.registry.render(merge_snapshots(snapshots))
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time spent handling requests.", ("method", "route", "status"))
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "Time spent in database queries per request.", ("route",))
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "Database queries per request.", ("route",), buckets=COUNT_BUCKETS)
+DB_QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds", "Time spent executing database queries.")
+OUTBOUND_LATENCY = registry.histogram(
+    "http_client_request_duration_seconds", "Outbound HTTP requests until the response headers arrived.",
+    ("host", "status"))
+OUTBOUND_ERRORS = registry.counter(
+    "http_client_errors_total", "Outbound HTTP requests that failed without a response.", ("host", "error"))
+SCRAPE_STAGE = registry.histogram(
+    "scrape_stage_duration_seconds", "Time spent per scrape stage.", ("source", "stage"))
+
+
+def record_query(seconds):
+    """Called by the database layer for every executed statement."""
+    DB_QUERY_LATENCY.observe(seconds)
+    if has_app_context():
+        g._metrics_db_time = g.get("_metrics_db_time", 0.0) + seconds
+        g._metrics_db_queries = g.get("_metrics_db_queries", 0) + 1
+
+
+def _record_response(response, *args, **kwargs):
+    OUTBOUND_LATENCY.observe(response.elapsed.total_seconds(), urlsplit(response.url).netloc,
+                             str(response.status_code))
+
+
+def instrument_session(session):
+    """Record the latency of every response a requests session receives."""
+    session.hooks["response"].append(_record_response)
+    return session
+
+
+def record_outbound_error(url, error):
+    OUTBOUND_ERRORS.inc(urlsplit(url).netloc, type(error).__name__)
+
+
+def record_scrape_stage(source, stage, seconds):
+    SCRAPE_STAGE.observe(seconds, source, stage)
+
+
+def cache_collector(get_stats):
+    """Collector reporting hits and misses for caches given as name -> (hits, misses)."""
+    def collect():
+        stats = get_stats()
+        return [
+            ("cache_hits_total", "counter", "Cache lookups that were answered from the cache.",
+             [({"cache": name}, hits) for name, (hits, _) in stats.items()]),
+            ("cache_misses_total", "counter", "Cache lookups that had to do the work.",
+             [({"cache": name}, misses) for name, (_, misses) in stats.items()]),
+        ]
+    return collect
+
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+    g._metrics_db_time = 0.0
+    g._metrics_db_queries = 0
+
+
+# Set by init_app when workers share their metrics through a directory
+shared = None
+
+
+def _after_request(response):
+    start = g.pop("_metrics_start", None)
+    if start is not None:
+        # The rule template keeps label cardinality bounded (/favorites/<username>, not every user)
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        REQUEST_LATENCY.observe(time.perf_counter() - start, request.method, route, str(response.status_code))
+        REQUEST_DB_TIME.observe(g.get("_metrics_db_time", 0.0), route)
+        REQUEST_DB_QUERIES.observe(g.get("_metrics_db_queries", 0), route)
+    if shared is not None:
+        shared.maybe_flush()
+    return response
+
+
+def metrics_view():
+    text = shared.render() if shared is not None else registry.render()
+    return Response(text, mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app, directory=None, flush_interval=5.0):
+    """Time every request of the app and its blueprints and serve GET /metrics.
+
+    Without ``directory`` /metrics reports only the worker that answers it;
+    with it every worker's metrics are summed (see SharedSnapshots).
+    """
+    global shared
+    if directory:
+        shared = SharedSnapshots(registry, directory, flush_interval)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
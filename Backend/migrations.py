@@ -0,0 +1,264 @@
+"""Versioned schema migrations.
+
+Run once per deployment, before the workers start:
+
+    python -m Backend.migrations           apply pending migrations
+    python -m Backend.migrations --status  list applied and pending versions
+
+gunicorn runs them from its master process on startup (see gunicorn.conf.py)
+unless MIGRATE_ON_START is off. A Postgres advisory lock serialises runners,
+so replicas starting together apply each migration exactly once.
+"""
+import argparse
+import logging
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+import psycopg2
+from Backend.config import Config
+from Backend.ingest import LINK_KEY_SQL
+
+logger = logging.getLogger(__name__)
+
+# Key of the Postgres advisory lock held while migrating
+MIGRATION_LOCK_KEY = zlib.crc32(b"newscraper:migrations")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple
+    # CREATE INDEX CONCURRENTLY and friends cannot run inside a transaction
+    transactional: bool = True
+
+
+# Versions 1-5 are the schema the app used to create on import. They keep
+# their IF NOT EXISTS guards so databases created that way migrate cleanly.
+MIGRATIONS = [
+    Migration(1, "create news, favArt and pokemon", (
+        '''CREATE TABLE IF NOT EXISTS news (
+             id SERIAL PRIMARY KEY,
+             headline TEXT NOT NULL,
+             summary TEXT NOT NULL,
+             link TEXT NOT NULL)''',
+        '''CREATE TABLE IF NOT EXISTS favArt (
+             id SERIAL PRIMARY KEY,
+             username TEXT NOT NULL,
+             news_id INTEGER NOT NULL,
+             FOREIGN KEY (news_id) REFERENCES news(id) ON DELETE CASCADE)''',
+        '''CREATE TABLE IF NOT EXISTS pokemon (
+             id SERIAL PRIMARY KEY,
+             username TEXT NOT NULL,
+             pokemonName TEXT NOT NULL,
+             image TEXT NOT NULL)''',
+    )),
+    # Normalized link used to de-duplicate scraped articles. Legacy duplicates
+    # keep a NULL key; only the oldest row per link is backfilled.
+    Migration(2, "de-duplicate news by normalized link", (
+        '''ALTER TABLE news ADD COLUMN IF NOT EXISTS link_key TEXT''',
+        f'''UPDATE news SET link_key = keyed.link_key
+            FROM (SELECT DISTINCT ON ({LINK_KEY_SQL}) id, {LINK_KEY_SQL} AS link_key
+                  FROM news
+                  ORDER BY {LINK_KEY_SQL}, id) AS keyed
+            WHERE news.id = keyed.id AND news.link_key IS NULL AND keyed.link_key IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM news other WHERE other.link_key = keyed.link_key)''',
+        '''CREATE UNIQUE INDEX IF NOT EXISTS news_link_key_idx ON news (link_key)''',
+    )),
+    # Trigram index backing the case-insensitive keyword match in /headlines,
+    # and the stored keyword topics it matches against
+    Migration(3, "headline trigram index and topics", (
+        '''CREATE EXTENSION IF NOT EXISTS pg_trgm''',
+        '''CREATE INDEX IF NOT EXISTS news_headline_trgm_idx ON news USING gin (headline gin_trgm_ops)''',
+        '''CREATE TABLE IF NOT EXISTS topics (
+             name TEXT PRIMARY KEY,
+             keywords TEXT[] NOT NULL)''',
+        '''INSERT INTO topics (name, keywords) VALUES ('default', ARRAY['Trump', 'America', 'DOGE'])
+           ON CONFLICT (name) DO NOTHING''',
+    )),
+    # news_fts mirrors news through a trigger; rows written before the
+    # trigger existed are backfilled
+    Migration(4, "news_fts table kept in sync by trigger", (
+        '''CREATE TABLE IF NOT EXISTS news_fts (
+             id INT PRIMARY KEY,
+             headline TEXT,
+             summary TEXT,
+             link TEXT)''',
+        '''CREATE INDEX IF NOT EXISTS headline_idx ON news_fts USING gin (headline gin_trgm_ops)''',
+        '''CREATE INDEX IF NOT EXISTS summary_idx ON news_fts USING gin (summary gin_trgm_ops)''',
+        '''CREATE OR REPLACE FUNCTION sync_news_fts() RETURNS trigger AS $$
+           BEGIN
+               IF TG_OP = 'DELETE' THEN
+                   DELETE FROM news_fts WHERE id = OLD.id;
+                   RETURN OLD;
+               END IF;
+               INSERT INTO news_fts (id, headline, summary, link)
+               VALUES (NEW.id, NEW.headline, NEW.summary, NEW.link)
+               ON CONFLICT (id) DO UPDATE
+               SET headline = EXCLUDED.headline, summary = EXCLUDED.summary, link = EXCLUDED.link;
+               RETURN NEW;
+           END
+           $$ LANGUAGE plpgsql''',
+        '''DO $$
+           BEGIN
+               IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'news_fts_sync') THEN
+                   CREATE TRIGGER news_fts_sync
+                   AFTER INSERT OR UPDATE OF headline, summary, link OR DELETE ON news
+                   FOR EACH ROW EXECUTE FUNCTION sync_news_fts();
+               END IF;
+           END
+           $$''',
+        '''INSERT INTO news_fts (id, headline, summary, link)
+           SELECT id, headline, summary, link FROM news
+           ON CONFLICT (id) DO NOTHING''',
+        '''DELETE FROM news_fts WHERE NOT EXISTS (SELECT 1 FROM news WHERE news.id = news_fts.id)''',
+    )),
+    # Ranked full-text search runs on generated tsvector columns with GIN indexes
+    Migration(5, "tsvector columns for ranked search", (
+        '''ALTER TABLE news ADD COLUMN IF NOT EXISTS headline_tsv tsvector
+           GENERATED ALWAYS AS (to_tsvector('english', headline)) STORED''',
+        '''ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_tsv tsvector
+           GENERATED ALWAYS AS (to_tsvector('english', summary)) STORED''',
+        '''CREATE INDEX IF NOT EXISTS news_headline_tsv_idx ON news USING gin (headline_tsv)''',
+        '''CREATE INDEX IF NOT EXISTS news_summary_tsv_idx ON news USING gin (summary_tsv)''',
+    )),
+    # /favorites/<username> filters by username and joins on news_id, /addFavorites
+    # relies on (username, news_id) being unique and /editHeadline matches on headline
+    Migration(6, "favorites and headline indexes, unique favorites", (
+        # Keep the oldest of any favorites saved twice before the constraint existed
+        '''DELETE FROM favArt duplicate USING favArt original
+           WHERE duplicate.username = original.username AND duplicate.news_id = original.news_id
+             AND duplicate.id > original.id''',
+        # The unique index also serves lookups by username alone (leading column)
+        '''CREATE UNIQUE INDEX IF NOT EXISTS favart_username_news_id_key ON favArt (username, news_id)''',
+        '''DO $$
+           BEGIN
+               IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'favart_username_news_id_key') THEN
+                   ALTER TABLE favArt ADD CONSTRAINT favart_username_news_id_key
+                   UNIQUE USING INDEX favart_username_news_id_key;
+               END IF;
+           END
+           $$''',
+        # Joins from news and the ON DELETE CASCADE look favorites up by news_id
+        '''CREATE INDEX IF NOT EXISTS favart_news_id_idx ON favArt (news_id)''',
+        # Equality only; a hash index has no btree row-size limit for long headlines
+        '''CREATE INDEX IF NOT EXISTS news_headline_hash_idx ON news USING hash (headline)''',
+        '''ANALYZE favArt''',
+    )),
+    # Keyset pages of /favorites/<username>?limit= are read in id order per user
+    Migration(7, "favorites keyset index", (
+        '''CREATE INDEX IF NOT EXISTS favart_username_id_idx ON favArt (username, id)''',
+    )),
+    # /getPokemon?username= filters by user and reads in id order
+    Migration(8, "pokemon username index", (
+        '''CREATE INDEX IF NOT EXISTS pokemon_username_id_idx ON pokemon (username, id)''',
+    )),
+    # /search reads the tsvector columns of version 5; nothing reads news_fts any
+    # more, so stop paying a row and two trigram index entries on every news write
+    Migration(9, "drop news_fts and its sync trigger", (
+        '''DROP TRIGGER IF EXISTS news_fts_sync ON news''',
+        '''DROP FUNCTION IF EXISTS sync_news_fts()''',
+        '''DROP TABLE IF EXISTS news_fts''',
+    )),
+]
+
+
+def _check(migrations):
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise ValueError("Migration versions must be unique and in ascending order")
+
+
+def _applied(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS schema_migrations (
+                        version INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                        duration REAL)''')
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _apply(connection, cursor, migration):
+    start = time.perf_counter()
+    if migration.transactional:
+        connection.autocommit = False
+    try:
+        for statement in migration.statements:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO schema_migrations (version, name, duration) VALUES (%s, %s, %s)",
+                       (migration.version, migration.name, time.perf_counter() - start))
+        if migration.transactional:
+            connection.commit()
+    except Exception:
+        if migration.transactional:
+            connection.rollback()
+        raise
+    finally:
+        connection.autocommit = True
+    return time.perf_counter() - start
+
+
+def migrate(dsn, migrations=MIGRATIONS, connect=psycopg2.connect, lock_key=MIGRATION_LOCK_KEY):
+    """Apply pending migrations in version order and return the versions applied.
+
+    Blocks while another process holds the migration lock, then re-reads
+    what that process applied, so concurrent callers never repeat work.
+    """
+    _check(migrations)
+    connection = connect(dsn)
+    try:
+        connection.autocommit = True
+        cursor = connection.cursor()
+        cursor.execute("SELECT pg_advisory_lock(%s)", (lock_key,))
+        try:
+            applied = _applied(cursor)
+            done = []
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                seconds = _apply(connection, cursor, migration)
+                logger.info("Applied migration %s (%s) in %.2fs", migration.version, migration.name, seconds)
+                done.append(migration.version)
+            return done
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (lock_key,))
+    finally:
+        connection.close()
+
+
+def status(dsn, migrations=MIGRATIONS, connect=psycopg2.connect):
+    """Return (applied, pending) migration lists without changing anything but the bookkeeping table."""
+    connection = connect(dsn)
+    try:
+        connection.autocommit = True
+        applied = _applied(connection.cursor())
+    finally:
+        connection.close()
+    return ([migration for migration in migrations if migration.version in applied],
+            [migration for migration in migrations if migration.version not in applied])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--dsn", default=Config.DATABASE_URL)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.status:
+        applied, pending = status(args.dsn)
+        for migration in applied:
+            print(f"  applied  {migration.version:4}  {migration.name}")
+        for migration in pending:
+            print(f"  pending  {migration.version:4}  {migration.name}")
+        return 1 if pending else 0
+
+    done = migrate(args.dsn)
+    print(f"Applied {len(done)} migration(s)" + (f": {', '.join(map(str, done))}" if done else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+try:
+    # selectolax 1.0 dropped the Modest backend in favour of Lexbor
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+# Selectors that are a bare tag name can be handled by SoupStrainer and the streaming parser
+_TAG_NAME = re.compile(r"^[a-zA-Z][a-zA-Z0-9]*$")
+
+
+def is_tag_selector(selector):
+    return bool(_TAG_NAME.match(selector))
+
+
+def _soup_articles(html, source, features):
+    # Only build a tree for the article blocks when the selector allows it
+    if is_tag_selector(source.article_selector):
+        soup = BeautifulSoup(html, features, parse_only=SoupStrainer(source.article_selector))
+    else:
+        soup = BeautifulSoup(html, features)
+    for article in soup.select(source.article_selector):
+        headline = article.select_one(source.headline_selector)
+        summary = article.select_one(source.summary_selector)
+        link = article.select_one(source.link_selector)
+        yield (headline.get_text() if headline else None,
+               summary.get_text() if summary else None,
+               link.get('href') if link else None)
+
+
+def parse_html_parser(html, source):
+    return _soup_articles(html, source, "html.parser")
+
+
+def parse_lxml(html, source):
+    return _soup_articles(html, source, "lxml")
+
+
+def parse_selectolax(html, source):
+    tree = SelectolaxParser(html)
+    for article in tree.css(source.article_selector):
+        headline = article.css_first(source.headline_selector)
+        summary = article.css_first(source.summary_selector)
+        link = article.css_first(source.link_selector)
+        yield (headline.text(deep=True) if headline else None,
+               summary.text(deep=True) if summary else None,
+               link.attributes.get('href') if link else None)
+
+
+class _ArticleStreamParser(HTMLParser):
+    """Event-driven extractor that never builds a tree.
+
+    Collects the text of the first headline and summary element and the href
+    of the first link inside each article element. Only bare tag-name
+    selectors are supported.
+    """
+
+    def __init__(self, source):
+        super().__init__(convert_charrefs=True)
+        self.article_tag = source.article_selector.lower()
+        self.headline_tag = source.headline_selector.lower()
+        self.summary_tag = source.summary_selector.lower()
+        self.link_tag = source.link_selector.lower()
+        self.completed = []
+        self._depth = 0
+        self._reset_article()
+
+    def _reset_article(self):
+        self._headline = self._summary = self._link = None
+        self._capturing = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag == self.article_tag:
+            self._depth += 1
+            if self._depth == 1:
+                self._reset_article()
+            return
+        if not self._depth:
+            return
+        if tag == self.headline_tag and self._headline is None and self.headline_tag not in self._capturing:
+            self._capturing[self.headline_tag] = []
+        if tag == self.summary_tag and self._summary is None and self.summary_tag not in self._capturing:
+            self._capturing[self.summary_tag] = []
+        if tag == self.link_tag and self._link is None:
+            self._link = dict(attrs).get('href') or ""
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag == self.article_tag:
+            self._depth -= 1
+            if self._depth == 0:
+                self._finish_captures()
+                self.completed.append((self._headline, self._summary, self._link or None))
+            return
+        if tag in self._capturing:
+            self._finish_capture(tag)
+
+    def _finish_capture(self, tag):
+        text = "".join(self._capturing.pop(tag))
+        if tag == self.headline_tag and self._headline is None:
+            self._headline = text
+        if tag == self.summary_tag and self._summary is None:
+            self._summary = text
+
+    def _finish_captures(self):
+        for tag in list(self._capturing):
+            self._finish_capture(tag)
+
+    def handle_data(self, data):
+        for parts in self._capturing.values():
+            parts.append(data)
+
+
+def parse_stream(html, source, chunk_size=64 * 1024):
+    """Feed the page in chunks; ``html`` may be bytes, str or an iterable of chunks."""
+    if not all(is_tag_selector(selector) for selector in (source.article_selector, source.headline_selector,
+                                                          source.summary_selector, source.link_selector)):
+        raise ValueError("The stream parser only supports tag-name selectors")
+    if isinstance(html, (bytes, str)):
+        chunks = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+    else:
+        chunks = html
+    parser = _ArticleStreamParser(source)
+    # Incremental decoding keeps multi-byte characters split across chunks intact
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        parser.feed(chunk)
+        # Hand out finished articles as soon as they are complete
+        yield from parser.completed
+        parser.completed.clear()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    yield from parser.completed
+
+
+PARSERS = {
+    "html.parser": parse_html_parser,
+    "stream": parse_stream,
+}
+if HAVE_LXML:
+    PARSERS["lxml"] = parse_lxml
+if SelectolaxParser is not None:
+    PARSERS["selectolax"] = parse_selectolax
+
+
+def default_parser():
+    """Fastest installed backend: selectolax, then lxml, then the stdlib html.parser."""
+    for name in ("selectolax", "lxml", "html.parser"):
+        if name in PARSERS:
+            return name
+
+
+def get_parser(name=None):
+    """Return the parse function for a backend name ('auto' or None picks the fastest)."""
+    if not name or name == "auto":
+        name = default_parser()
+    try:
+        return PARSERS[name]
+    except KeyError:
+        raise ValueError(f"Parser '{name}' is not available; installed: {', '.join(sorted(PARSERS))}") from None
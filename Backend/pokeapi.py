@@ -0,0 +1,162 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import closing
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+from Backend.metrics import instrument_session, record_outbound_error
+
+logger = logging.getLogger(__name__)
+
+
+class PokeApiError(Exception):
+    """The PokeAPI could not be reached or returned an unexpected response."""
+
+
+class PokeApiClient:
+    """Looks up Pokémon through a memory cache, a SQLite cache and the PokeAPI.
+
+    Only the projected ``{"pokemonName", "image"}`` record is cached. Unknown
+    names are cached too (as None) for ``negative_ttl`` seconds. Concurrent
+    misses for the same name share a single upstream request.
+    """
+
+    def __init__(self, base_url, store_path=None, ttl=86400, negative_ttl=3600,
+                 timeout=(3.05, 10), max_entries=1024, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.store_path = store_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.session = session or self._make_session()
+        self._memory = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "store_hits": 0, "upstream_calls": 0, "coalesced": 0}
+        if store_path:
+            with closing(self._connect()) as connection:
+                connection.execute('''CREATE TABLE IF NOT EXISTS pokeapi_cache (
+                                        name TEXT PRIMARY KEY,
+                                        pokemon_name TEXT,
+                                        image TEXT,
+                                        expires REAL NOT NULL)''')
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return instrument_session(session)
+
+    def _connect(self):
+        return sqlite3.connect(self.store_path, timeout=10, isolation_level=None)
+
+    def _remember(self, name, record, expires):
+        with self._lock:
+            self._memory[name] = (expires, record)
+            self._memory.move_to_end(name)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _from_memory(self, name):
+        with self._lock:
+            entry = self._memory.get(name)
+            if entry is None:
+                return False, None
+            expires, record = entry
+            if expires <= time.time():
+                del self._memory[name]
+                return False, None
+            self._memory.move_to_end(name)
+            self.stats["memory_hits"] += 1
+            return True, record
+
+    def _from_store(self, name):
+        if not self.store_path:
+            return False, None
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute('SELECT pokemon_name, image, expires FROM pokeapi_cache WHERE name = ?',
+                                         (name,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("PokeAPI cache read failed: %s", e)
+            return False, None
+        if row is None or row[2] <= time.time():
+            return False, None
+        record = {"pokemonName": row[0], "image": row[1]} if row[0] is not None else None
+        self._remember(name, record, row[2])
+        with self._lock:
+            self.stats["store_hits"] += 1
+        return True, record
+
+    def _save(self, name, record, expires):
+        self._remember(name, record, expires)
+        if not self.store_path:
+            return
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute('INSERT OR REPLACE INTO pokeapi_cache (name, pokemon_name, image, expires) VALUES (?, ?, ?, ?)',
+                                   (name, record["pokemonName"] if record else None, record["image"] if record else None, expires))
+        except sqlite3.Error as e:
+            logger.warning("PokeAPI cache write failed: %s", e)
+
+    def _fetch(self, name):
+        with self._lock:
+            self.stats["upstream_calls"] += 1
+        try:
+            response = self.session.get(f"{self.base_url}/pokemon/{quote(name, safe='')}", timeout=self.timeout)
+        except requests.RequestException as e:
+            record_outbound_error(self.base_url, e)
+            raise PokeApiError(f"PokeAPI request failed: {e}") from e
+
+        if response.status_code == 404:
+            return None, self.negative_ttl
+        if response.status_code != 200:
+            raise PokeApiError(f"PokeAPI returned HTTP {response.status_code}")
+
+        try:
+            data = response.json()
+            return {"pokemonName": data['name'], "image": data['sprites']['front_default']}, self.ttl
+        except (ValueError, KeyError, TypeError) as e:
+            # A 200 that is not a Pokemon, e.g. the list endpoint or an error page
+            raise PokeApiError(f"PokeAPI returned an unexpected response: {e!r}") from e
+
+    def lookup(self, name):
+        """Return the {"pokemonName", "image"} record for name, or None if it doesn't exist."""
+        name = name.strip().lower()
+        if not name:
+            # /pokemon/ is PokeAPI's list endpoint, not a lookup
+            raise ValueError("Pokemon name must not be blank")
+        found, record = self._from_memory(name)
+        if found:
+            return record
+
+        with self._lock:
+            future = self._in_flight.get(name)
+            leader = future is None
+            if leader:
+                future = self._in_flight[name] = Future()
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            found, record = self._from_store(name)
+            if not found:
+                record, ttl = self._fetch(name)
+                self._save(name, record, time.time() + ttl)
+            future.set_result(record)
+            return record
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[name]
@@ -1,60 +1,43 @@
 from flask import Blueprint, request, jsonify
-import requests
-import psycopg2
 import logging
+from Backend.db import get_db_connection
+from Backend.cache import cached, invalidate
 from Backend.config import Config
+from Backend.pokeapi import PokeApiClient, PokeApiError
+from Backend.streaming import stream_json, stream_rows, wants_ndjson
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 pokemon = Blueprint('pokemon', __name__)
 
-def get_db_connection():
-    connection = psycopg2.connect(Config.DATABASE_URL)
-    return connection
-
-# Function to create the Pokemon table if it doesn't exist
-def create_add_Pokemon():
-    connection = get_db_connection()
-    cursor = connection.cursor()
-    # Create the Pokemon table
-    cursor.execute('''CREATE TABLE IF NOT EXISTS pokemon (
-                        id SERIAL PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        pokemonName TEXT NOT NULL,
-                        image TEXT NOT NULL)''')
-    connection.commit()
-    connection.close()
-    logger.debug("Pokemon table created or already exists.")
-
-# Call the function to initialize the database
-create_add_Pokemon()
-
 base_url = "https://pokeapi.co/api/v2"
 
+# Cached, coalescing PokeAPI client shared by all requests in this worker
+pokeapi = PokeApiClient(
+    base_url,
+    store_path=Config.POKEAPI_CACHE_PATH,
+    ttl=Config.POKEAPI_CACHE_TTL,
+    negative_ttl=Config.POKEAPI_NEGATIVE_TTL,
+    timeout=(Config.POKEAPI_CONNECT_TIMEOUT, Config.POKEAPI_READ_TIMEOUT),
+)
+
 # Route to get Pokemon details from the API
 @pokemon.route('/catchEm', methods=["GET"])
 def get_Pokemon():
-    name = request.args.get('name')
+    name = request.args.get('name', '').strip()
     if not name:
         logger.error("Missing 'name' parameter")
         return jsonify({"error": "Missing 'name' parameter"}), 400
 
-    url = f'{base_url}/pokemon/{name.lower()}'
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        data = response.json()
-
-        pokemon_name = data['name']
-        image_url = data['sprites']['front_default']
+    try:
+        record = pokeapi.lookup(name)
+    except PokeApiError as e:
+        logger.error("PokeAPI lookup failed: %s", e)
+        return jsonify({"error": "Pokemon service unavailable"}), 502
 
-        logger.debug(f"Pokemon {pokemon_name} details fetched successfully.")
-        return jsonify({
-            "pokemonName": pokemon_name,
-            "image": image_url
-        })
+    if record is not None:
+        logger.debug("Pokemon %s details fetched successfully.", record['pokemonName'])
+        return jsonify(record)
     else:
         logger.error("Pokemon not found")
         return jsonify({"error": "Pokemon not found"}), 404
@@ -77,8 +60,9 @@ def save_Pokemon():
                       VALUES (%s, %s, %s)''', (username, pokemonName, image))
     connection.commit()
     connection.close()
+    invalidate("pokemon")
 
-    logger.debug(f"Pokemon {pokemonName} saved successfully.")
+    logger.debug("Pokemon %s saved successfully.", pokemonName)
     return jsonify({"message": "Pokemon saved successfully"}), 201
 
 # Route to update a Pokemon in the database
@@ -100,8 +84,9 @@ def update_Pokemon(id):
                       WHERE id = %s''', (username, pokemonName, image, id))
     connection.commit()
     connection.close()
+    invalidate("pokemon")
 
-    logger.debug(f"Pokemon with ID {id} updated successfully.")
+    logger.debug("Pokemon with ID %s updated successfully.", id)
     return jsonify({"message": "Pokemon updated successfully"}), 200
 
 # Route to delete a Pokemon from the database
@@ -112,30 +97,83 @@ def delete_Pokemon(id):
     cursor.execute('DELETE FROM pokemon WHERE id = %s', (id,))
     connection.commit()
     connection.close()
+    invalidate("pokemon")
 
-    logger.debug(f"Pokemon with ID {id} deleted successfully.")
+    logger.debug("Pokemon with ID %s deleted successfully.", id)
     return jsonify({"message": "Pokemon deleted successfully"}), 200
 
+# Fields /getPokemon can return; they double as the column names
+POKEMON_FIELDS = ("id", "username", "pokemonName", "image")
+
+# Upper bound for page sizes
+MAX_PAGE_SIZE = 100
+
 # Route to get all Pokemon from the database
 @pokemon.route('/getPokemon', methods=["GET"])
+@cached(tags=["pokemon"])
 def get_all_Pokemon():
+    """Saved Pokemon, optionally only one user's (``username=``).
+
+    ``fields=id,pokemonName`` limits the fields returned. With ``limit`` (and
+    ``after=<next_cursor>``) results come a page at a time in id order.
+    ``format=ndjson`` streams every row after ``after`` from a server-side
+    cursor instead, so memory stays flat however large the table grows; the
+    plain list stays buffered so it keeps its ETag and cache entry.
+    """
+    fields = request.args.get('fields')
+    fields = fields.split(',') if fields else list(POKEMON_FIELDS)
+    unknown = [field for field in fields if field not in POKEMON_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+    username = request.args.get('username')
+    paginate = 'limit' in request.args or 'after' in request.args
+    after = request.args.get('after', 0, type=int)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_PAGE_SIZE)
+
+    conditions = []
+    params = []
+    if username:
+        # Served by the (username, id) index, which also keeps the id order
+        conditions.append("username = %s")
+        params.append(username)
+    if 'after' in request.args:
+        conditions.append("id > %s")
+        params.append(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # id is always read since it is the pagination cursor
+    columns = ["id"] + [field for field in fields if field != "id"]
+    positions = [(field, columns.index(field)) for field in fields]
+    query = f"SELECT {', '.join(columns)} FROM pokemon {where} ORDER BY id"
+
+    def to_item(row):
+        return {field: row[position] for field, position in positions}
+
     connection = get_db_connection()
+    if wants_ndjson():
+        logger.debug("Streaming Pokemon from the database.")
+        return stream_json(to_item(row) for row in stream_rows(connection, query, params))
+
     cursor = connection.cursor()
-    cursor.execute('SELECT * FROM pokemon')
+    if paginate:
+        # Fetch one extra row to know whether there is a next page
+        cursor.execute(query + " LIMIT %s", params + [limit + 1])
+        rows = cursor.fetchall()
+        connection.close()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        logger.debug("Fetched %s Pokemon from the database.", len(rows))
+        return jsonify({
+            "pokemon": [to_item(row) for row in rows],
+            "limit": limit,
+            "next_cursor": rows[-1][0] if has_more else None,
+        }), 200
+
+    cursor.execute(query, params)
     rows = cursor.fetchall()
     connection.close()
-
-    pokemons = []
-    for row in rows:
-        pokemons.append({
-            "id": row[0],
-            "username": row[1],
-            "pokemonName": row[2],
-            "image": row[3]
-        })
-
     logger.debug("Fetched all Pokemon from the database.")
-    return jsonify(pokemons), 200
+    return jsonify([to_item(row) for row in rows]), 200
 
 # Route to change the profile photo of a Pokemon
 @pokemon.route('/changeProfile', methods=["PUT"])
@@ -165,10 +203,11 @@ def profile_photo():
     ''', (image, pokemon_id))
     connection.commit()
     connection.close()
+    invalidate("pokemon")
 
     if cursor.rowcount == 0:
         logger.error("Pokemon not found in profile_photo update")
         return jsonify({"error": "Pokemon not found"}), 404
 
-    logger.debug(f"Profile photo for Pokemon with ID {pokemon_id} updated successfully.")
+    logger.debug("Profile photo for Pokemon with ID %s updated successfully.", pokemon_id)
     return jsonify({"message": "Profile photo updated successfully"}), 200
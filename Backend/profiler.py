@@ -0,0 +1,180 @@
+import logging
+import re
+import threading
+import time
+from collections.abc import Mapping
+from flask import g, has_request_context, jsonify, request
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Statements EXPLAIN accepts; DDL and transaction control are never explained
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with", "values")
+
+
+def sql_text(cursor, query):
+    """The statement as one line, whatever form it was passed in."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        # psycopg2.sql.Composable
+        query = query.as_string(cursor)
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def param_shape(vars, many=False):
+    """Describe the parameters by type only, so values never reach the logs."""
+    if many:
+        # Generators are used up by the time the statement has run
+        if not isinstance(vars, (list, tuple)):
+            return {"rows": None, "row": None}
+        return {"rows": len(vars), "row": param_shape(vars[0]) if vars else None}
+    if vars is None:
+        return None
+    if isinstance(vars, Mapping):
+        return {key: type(value).__name__ for key, value in vars.items()}
+    return [type(value).__name__ for value in vars]
+
+
+class QueryProfiler:
+    """Times statements per request and logs the slow ones with their plan.
+
+    Disabled until ``enabled`` is set; the database cursor then reports every
+    statement through observe(). Inside a request each query's SQL, parameter
+    shape, duration and row count is kept on ``g`` and can be returned as a
+    Server-Timing header. Statements slower than ``slow_threshold`` seconds
+    are logged, with their EXPLAIN plan when ``explain`` is set, in or out of
+    a request. Totals per statement are kept for /queryStats.
+    """
+
+    def __init__(self, enabled=False, slow_threshold=0.2, explain=True, server_timing=False,
+                 max_request_queries=200, max_statements=500, max_sql_length=1000):
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.explain = explain
+        self.server_timing = server_timing
+        self.max_request_queries = max_request_queries
+        self.max_statements = max_statements
+        self.max_sql_length = max_sql_length
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def observe(self, cursor, query, vars, seconds, many=False):
+        if not self.enabled:
+            return
+        sql = sql_text(cursor, query)[:self.max_sql_length]
+        rows = cursor.rowcount
+        entry = {"sql": sql, "params": param_shape(vars, many), "duration": round(seconds, 6), "rows": rows}
+
+        with self._lock:
+            totals = self._statements.get(sql)
+            if totals is None and len(self._statements) < self.max_statements:
+                totals = self._statements[sql] = {"calls": 0, "total": 0.0, "max": 0.0, "rows": 0, "slow": 0}
+            if totals is not None:
+                totals["calls"] += 1
+                totals["total"] += seconds
+                totals["max"] = max(totals["max"], seconds)
+                totals["rows"] += max(rows, 0)
+                totals["slow"] += seconds >= self.slow_threshold
+
+        if has_request_context():
+            g._profile_db_time = g.get("_profile_db_time", 0.0) + seconds
+            g._profile_db_queries = g.get("_profile_db_queries", 0) + 1
+            queries = g.setdefault("_profile_queries", [])
+            if len(queries) < self.max_request_queries:
+                queries.append(entry)
+
+        if seconds >= self.slow_threshold:
+            plan = self._explain(cursor, query, vars) if self.explain and not many else None
+            logger.warning("Slow query (%.1f ms, %s rows) on %s: %s params=%s%s", seconds * 1000, rows,
+                           request.path if has_request_context() else "-", sql, entry["params"],
+                           "\n" + plan if plan else "")
+
+    def _explain(self, cursor, query, vars):
+        if sql_text(cursor, query).split(" ", 1)[0].lower() not in _EXPLAINABLE:
+            return None
+        connection = cursor.connection
+        status = connection.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_INERROR:
+            return None
+        # Inside a transaction a failing EXPLAIN would abort the handler's work
+        in_transaction = status == extensions.TRANSACTION_STATUS_INTRANS
+        # A plain cursor, so the EXPLAIN is neither profiled nor counted in the metrics
+        explain_cursor = connection.cursor(cursor_factory=extensions.cursor)
+        try:
+            if in_transaction:
+                explain_cursor.execute("SAVEPOINT query_profiler")
+            explain_cursor.execute(b"EXPLAIN " + explain_cursor.mogrify(query, vars))
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            if in_transaction:
+                explain_cursor.execute("RELEASE SAVEPOINT query_profiler")
+            return plan
+        except Exception as e:
+            logger.debug("EXPLAIN failed: %s", e)
+            if in_transaction:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT query_profiler")
+            return None
+        finally:
+            explain_cursor.close()
+
+    def request_queries(self):
+        """The queries recorded for the current request (the first max_request_queries)."""
+        return g.get("_profile_queries", [])
+
+    def stats(self, limit=50):
+        """Statements by total time, slowest first."""
+        with self._lock:
+            statements = [dict(totals, sql=sql) for sql, totals in self._statements.items()]
+        statements.sort(key=lambda item: item["total"], reverse=True)
+        for item in statements:
+            item["avg"] = round(item["total"] / item["calls"], 6)
+            item["total"] = round(item["total"], 6)
+            item["max"] = round(item["max"], 6)
+        return {"enabled": self.enabled, "slow_threshold": self.slow_threshold,
+                "statements": len(statements), "top": statements[:limit]}
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+
+profiler = QueryProfiler()
+
+
+def _before_request():
+    if profiler.enabled:
+        g._profile_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = g.pop("_profile_start", None)
+    if start is None:
+        return response
+    count = g.get("_profile_db_queries", 0)
+    db_ms = g.get("_profile_db_time", 0.0) * 1000
+    total_ms = (time.perf_counter() - start) * 1000
+    logger.debug("%s %s: %d queries in %.1f ms of %.1f ms", request.method, request.path, count, db_ms, total_ms)
+    if profiler.server_timing:
+        response.headers.add("Server-Timing", f'db;dur={db_ms:.1f};desc="{count} queries", app;dur={total_ms:.1f}')
+    return response
+
+
+def query_stats_view():
+    try:
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify(profiler.stats(limit)), 200
+
+
+def init_app(app, enabled=False, slow_threshold=0.2, explain=True, server_timing=False, serve_stats=False):
+    """Turn the profiler on for the app; with ``serve_stats`` serve per-statement totals at GET /queryStats."""
+    profiler.enabled = enabled
+    profiler.slow_threshold = slow_threshold
+    profiler.explain = explain
+    profiler.server_timing = server_timing
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if serve_stats:
+        app.add_url_rule("/queryStats", "query_stats", query_stats_view)
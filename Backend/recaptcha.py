@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+import requests
+from requests.adapters import HTTPAdapter
+from Backend.metrics import instrument_session, record_outbound_error
+
+logger = logging.getLogger(__name__)
+
+RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RecaptchaUnavailable(Exception):
+    """reCAPTCHA could not be reached, timed out, or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream for ``reset_timeout`` seconds.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast. Once the timeout passes a single trial call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning("reCAPTCHA circuit opened after %s failures", self.failures)
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+
+class RecaptchaVerifier:
+    """Checks reCAPTCHA tokens against siteverify over a keep-alive session.
+
+    Calls are bounded by ``timeout`` (connect, read) and guarded by a
+    CircuitBreaker. Rejections are cached by token hash for ``cache_ttl``
+    seconds, so a client retrying a bad token does not reach Google again.
+    Successes are never cached: a solved token is single-use and must not
+    pass twice.
+    """
+
+    def __init__(self, secret, url=RECAPTCHA_VERIFY_URL, session=None, timeout=(3.05, 5),
+                 cache_ttl=120, max_entries=1024, breaker=None, latency_samples=1000):
+        self.secret = secret
+        self.url = url
+        self.session = session or self._make_session()
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.breaker = breaker or CircuitBreaker()
+        self._cache = OrderedDict()
+        self._latencies = deque(maxlen=latency_samples)
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "cache_hits": 0, "upstream_calls": 0, "failures": 0, "short_circuits": 0}
+
+    @staticmethod
+    def _make_session():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return instrument_session(session)
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, result = entry
+            if expires <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            self._counters["cache_hits"] += 1
+            return result
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _call(self, token, remote_ip):
+        data = {"secret": self.secret, "response": token}
+        if remote_ip:
+            data["remoteip"] = remote_ip
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, data=data, timeout=self.timeout)
+            if response.status_code != 200:
+                raise RecaptchaUnavailable(f"siteverify returned HTTP {response.status_code}")
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            if isinstance(e, requests.RequestException):
+                record_outbound_error(self.url, e)
+            raise RecaptchaUnavailable(f"siteverify request failed: {e}") from e
+        finally:
+            with self._lock:
+                self._counters["upstream_calls"] += 1
+                self._latencies.append(time.perf_counter() - start)
+        return result
+
+    def verify(self, token, remote_ip=None):
+        """Return siteverify's JSON answer for token; raises RecaptchaUnavailable."""
+        with self._lock:
+            self._counters["requests"] += 1
+        key = hashlib.sha256(token.encode()).hexdigest()
+        result = self._cached(key)
+        if result is not None:
+            return result
+
+        if not self.breaker.allow():
+            with self._lock:
+                self._counters["short_circuits"] += 1
+            raise RecaptchaUnavailable("reCAPTCHA is unavailable, circuit open")
+        try:
+            result = self._call(token, remote_ip)
+        except RecaptchaUnavailable:
+            self.breaker.record_failure()
+            with self._lock:
+                self._counters["failures"] += 1
+            raise
+        self.breaker.record_success()
+        if not result.get("success"):
+            self._remember(key, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self._counters)
+        stats["circuit"] = self.breaker.state
+        stats["latency_samples"] = len(latencies)
+        if latencies:
+            stats["latency_avg"] = round(sum(latencies) / len(latencies), 6)
+            stats["latency_p50"] = round(latencies[len(latencies) // 2], 6)
+            stats["latency_p95"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 6)
+            stats["latency_max"] = round(latencies[-1], 6)
+        return stats
@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from dataclasses import asdict, dataclass
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+# Key of the Postgres advisory lock that elects the scheduling worker
+SCHEDULER_LOCK_KEY = zlib.crc32(b"newscraper:scrape-scheduler")
+
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+ERROR = "error"
+
+
+class AdvisoryLock:
+    """Session-level Postgres advisory lock held on a dedicated connection.
+
+    Whoever holds it stays leader until its connection drops, so exactly one
+    worker across all gunicorn processes and replicas schedules scrapes.
+    """
+
+    def __init__(self, dsn, key=SCHEDULER_LOCK_KEY, connect=psycopg2.connect):
+        self.dsn = dsn
+        self.key = key
+        self._connect = connect
+        self._connection = None
+        self._pid = os.getpid()
+        self.held = False
+
+    def _drop(self):
+        if self._connection is not None and self._pid == os.getpid():
+            try:
+                self._connection.close()
+            except psycopg2.Error:
+                pass
+        # A connection inherited through fork belongs to the parent; never touch it
+        self._connection = None
+        self._pid = os.getpid()
+        self.held = False
+
+    def acquire(self):
+        """Try to become (or confirm we still are) the leader. Never blocks."""
+        if self._pid != os.getpid():
+            self._drop()
+        try:
+            if self._connection is None:
+                self._connection = self._connect(self.dsn)
+                self._connection.autocommit = True
+            cursor = self._connection.cursor()
+            if self.held:
+                # Losing the connection releases the lock, so a live session means we still hold it
+                cursor.execute("SELECT 1")
+            else:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", (self.key,))
+                self.held = bool(cursor.fetchone()[0])
+            cursor.close()
+        except psycopg2.Error as e:
+            logger.warning("Scheduler lock check failed: %s", e)
+            self._drop()
+        return self.held
+
+    def release(self):
+        if self.held and self._connection is not None and self._pid == os.getpid():
+            try:
+                with self._connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (self.key,))
+            except psycopg2.Error as e:
+                logger.warning("Scheduler lock release failed: %s", e)
+        self._drop()
+
+
+@dataclass
+class SourceSchedule:
+    name: str
+    interval: float
+    next_run: float
+    last_run: float = None
+    last_duration: float = None
+    last_status: str = None
+    # Consecutive runs that found nothing new or failed; each doubles the interval
+    idle_runs: int = 0
+
+
+class ScheduleStore:
+    """Persists the leader's schedule in SQLite so every worker on the host can report it
+    and a new leader carries on where the old one stopped."""
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.execute('''CREATE TABLE IF NOT EXISTS scrape_schedule (
+                                    name TEXT PRIMARY KEY,
+                                    state TEXT NOT NULL)''')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def load(self):
+        with closing(self._connect()) as connection:
+            rows = connection.execute('SELECT state FROM scrape_schedule').fetchall()
+        return {schedule.name: schedule for schedule in (SourceSchedule(**json.loads(row[0])) for row in rows)}
+
+    def save(self, schedules):
+        with closing(self._connect()) as connection:
+            connection.executemany('INSERT OR REPLACE INTO scrape_schedule (name, state) VALUES (?, ?)',
+                                   [(schedule.name, json.dumps(asdict(schedule))) for schedule in schedules])
+
+
+class ScrapeScheduler:
+    """Runs ``run(source_names)`` for every source whose interval has elapsed.
+
+    Each source is rescheduled after ``interval * 2**idle_runs`` seconds
+    (capped at ``max_backoff`` times the interval) with +/- ``jitter`` spread,
+    where idle runs are consecutive runs that were unchanged or failed. Only the
+    holder of ``lock`` scrapes; the other workers just keep trying to take it.
+    ``run`` returns the run_scrape() summary, whose per-source ``error`` and
+    ``unchanged`` fields drive the backoff.
+    """
+
+    def __init__(self, run, sources, default_interval=900.0, jitter=0.1, max_backoff=8,
+                 lock=None, store=None, poll_interval=30.0, clock=time.time):
+        self.run = run
+        self.sources = sources
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.lock = lock
+        self.store = store
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.schedules = {}
+        self.leader = False
+        self.running = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _interval(self, source):
+        return source.interval or self.default_interval
+
+    def _delay(self, schedule):
+        factor = min(2 ** schedule.idle_runs, self.max_backoff)
+        return schedule.interval * factor * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _sync_sources(self, now):
+        """Pick up new sources and interval changes; a fresh leader resumes the stored schedule."""
+        if not self.schedules and self.store is not None:
+            try:
+                self.schedules = self.store.load()
+            except sqlite3.Error as e:
+                logger.warning("Could not load the scrape schedule: %s", e)
+        current = {source.name: source for source in self.sources()}
+        for name in list(self.schedules):
+            if name not in current:
+                del self.schedules[name]
+        for name, source in current.items():
+            schedule = self.schedules.get(name)
+            if schedule is None:
+                # Spread the first runs so sources do not all fire together
+                self.schedules[name] = SourceSchedule(
+                    name, self._interval(source), now + random.uniform(0, self.jitter * self._interval(source)))
+            else:
+                schedule.interval = self._interval(source)
+
+    def tick(self):
+        """Run the due sources if this worker is the leader. Returns the run summary or None."""
+        if self.lock is not None:
+            self.leader = self.lock.acquire()
+            if not self.leader:
+                self.schedules = {}
+                return None
+        else:
+            self.leader = True
+
+        now = self.clock()
+        with self._lock:
+            self._sync_sources(now)
+            due = sorted(name for name, schedule in self.schedules.items() if schedule.next_run <= now)
+        if not due:
+            return None
+
+        self.running = True
+        start = self.clock()
+        summary = None
+        try:
+            summary = self.run(due)
+        except Exception as e:
+            logger.error("Scheduled scrape of %s failed: %s", ', '.join(due), e)
+        finally:
+            self.running = False
+        finished = self.clock()
+
+        outcomes = {entry["source"]: entry for entry in (summary or {}).get("sources", [])}
+        with self._lock:
+            for name in due:
+                schedule = self.schedules[name]
+                entry = outcomes.get(name)
+                if entry is None or entry.get("error"):
+                    schedule.last_status = ERROR
+                elif entry.get("unchanged"):
+                    schedule.last_status = UNCHANGED
+                else:
+                    schedule.last_status = CHANGED
+                schedule.idle_runs = 0 if schedule.last_status == CHANGED else schedule.idle_runs + 1
+                schedule.last_run = start
+                schedule.last_duration = finished - start
+                schedule.next_run = finished + self._delay(schedule)
+            if self.store is not None:
+                try:
+                    self.store.save(list(self.schedules.values()))
+                except sqlite3.Error as e:
+                    logger.warning("Could not save the scrape schedule: %s", e)
+        return summary
+
+    def _seconds_until_next(self):
+        with self._lock:
+            if not self.leader or not self.schedules:
+                return self.poll_interval
+            next_run = min(schedule.next_run for schedule in self.schedules.values())
+        return max(0.0, min(self.poll_interval, next_run - self.clock()))
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error("Scrape scheduler tick failed: %s", e)
+            self._stop.wait(self._seconds_until_next())
+        if self.lock is not None:
+            self.lock.release()
+
+    def start(self):
+        """Start the scheduler thread; safe to call again, e.g. after a fork."""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop = threading.Event()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name="scrape-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    def status(self):
+        """Last run, next run and duration per source as seen by this worker.
+
+        Followers report the schedule the leader last stored, if there is a store.
+        """
+        with self._lock:
+            schedules = dict(self.schedules)
+        if not self.leader and self.store is not None:
+            try:
+                schedules = self.store.load()
+            except sqlite3.Error as e:
+                logger.warning("Could not load the scrape schedule: %s", e)
+        return {
+            "leader": self.leader,
+            "running": self.running,
+            "pid": os.getpid(),
+            "sources": [dict(asdict(schedule), backoff=min(2 ** schedule.idle_runs, self.max_backoff))
+                        for schedule in sorted(schedules.values(), key=lambda schedule: schedule.name)],
+        }
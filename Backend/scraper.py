@@ -0,0 +1,356 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import NamedTuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from Backend.metrics import instrument_session, record_outbound_error, record_scrape_stage
+from Backend.parsers import get_parser
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Newscraper/1.0 (+https://mai-newscraper.vercel.app)"
+
+
+@dataclass
+class Source:
+    """A page to scrape and the CSS selectors used to pull articles out of it."""
+    name: str
+    url: str
+    article_selector: str = "article"
+    headline_selector: str = "h2"
+    summary_selector: str = "p"
+    link_selector: str = "a"
+    timeout: float = None
+    parser: str = None
+    # Seconds between scheduled scrapes; None uses SCRAPE_INTERVAL
+    interval: float = None
+
+
+@dataclass
+class FetchState:
+    """Validators and hashes of the last stored fetch of a source URL."""
+    etag: str = None
+    last_modified: str = None
+    body_hash: str = None
+    articles_hash: str = None
+    size: int = 0
+    parse_time: float = 0.0
+
+
+@dataclass
+class SourceResult:
+    source: str
+    url: str
+    articles: list = field(default_factory=list)
+    status_code: int = None
+    error: str = None
+    attempts: int = 0
+    timings: dict = field(default_factory=dict)
+    # Set when the page or its articles match what was last stored; nothing needs writing
+    unchanged: bool = False
+    bytes: int = 0
+    saved_bytes: int = 0
+    saved_seconds: float = 0.0
+    state: FetchState = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+# Registry of the sources scraped by /scrape, keyed by name
+SOURCES = {}
+
+
+def register_source(source):
+    SOURCES[source.name] = source
+    return source
+
+
+def get_sources(names=None):
+    """Return the registered sources, optionally restricted to the given names."""
+    if not names:
+        return list(SOURCES.values())
+    missing = [name for name in names if name not in SOURCES]
+    if missing:
+        raise KeyError(f"Unknown source(s): {', '.join(missing)}")
+    return [SOURCES[name] for name in names]
+
+
+register_source(Source(name="atlantic", url="https://www.theatlantic.com/most-popular/"))
+
+
+class Article(NamedTuple):
+    """One scraped article. Missing summaries and links are empty strings."""
+    headline: str
+    summary: str
+    link: str
+
+
+def iter_articles(html, source, parser=None):
+    """Yield an Article per article block on the page, in a single pass.
+
+    ``parser`` names the backend (see Backend.parsers); the source's own
+    parser setting wins, and 'auto' picks the fastest one installed. Blocks
+    without a headline are skipped.
+    """
+    for headline, summary, link in get_parser(source.parser or parser)(html, source):
+        if headline:
+            yield Article(headline, summary or "", link or "")
+
+
+def extract_articles(html, source, parser=None):
+    """Return every Article on the page as a list."""
+    return list(iter_articles(html, source, parser))
+
+
+def hash_articles(articles):
+    """Order-sensitive fingerprint of an article set."""
+    digest = hashlib.sha1()
+    for article in articles:
+        digest.update("\x1f".join(article).encode())
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+class FetchStateStore:
+    """FetchState per source URL, in SQLite when a path is given, else in memory.
+
+    The SQLite file lets every worker on a host send the same conditional
+    request headers.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._memory = {}
+        self._lock = threading.Lock()
+        if path:
+            with closing(self._connect()) as connection:
+                connection.execute('''CREATE TABLE IF NOT EXISTS scrape_state (
+                                        url TEXT PRIMARY KEY,
+                                        etag TEXT,
+                                        last_modified TEXT,
+                                        body_hash TEXT,
+                                        articles_hash TEXT,
+                                        size INTEGER NOT NULL,
+                                        parse_time REAL NOT NULL)''')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def get(self, url):
+        if not self.path:
+            with self._lock:
+                return self._memory.get(url)
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute('''SELECT etag, last_modified, body_hash, articles_hash, size, parse_time
+                                            FROM scrape_state WHERE url = ?''', (url,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Scrape state read failed: %s", e)
+            return None
+        return FetchState(*row) if row else None
+
+    def put(self, url, state):
+        if not self.path:
+            with self._lock:
+                self._memory[url] = state
+            return
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute('''INSERT OR REPLACE INTO scrape_state
+                                      (url, etag, last_modified, body_hash, articles_hash, size, parse_time)
+                                      VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                                   (url, state.etag, state.last_modified, state.body_hash, state.articles_hash,
+                                    state.size, state.parse_time))
+        except sqlite3.Error as e:
+            logger.warning("Scrape state write failed: %s", e)
+
+
+class _HashingBody:
+    """Wraps a chunk iterator, hashing and counting the bytes as they stream past."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.digest = hashlib.sha1()
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.digest.update(chunk)
+            self.size += len(chunk)
+            yield chunk
+
+
+class RetryableStatus(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"Upstream returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ScrapeEngine:
+    """Fetches many sources concurrently on a bounded thread pool.
+
+    At most ``per_host_limit`` requests run against the same host at once.
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff.
+
+    With a ``state`` store, requests carry If-None-Match/If-Modified-Since
+    from the last stored fetch, and a 304, an identical body or an identical
+    article set marks the result ``unchanged``. Call remember() once the
+    results are stored so the next run compares against them.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_workers=8, per_host_limit=2, timeout=10.0, retries=2, backoff=0.5, session=None, parser="auto",
+                 state=None):
+        self.max_workers = max_workers
+        self.parser = parser
+        self.state = state
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or self._make_session(max_workers)
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+
+    @staticmethod
+    def _make_session(pool_size):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return instrument_session(session)
+
+    def _host_semaphore(self, url):
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def fetch(self, source, result, stream=False, headers=None):
+        """GET the source page, retrying transient failures. Returns the response."""
+        timeout = source.timeout or self.timeout
+        semaphore = self._host_semaphore(source.url)
+        attempt = 0
+        while True:
+            attempt += 1
+            result.attempts = attempt
+            try:
+                with semaphore:
+                    response = self.session.get(source.url, timeout=timeout, stream=stream, headers=headers)
+                result.status_code = response.status_code
+                if response.status_code in self.RETRY_STATUSES:
+                    raise RetryableStatus(response.status_code)
+                response.raise_for_status()
+                return response
+            except (requests.ConnectionError, requests.Timeout, RetryableStatus) as e:
+                if not isinstance(e, RetryableStatus):
+                    record_outbound_error(source.url, e)
+                if attempt > self.retries:
+                    raise
+                delay = self.backoff * (2 ** (attempt - 1))
+                logger.warning("Fetching %s failed (%s), retrying in %.2fs", source.name, e, delay)
+                time.sleep(delay)
+
+    @staticmethod
+    def _conditional_headers(previous):
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        return headers
+
+    def scrape_source(self, source):
+        result = SourceResult(source=source.name, url=source.url)
+        start = time.perf_counter()
+        try:
+            previous = self.state.get(source.url) if self.state is not None else None
+            # The stream parser consumes the body chunk by chunk as it arrives
+            streaming = (source.parser or self.parser) == "stream"
+            response = self.fetch(source, result, stream=streaming, headers=self._conditional_headers(previous))
+            try:
+                self._process(source, result, response, previous, streaming, start)
+            finally:
+                response.close()
+        except Exception as e:
+            logger.error("Error occurred while scraping %s: %s", source.name, e)
+            result.error = str(e)
+        result.timings["total"] = time.perf_counter() - start
+        return result
+
+    def _process(self, source, result, response, previous, streaming, start):
+        state = FetchState(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+        result.state = state
+
+        if response.status_code == 304 and previous is not None:
+            # Nothing was downloaded or parsed; keep the stored hashes
+            result.timings["fetch"] = time.perf_counter() - start
+            state.etag = state.etag or previous.etag
+            state.last_modified = state.last_modified or previous.last_modified
+            state.body_hash, state.articles_hash = previous.body_hash, previous.articles_hash
+            state.size, state.parse_time = previous.size, previous.parse_time
+            result.unchanged = True
+            result.saved_bytes = previous.size
+            result.saved_seconds = previous.parse_time
+            return
+
+        if streaming:
+            body = _HashingBody(response.iter_content(64 * 1024))
+        else:
+            body = response.content
+            state.body_hash = hashlib.sha1(body).hexdigest()
+            state.size = result.bytes = len(body)
+        fetched = time.perf_counter()
+        result.timings["fetch"] = fetched - start
+
+        if previous is not None and state.body_hash is not None and state.body_hash == previous.body_hash:
+            state.articles_hash, state.parse_time = previous.articles_hash, previous.parse_time
+            result.unchanged = True
+            result.saved_seconds = previous.parse_time
+            return
+
+        result.articles = extract_articles(body, source, self.parser)
+        state.parse_time = result.timings["parse"] = time.perf_counter() - fetched
+        if streaming:
+            state.body_hash = body.digest.hexdigest()
+            state.size = result.bytes = body.size
+        state.articles_hash = hash_articles(result.articles)
+        # The markup changed but the articles did not, e.g. a new ad slot or timestamp
+        result.unchanged = previous is not None and state.articles_hash == previous.articles_hash
+
+    def remember(self, results):
+        """Store the fetch state of successful results for the next conditional request."""
+        if self.state is None:
+            return
+        for result in results:
+            if result.ok and result.state is not None:
+                self.state.put(result.url, result.state)
+
+    def run(self, sources=None):
+        """Scrape every source concurrently and return a SourceResult per source, in order."""
+        sources = get_sources() if sources is None else sources
+        if not sources:
+            return []
+        workers = min(self.max_workers, len(sources))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape") as executor:
+            results = list(executor.map(self.scrape_source, sources))
+        for result in results:
+            for stage, seconds in result.timings.items():
+                record_scrape_stage(result.source, stage, seconds)
+            logger.info("Scraped %s: %s articles in %.3fs%s", result.source, len(result.articles),
+                        result.timings["total"], " (unchanged)" if result.unchanged else "")
+        return results
@@ -0,0 +1,295 @@
+import heapq
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+# Ranked full-text search over headlines and summaries. Headline matches weigh more.
+SEARCH_SQL = '''SELECT id, headline, summary, link, rank FROM (
+                    SELECT id, headline, summary, link,
+                           ts_rank(setweight(headline_tsv, 'A') || setweight(summary_tsv, 'B'),
+                                   headline_query || summary_query)::float8 AS rank
+                    FROM news,
+                         websearch_to_tsquery('english', %(headline_query)s) AS headline_query,
+                         websearch_to_tsquery('english', %(summary_query)s) AS summary_query
+                    WHERE headline_tsv @@ headline_query OR summary_tsv @@ summary_query
+                ) AS ranked
+                {cursor_filter}
+                ORDER BY rank DESC, id DESC
+                LIMIT %(limit)s'''
+
+def escape_like(text):
+    """Escape LIKE/ILIKE wildcards so user input is matched literally."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def parse_search_cursor(cursor):
+    """Cursor format is '<rank>:<id>' of the last row on the previous page."""
+    rank, _, article_id = cursor.partition(':')
+    return float(rank), int(article_id)
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_QUERY_TERM_RE = re.compile(r"\w+\*?")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class FieldIndex:
+    """Inverted index over one text field.
+
+    Each posting list is a pair of parallel arrays (sorted document ids and
+    term frequencies) so millions of postings stay compact. News ids are
+    serial, so new documents almost always append.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0
+        self._sorted_terms = None
+
+    def add(self, doc_id, text):
+        tokens = tokenize(text)
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array('I'), array('I'))
+                self._sorted_terms = None
+            ids, tfs = posting
+            if not ids or ids[-1] < doc_id:
+                ids.append(doc_id)
+                tfs.append(tf)
+            else:
+                position = bisect_left(ids, doc_id)
+                ids.insert(position, doc_id)
+                tfs.insert(position, tf)
+        self.lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+        return counts.keys()
+
+    def remove(self, doc_id, terms):
+        for term in terms:
+            ids, tfs = self.postings[term]
+            position = bisect_left(ids, doc_id)
+            if position < len(ids) and ids[position] == doc_id:
+                del ids[position]
+                del tfs[position]
+            if not ids:
+                del self.postings[term]
+                self._sorted_terms = None
+        self.total_length -= self.lengths.pop(doc_id, 0)
+
+    def expand(self, term):
+        """Terms matching a query term; a trailing '*' makes it a prefix match."""
+        if not term.endswith("*"):
+            return [term] if term in self.postings else []
+        prefix = term.rstrip("*")
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        start = bisect_left(self._sorted_terms, prefix)
+        matches = []
+        for candidate in islice(self._sorted_terms, start, None):
+            if not candidate.startswith(prefix):
+                break
+            matches.append(candidate)
+        return matches
+
+    def score(self, terms, require_all, k1, b):
+        """BM25 score per document for the query terms.
+
+        With require_all every query term (or one of its prefix expansions)
+        must appear in the document.
+        """
+        doc_count = len(self.lengths)
+        if not doc_count or not terms:
+            return {}
+        average_length = self.total_length / doc_count or 1
+        scores = {}
+        matched = None
+        for term in terms:
+            term_docs = set()
+            for expanded in self.expand(term):
+                ids, tfs = self.postings[expanded]
+                idf = math.log(1 + (doc_count - len(ids) + 0.5) / (len(ids) + 0.5))
+                for doc_id, tf in zip(ids, tfs):
+                    norm = k1 * (1 - b + b * self.lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+                    term_docs.add(doc_id)
+            if require_all:
+                matched = term_docs if matched is None else matched & term_docs
+                if not matched:
+                    return {}
+        if require_all:
+            return {doc_id: scores[doc_id] for doc_id in matched}
+        return scores
+
+
+class SearchIndex:
+    """Per-worker in-memory search over the news table.
+
+    Built lazily from Postgres, then kept current by pulling rows with an id
+    above the highest one already indexed. Rows edited in place are picked up
+    on the next full rebuild, which is built aside and swapped in so queries
+    keep being answered from the old index meanwhile.
+    """
+
+    HEADLINE_WEIGHT = 2.0
+    SUMMARY_WEIGHT = 1.0
+
+    def __init__(self, refresh_interval=30.0, rebuild_interval=3600.0, k1=1.2, b=0.75):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        # Held while loading or refreshing from the database, never by queries
+        self._update_lock = threading.Lock()
+        self._clear()
+        self.loaded = False
+        self.refreshed_at = 0.0
+        self.built_at = 0.0
+
+    def _clear(self):
+        self.headlines = FieldIndex()
+        self.summaries = FieldIndex()
+        self.docs = {}
+        self._terms = {}
+        self.max_id = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id, headline, summary, link):
+        with self._lock:
+            if doc_id in self.docs:
+                self.remove(doc_id)
+            headline_terms = self.headlines.add(doc_id, headline)
+            summary_terms = self.summaries.add(doc_id, summary)
+            self._terms[doc_id] = (tuple(headline_terms), tuple(summary_terms))
+            self.docs[doc_id] = (headline, summary, link)
+            self.max_id = max(self.max_id, doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            if doc_id not in self.docs:
+                return
+            headline_terms, summary_terms = self._terms.pop(doc_id)
+            self.headlines.remove(doc_id, headline_terms)
+            self.summaries.remove(doc_id, summary_terms)
+            del self.docs[doc_id]
+
+    def load(self, connection, batch_size=5000):
+        """Rebuild the whole index from the news table."""
+        cursor = connection.cursor()
+        cursor.execute("SELECT id, headline, summary, link FROM news ORDER BY id")
+        # Build into a separate index without holding the lock, then swap its contents in
+        fresh = SearchIndex(k1=self.k1, b=self.b)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                fresh.add(*row)
+        cursor.close()
+        with self._lock:
+            self.headlines, self.summaries = fresh.headlines, fresh.summaries
+            self.docs, self._terms, self.max_id = fresh.docs, fresh._terms, fresh.max_id
+            self.loaded = True
+            self.built_at = self.refreshed_at = time.monotonic()
+
+    def refresh(self, connection):
+        """Index rows inserted since the last load or refresh."""
+        cursor = connection.cursor()
+        cursor.execute("SELECT id, headline, summary, link FROM news WHERE id > %s ORDER BY id", (self.max_id,))
+        rows = cursor.fetchall()
+        cursor.close()
+        with self._lock:
+            for row in rows:
+                self.add(*row)
+            self.refreshed_at = time.monotonic()
+        return len(rows)
+
+    def ensure_current(self, get_connection):
+        """Load, refresh or rebuild as needed before answering a query."""
+        now = time.monotonic()
+        if self.loaded and now - self.refreshed_at < self.refresh_interval:
+            return
+        # Once loaded, a query never waits for another thread's refresh or rebuild
+        if not self._update_lock.acquire(blocking=not self.loaded):
+            return
+        try:
+            now = time.monotonic()
+            if self.loaded and now - self.refreshed_at < self.refresh_interval:
+                return
+            connection = get_connection()
+            try:
+                if not self.loaded or now - self.built_at >= self.rebuild_interval:
+                    self.load(connection)
+                else:
+                    self.refresh(connection)
+            finally:
+                connection.close()
+        finally:
+            self._update_lock.release()
+
+    def search(self, headline_query="", summary_query="", limit=20, after=None):
+        """Return (rank, id, headline, summary, link) rows, best first.
+
+        A document matches if its headline matches headline_query or its
+        summary matches summary_query. Terms are ANDed unless the query
+        contains ``or``; ``econ*`` matches every term starting with econ.
+        ``after`` is a (rank, id) cursor; ``limit=None`` returns every match.
+        """
+        with self._lock:
+            scores = {}
+            for field, query, weight in ((self.headlines, headline_query, self.HEADLINE_WEIGHT),
+                                         (self.summaries, summary_query, self.SUMMARY_WEIGHT)):
+                terms = [term for term in _QUERY_TERM_RE.findall(query.lower()) if term.strip("*")]
+                require_all = "or" not in terms
+                terms = [term for term in terms if term != "or"]
+                for doc_id, score in field.score(terms, require_all, self.k1, self.b).items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * score
+
+            ranked = ((score, doc_id) for doc_id, score in scores.items())
+            if after is not None:
+                ranked = (item for item in ranked if item < after)
+            top = sorted(ranked, reverse=True) if limit is None else heapq.nlargest(limit, ranked)
+            return [(score, doc_id) + self.docs[doc_id] for score, doc_id in top]
+
+    def headline_matches(self, keywords):
+        """Ids, oldest first, of documents whose headline matches any of the keywords.
+
+        A keyword matches when every word in it starts a word of the headline,
+        so "White House" and "100%" behave like the substring match of the SQL
+        path; unlike it, "conomy" (the middle of a word) does not match.
+        """
+        with self._lock:
+            matched = set()
+            for keyword in keywords:
+                keyword_docs = None
+                for token in tokenize(keyword):
+                    token_docs = set()
+                    for expanded in self.headlines.expand(f"{token}*"):
+                        token_docs.update(self.headlines.postings[expanded][0])
+                    keyword_docs = token_docs if keyword_docs is None else keyword_docs & token_docs
+                matched.update(keyword_docs or ())
+            return sorted(matched)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self.docs),
+                "headline_terms": len(self.headlines.postings),
+                "summary_terms": len(self.summaries.postings),
+                "max_id": self.max_id,
+                "loaded": self.loaded,
+            }
+
@@ -0,0 +1,88 @@
+import time
+import unittest
+from flask import Flask, jsonify
+from Backend.cache import MemoryBackend, ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(MemoryBackend(max_entries=2), default_ttl=60)
+        self.calls = 0
+        app = Flask(__name__)
+
+        @app.route('/news')
+        @self.cache.cached(tags=["news"])
+        def news():
+            self.calls += 1
+            return jsonify({"calls": self.calls}), 200
+
+        @app.route('/favorites/<username>')
+        @self.cache.cached(tags=lambda username: [f"favorites:{username}"])
+        def favorites(username):
+            self.calls += 1
+            return jsonify({"username": username}), 200
+
+        @app.route('/broken')
+        @self.cache.cached(tags=["news"])
+        def broken():
+            self.calls += 1
+            return jsonify({"error": "boom"}), 500
+
+        self.client = app.test_client()
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get('/news')
+        second = self.client.get('/news')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first.json, second.json)
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+        self.assertIn('Last-Modified', second.headers)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_query_string_order_does_not_matter(self):
+        self.client.get('/news?page=1&per_page=10')
+        self.client.get('/news?per_page=10&page=1')
+        self.assertEqual(self.calls, 1)
+
+    def test_encoded_separators_do_not_share_an_entry(self):
+        self.client.get('/news?page=1%26per_page%3D2')
+        self.client.get('/news?page=1&per_page=2')
+        self.assertEqual(self.calls, 2)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get('/news').headers['ETag']
+        response = self.client.get('/news', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_invalidate_by_tag(self):
+        self.client.get('/news')
+        self.client.get('/favorites/kim')
+        self.cache.invalidate("news")
+        self.client.get('/news')
+        self.client.get('/favorites/kim')
+        self.assertEqual(self.calls, 3)
+
+    def test_errors_are_not_cached(self):
+        self.client.get('/broken')
+        self.client.get('/broken')
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_eviction(self):
+        self.client.get('/favorites/a')
+        self.client.get('/favorites/b')
+        self.client.get('/favorites/a')
+        self.client.get('/favorites/c')  # evicts b, the least recently used
+        self.client.get('/favorites/a')
+        self.client.get('/favorites/b')
+        self.assertEqual(self.calls, 4)
+
+    def test_entries_expire(self):
+        self.cache.default_ttl = 0.01
+        self.client.get('/news')
+        time.sleep(0.02)
+        self.client.get('/news')
+        self.assertEqual(self.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
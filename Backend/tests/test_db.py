@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+import psycopg2
+from psycopg2 import extensions
+from Backend import db
+from Backend.db import ConnectionPool, PoolTimeout
+
+def make_raw_connection():
+    raw = MagicMock()
+    raw.closed = 0
+    raw.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_IDLE
+    return raw
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch("psycopg2.connect", side_effect=lambda dsn, **kwargs: make_raw_connection())
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connection_is_reused_after_close(self):
+        """Closing a pooled connection returns it instead of opening a new one."""
+        pool = ConnectionPool("postgres://test", minconn=0, maxconn=2)
+        first = pool.getconn()
+        first.close()
+        second = pool.getconn()
+        self.assertIs(first._raw, second._raw)
+        self.assertEqual(self.mock_connect.call_count, 1)
+        first._raw.close.assert_not_called()
+
+    def test_warm_opens_min_connections(self):
+        pool = ConnectionPool("postgres://test", minconn=2, maxconn=4)
+        pool.warm()
+        self.assertEqual(pool.stats()["idle"], 2)
+        self.assertEqual(self.mock_connect.call_count, 2)
+
+    def test_idle_connections_above_min_are_trimmed(self):
+        pool = ConnectionPool("postgres://test", minconn=1, maxconn=4, idle_timeout=60)
+        connections = [pool.getconn() for _ in range(3)]
+        for connection in connections:
+            connection.close()
+        self.assertEqual(pool.stats()["idle"], 3)
+
+        with patch("time.monotonic", return_value=time.monotonic() + 61):
+            pool.getconn().close()
+        stats = pool.stats()
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["connections_trimmed"], 2)
+        self.assertEqual(sum(c._raw.close.call_count for c in connections), 2)
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = ConnectionPool("postgres://test", minconn=0, maxconn=1, timeout=0.05)
+        pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool("postgres://test", minconn=0, maxconn=1, timeout=2)
+        held = pool.getconn()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(pool.getconn()))
+        waiter.start()
+        threading.Timer(0.05, held.close).start()
+        waiter.join(3)
+        self.assertEqual(len(results), 1)
+        self.assertIs(results[0]._raw, held._raw)
+        self.assertGreater(pool.stats()["wait_time_max"], 0)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        pool = ConnectionPool("postgres://test", minconn=0, maxconn=1)
+        conn = pool.getconn()
+        conn._raw.get_transaction_status.return_value = extensions.TRANSACTION_STATUS_INTRANS
+        conn.close()
+        conn._raw.rollback.assert_called_once()
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_broken_connection_is_replaced_on_checkout(self):
+        pool = ConnectionPool("postgres://test", minconn=0, maxconn=1, check_after=0)
+        conn = pool.getconn()
+        conn.close()
+        conn._raw.cursor.return_value.execute.side_effect = psycopg2.OperationalError("server closed")
+        replacement = pool.getconn()
+        self.assertIsNot(replacement._raw, conn._raw)
+        self.assertEqual(pool.stats()["connections_discarded"], 1)
+        self.assertEqual(pool.stats()["in_use"], 1)
+
+    def test_pool_resets_after_fork(self):
+        pool = ConnectionPool("postgres://test", minconn=0, maxconn=1)
+        inherited = pool.getconn()
+        inherited.close()
+        with patch("os.getpid", return_value=pool._pid + 1):
+            conn = pool.getconn()
+            self.assertIsNot(conn._raw, inherited._raw)
+            # The parent's socket must not be closed by the child
+            inherited._raw.close.assert_not_called()
+            self.assertEqual(pool.stats()["in_use"], 1)
+
+    def test_request_teardown_does_not_release_a_later_checkout(self):
+        """A handler's early close() plus teardown's second close() returns the connection only once."""
+        pool = ConnectionPool("postgres://test", minconn=0, maxconn=2)
+        app = Flask(__name__)
+        db.init_app(app)
+        job_connection = []
+        with patch("Backend.db.get_pool", return_value=pool):
+            with app.app_context():
+                connection = db.get_db_connection()
+                connection.close()
+                # Another thread (a scrape job, the scheduler) checks the same socket out meanwhile
+                worker = threading.Thread(target=lambda: job_connection.append(pool.getconn()))
+                worker.start()
+                worker.join(2)
+        self.assertIs(job_connection[0]._raw, connection._raw)
+        self.assertEqual(pool.stats()["in_use"], 1)
+        self.assertEqual(pool.stats()["idle"], 0)
+        # The next checkout must not be handed the job's connection
+        self.assertIsNot(pool.getconn()._raw, job_connection[0]._raw)
+
+if __name__ == '__main__':
+    unittest.main()
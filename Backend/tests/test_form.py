@@ -25,6 +25,7 @@ class TestFavoritesArticles(unittest.TestCase):
                               id INTEGER PRIMARY KEY AUTOINCREMENT,
                               username TEXT NOT NULL,
                               news_id INTEGER NOT NULL,
+                              UNIQUE (username, news_id),
                               FOREIGN KEY (news_id) REFERENCES news(id) ON DELETE CASCADE)''')
             cursor.execute("INSERT INTO news (headline, summary, link) VALUES (?, ?, ?)",
                            ("Sample Headline", "Sample Summary", "http://example.com"))
@@ -38,6 +39,15 @@ class TestFavoritesArticles(unittest.TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.json, {'message': 'Favorite added successfully'})
 
+    def test_add_favorite_twice(self):
+        #Test that adding the same favorite again is rejected
+        payload = {'username': 'twiceuser', 'news_id': 1}
+        self.assertEqual(self.client.post('/addFavorites', json=payload).status_code, 201)
+        response = self.client.post('/addFavorites', json=payload)
+        print("test_add_favorite_twice response:", response.json)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json, {'error_message': 'This article is already in your favorites'})
+
     def test_get_favorite_article_by_user_not_found(self):
         response = self.client.get('/favorites/kim')
         print("test_get_favorite_article_by_user_not_found response:", response.json)
@@ -67,5 +77,46 @@ class TestFavoritesArticles(unittest.TestCase):
         print("test_delete_favorite_article_not_found response:", response.json)
         self.assertEqual(response.status_code, 404)
 
+    def test_batch_requests_are_validated(self):
+        #Test that malformed batches are rejected before touching the database
+        cases = [
+            ('/addFavorites/batch', {'news_ids': [1]}),
+            ('/addFavorites/batch', {'username': 'batchuser', 'news_ids': []}),
+            ('/addFavorites/batch', {'username': 'batchuser', 'news_ids': ['1']}),
+            ('/addFavorites/batch', {'username': 'batchuser', 'news_ids': [True]}),
+            ('/addFavorites/batch', {'username': 'batchuser', 'news_ids': list(range(1, 502))}),
+            ('/deleteFavorites/batch', {'username': 'batchuser', 'ids': 5}),
+        ]
+        for path, payload in cases:
+            with self.subTest(path=path, payload=payload):
+                self.assertEqual(self.client.post(path, json=payload).status_code, 400)
+
+    def test_batch_add_reports_each_item(self):
+        #Test adding several favorites at once, including a repeat and a missing article
+        payload = {'username': 'batchuser', 'news_ids': [1, 999999, 1]}
+        response = self.client.post('/addFavorites/batch', json=payload)
+        print("test_batch_add_reports_each_item response:", response.json)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.json['results']], ['added', 'not_found'])
+        self.assertEqual(response.json['added'], 1)
+
+        response = self.client.post('/addFavorites/batch', json={'username': 'batchuser', 'news_ids': [1]})
+        self.assertEqual(response.json['results'][0]['status'], 'exists')
+
+        response = self.client.post('/deleteFavorites/batch', json={'username': 'batchuser', 'news_ids': [1, 999999]})
+        self.assertEqual([result['status'] for result in response.json['results']], ['removed', 'not_found'])
+
+    def test_favorites_are_paginated(self):
+        #Test walking a user's favorites a page at a time
+        self.client.post('/addFavorites', json={'username': 'pageuser', 'news_id': 1})
+        response = self.client.get('/favorites/pageuser?limit=1')
+        print("test_favorites_are_paginated response:", response.json)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['favorites']), 1)
+        self.assertIsNone(response.json['next_cursor'])
+        last = response.json['favorites'][-1]['id']
+        response = self.client.get(f'/favorites/pageuser?limit=1&after={last}')
+        self.assertEqual(response.json['favorites'], [])
+
 if __name__ == '__main__':
     unittest.main()
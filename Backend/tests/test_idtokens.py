@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import rsa
+from google.auth import crypt, jwt
+from Backend.idtokens import GoogleTokenVerifier
+
+AUDIENCE = "client-id.apps.googleusercontent.com"
+
+def make_key(key_id):
+    public_key, private_key = rsa.newkeys(1024)
+    signer = crypt.RSASigner.from_string(private_key.save_pkcs1().decode(), key_id)
+    return signer, public_key.save_pkcs1().decode()
+
+class CertsHandler(BaseHTTPRequestHandler):
+    certs = {}
+    cache_control = "public, max-age=3600"
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        body = json.dumps(self.certs).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.cache_control:
+            self.send_header("Cache-Control", self.cache_control)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+class TestGoogleTokenVerifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.signer, cls.public_pem = make_key("key-1")
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CertsHandler)
+        cls.certs_url = f"http://127.0.0.1:{cls.server.server_address[1]}/certs"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        CertsHandler.certs = {"key-1": self.public_pem}
+        CertsHandler.cache_control = "public, max-age=3600"
+        CertsHandler.hits = 0
+        self.clock = FakeClock()
+        self.verifier = GoogleTokenVerifier(AUDIENCE, certs_url=self.certs_url, clock=self.clock)
+
+    def make_token(self, signer=None, **claims):
+        now = int(time.time())
+        payload = {"iss": "https://accounts.google.com", "aud": AUDIENCE, "sub": "123",
+                   "iat": now, "exp": now + 3600}
+        payload.update(claims)
+        return jwt.encode(signer or self.signer, payload)
+
+    def test_verifies_signature_locally(self):
+        claims = self.verifier.verify(self.make_token(sub="alice"))
+        self.assertEqual(claims["sub"], "alice")
+        self.verifier.verify(self.make_token(sub="bob"))
+        self.assertEqual(CertsHandler.hits, 1)
+
+    def test_certs_are_refetched_after_max_age(self):
+        self.verifier.verify(self.make_token(sub="alice"))
+        self.clock.now += 3601
+        self.verifier.verify(self.make_token(sub="bob"))
+        self.assertEqual(CertsHandler.hits, 2)
+
+    def test_default_max_age_without_cache_control(self):
+        CertsHandler.cache_control = None
+        verifier = GoogleTokenVerifier(AUDIENCE, certs_url=self.certs_url, default_max_age=60, clock=self.clock)
+        verifier.certs()
+        self.clock.now += 61
+        verifier.certs()
+        self.assertEqual(CertsHandler.hits, 2)
+
+    def test_unknown_key_id_refreshes_certs(self):
+        self.verifier.certs()
+        self.clock.now += 61
+        rotated, rotated_pem = make_key("key-2")
+        CertsHandler.certs = {"key-1": self.public_pem, "key-2": rotated_pem}
+        self.assertEqual(self.verifier.verify(self.make_token(signer=rotated))["sub"], "123")
+        self.assertEqual(CertsHandler.hits, 2)
+
+    def test_unknown_key_id_refreshes_are_rate_limited(self):
+        self.verifier.certs()
+        self.clock.now += 61
+        for key_id in ("forged-1", "forged-2", "forged-3"):
+            forged, _ = make_key(key_id)
+            with self.assertRaises(ValueError):
+                self.verifier.verify(self.make_token(signer=forged))
+        # One early refresh for the first unknown key id, none for the rest
+        self.assertEqual(CertsHandler.hits, 2)
+
+    def test_verified_claims_are_cached_by_token(self):
+        token = self.make_token()
+        self.verifier.verify(token)
+        self.verifier.verify(token.decode())
+        self.assertEqual(self.verifier.stats, {"cert_fetches": 1, "claims_hits": 1, "verifications": 1})
+
+    def test_cached_claims_never_outlive_the_token(self):
+        token = self.make_token(exp=int(time.time()) + 60)
+        self.verifier.verify(token)
+        self.clock.now += 61
+        self.verifier.verify(token)
+        self.assertEqual(self.verifier.stats["claims_hits"], 0)
+        self.assertEqual(self.verifier.stats["verifications"], 2)
+
+    def test_rejects_bad_tokens(self):
+        other, _ = make_key("key-1")
+        with self.assertRaises(ValueError):
+            self.verifier.verify(self.make_token(signer=other))
+        with self.assertRaises(ValueError):
+            self.verifier.verify(self.make_token(aud="someone-else"))
+        with self.assertRaises(ValueError):
+            self.verifier.verify(self.make_token(iss="https://evil.example.com"))
+        with self.assertRaises(ValueError):
+            self.verifier.verify(self.make_token(iat=int(time.time()) - 7200, exp=int(time.time()) - 3600))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from Backend.ingest import ingest_articles, normalize_link
+from Backend.scraper import Article
+
+class TestIngest(unittest.TestCase):
+
+    def test_normalize_link(self):
+        self.assertEqual(normalize_link(" https://www.TheAtlantic.com/a/b/?utm=1#top "),
+                         "https://www.theatlantic.com/a/b")
+        self.assertEqual(normalize_link("https://example.com/a"), normalize_link("https://example.com/a/"))
+        self.assertIsNone(normalize_link(""))
+        self.assertIsNone(normalize_link(None))
+
+    @patch("Backend.ingest.execute_values")
+    def test_batch_is_written_in_one_statement(self, mock_execute_values):
+        mock_execute_values.return_value = [(1, True), (2, False)]
+        connection = MagicMock()
+        articles = [
+            Article("One", "S1", "https://example.com/one"),
+            Article("Two", "S2", "https://example.com/two"),
+            Article("Three", "S3", "https://example.com/three"),
+        ]
+
+        result = ingest_articles(connection, articles)
+
+        mock_execute_values.assert_called_once()
+        rows = mock_execute_values.call_args[0][2]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], ("One", "S1", "https://example.com/one", "https://example.com/one"))
+        self.assertEqual(mock_execute_values.call_args[1]["page_size"], 3)
+        # The third row conflicted without changes so it was not returned
+        self.assertEqual(result, {"inserted": 1, "updated": 1, "skipped": 1})
+
+    @patch("Backend.ingest.execute_values")
+    def test_duplicates_within_batch_are_skipped(self, mock_execute_values):
+        mock_execute_values.return_value = [(1, True), (2, True)]
+        articles = [
+            Article("One", "", "https://example.com/one"),
+            Article("One again", "", "https://example.com/one/?ref=home"),
+            Article("", "", "https://example.com/empty"),
+            Article("No link", "", ""),
+        ]
+
+        # Any iterable of records works, including a generator
+        result = ingest_articles(MagicMock(), (article for article in articles))
+
+        rows = mock_execute_values.call_args[0][2]
+        self.assertEqual([row[0] for row in rows], ["One", "No link"])
+        self.assertIsNone(rows[1][3])
+        self.assertEqual(result, {"inserted": 2, "updated": 0, "skipped": 2})
+
+    @patch("Backend.ingest.execute_values")
+    def test_empty_batch_skips_database(self, mock_execute_values):
+        self.assertEqual(ingest_articles(MagicMock(), []), {"inserted": 0, "updated": 0, "skipped": 0})
+        mock_execute_values.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import threading
+import unittest
+from Backend.jobs import JobQueue, JobStore, FAILED, SUCCEEDED
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.queue = JobQueue(JobStore(self.path), max_workers=2)
+
+    def tearDown(self):
+        self.queue.shutdown()
+        os.remove(self.path)
+
+    def wait_for(self, job_id):
+        self.queue.shutdown(wait=True)
+        return self.queue.get(job_id)
+
+    def test_job_runs_and_stores_result(self):
+        job, created = self.queue.enqueue("scrape:*", lambda: {"total_articles": 3})
+        self.assertTrue(created)
+        self.assertIn(job["status"], ("queued", "running", "succeeded"))
+
+        finished = self.wait_for(job["id"])
+        self.assertEqual(finished["status"], SUCCEEDED)
+        self.assertEqual(finished["result"], {"total_articles": 3})
+        self.assertIsNotNone(finished["finished_at"])
+
+    def test_failed_job_records_error(self):
+        def boom():
+            raise RuntimeError("upstream down")
+
+        job, _ = self.queue.enqueue("scrape:*", boom)
+        finished = self.wait_for(job["id"])
+        self.assertEqual(finished["status"], FAILED)
+        self.assertEqual(finished["error"], "upstream down")
+
+    def test_concurrent_triggers_coalesce(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_job():
+            calls.append(1)
+            release.wait(5)
+            return {}
+
+        first, created_first = self.queue.enqueue("scrape:*", slow_job)
+        second, created_second = self.queue.enqueue("scrape:*", slow_job)
+        other, created_other = self.queue.enqueue("scrape:atlantic", lambda: {})
+        release.set()
+
+        self.assertTrue(created_first)
+        self.assertFalse(created_second)
+        self.assertEqual(first["id"], second["id"])
+        self.assertTrue(created_other)
+        self.wait_for(first["id"])
+        self.assertEqual(len(calls), 1)
+
+    def test_new_job_after_previous_finished(self):
+        first, _ = self.queue.enqueue("scrape:*", lambda: {})
+        self.wait_for(first["id"])
+        second, created = self.queue.enqueue("scrape:*", lambda: {})
+        self.assertTrue(created)
+        self.assertNotEqual(first["id"], second["id"])
+
+    def test_jobs_visible_from_another_store(self):
+        # Another gunicorn worker opens the same SQLite file
+        job, _ = self.queue.enqueue("scrape:*", lambda: {"ok": True})
+        self.wait_for(job["id"])
+        self.assertEqual(JobStore(self.path).get(job["id"])["result"], {"ok": True})
+
+    def test_lost_job_is_reported_failed(self):
+        # A job whose worker died: created long ago and never finished
+        store = JobStore(self.path)
+        job, _ = store.create_or_get_active("scrape:*", stale_after=600)
+        store.mark_running(job["id"])
+        queue = JobQueue(store, stale_after=0)
+        lost = queue.get(job["id"])
+        self.assertEqual(lost["status"], FAILED)
+        self.assertIn("did not finish", lost["error"])
+        self.assertEqual(store.get(job["id"])["status"], FAILED)
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.queue.get("missing"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import json
+import logging
+import unittest
+from flask import Flask
+from Backend import logs
+from Backend.logs import SamplingFilter, configure_logging, shutdown_logging
+
+class TestLogs(unittest.TestCase):
+
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved_handlers = list(self.root.handlers)
+        self.saved_level = self.root.level
+        self.stream = io.StringIO()
+        self.logger = logging.getLogger("test_logs")
+
+    def tearDown(self):
+        shutdown_logging()
+        for handler in list(self.root.handlers):
+            self.root.removeHandler(handler)
+        for handler in self.saved_handlers:
+            self.root.addHandler(handler)
+        self.root.setLevel(self.saved_level)
+
+    def records(self):
+        shutdown_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_json_records_carry_request_id(self):
+        configure_logging("INFO", "json", stream=self.stream)
+        app = Flask(__name__)
+        logs.init_app(app)
+
+        @app.route("/")
+        def index():
+            self.logger.info("Handled %s", "index")
+            return "ok"
+
+        response = app.test_client().get("/", headers={"X-Request-ID": "abc123"})
+        self.assertEqual(response.headers["X-Request-ID"], "abc123")
+        self.logger.info("Outside a request")
+
+        inside, outside = self.records()
+        self.assertEqual(inside["message"], "Handled index")
+        self.assertEqual(inside["level"], "INFO")
+        self.assertEqual(inside["logger"], "test_logs")
+        self.assertEqual(inside["request_id"], "abc123")
+        self.assertEqual(outside["request_id"], "-")
+
+    def test_request_id_is_generated_when_missing(self):
+        app = Flask(__name__)
+        logs.init_app(app)
+        app.add_url_rule("/", "index", lambda: "ok")
+        client = app.test_client()
+        first = client.get("/").headers["X-Request-ID"]
+        second = client.get("/").headers["X-Request-ID"]
+        self.assertEqual(len(first), 32)
+        self.assertNotEqual(first, second)
+
+    def test_level_drops_debug_before_formatting(self):
+        configure_logging("INFO", "json", stream=self.stream)
+        formatted = []
+
+        class Expensive:
+            def __str__(self):
+                formatted.append(True)
+                return "expensive"
+
+        self.logger.debug("Value %s", Expensive())
+        self.logger.warning("Kept %s", Expensive())
+        self.assertEqual([record["message"] for record in self.records()], ["Kept expensive"])
+        self.assertEqual(len(formatted), 1)
+
+    def test_sampling_only_thins_debug_records(self):
+        sampler = SamplingFilter(0.0)
+        debug = logging.LogRecord("x", logging.DEBUG, __file__, 1, "debug", None, None)
+        warning = logging.LogRecord("x", logging.WARNING, __file__, 1, "warning", None, None)
+        self.assertFalse(sampler.filter(debug))
+        self.assertTrue(sampler.filter(warning))
+        self.assertTrue(SamplingFilter(1.0).filter(debug))
+
+    def test_text_format(self):
+        configure_logging("DEBUG", "text", stream=self.stream)
+        self.logger.debug("Saved %s", "pikachu")
+        shutdown_logging()
+        self.assertIn("DEBUG - [-] Saved pikachu", self.stream.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
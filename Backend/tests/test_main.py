@@ -1,7 +1,11 @@
+import json
 import sqlite3
 import unittest
 from unittest.mock import patch, MagicMock
+import main
 from main import app
+from Backend.cache import response_cache
+from Backend.scraper import FetchStateStore
 
 class TestNewsApp(unittest.TestCase):
 
@@ -10,6 +14,11 @@ class TestNewsApp(unittest.TestCase):
         self.app = app
         self.client = self.app.test_client()
         self.app.config["TESTING"] = True
+        # Responses are cached between requests (as with CACHE_REDIS_URL); start every test cold
+        self.app.config["CACHE_ENABLED"] = True
+        response_cache.clear()
+        # Forget validators and hashes of earlier scrapes
+        main.scrape_engine.state = FetchStateStore()
         # Setup the database
         self.setup_database()
 
@@ -22,10 +31,10 @@ class TestNewsApp(unittest.TestCase):
         conn.close()
 
 
-    @patch("requests.get")  # Mock requests.get
-    @patch("sqlite3.connect")  # Mock database connection
+    @patch("requests.Session.get")  # Mock the scrape engine's HTTP session
+    @patch("main.get_db_connection")  # Mock database connection
     def test_scrape_success(self, mock_connect, mock_get):
-        """Test successful scraping and database insertion."""
+        """Test that scraping is queued as a job and stores the articles."""
 
         # Mock HTML response
         mock_html = """
@@ -43,17 +52,27 @@ class TestNewsApp(unittest.TestCase):
         # Mock requests.get().content
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.content = mock_html
+        mock_response.headers = {}
+        mock_response.content = mock_html.encode()
         mock_get.return_value = mock_response
 
-        # Mock SQLite connection
+        # Mock database connection
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_connect.return_value = mock_conn
         mock_conn.cursor.return_value = mock_cursor
+        # execute_values() builds the statement from mogrify() in the connection's encoding
+        mock_cursor.connection.encoding = "UTF8"
+        mock_cursor.mogrify.return_value = b"('Example Headline', 'Example Summary', '', '')"
 
         # Send request to test endpoint
         response = self.client.get("/scrape")
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()["job_id"]
+
+        # Wait for the background job to finish
+        main.job_queue.shutdown(wait=True)
+        job = self.client.get(f"/scrape/jobs/{job_id}").get_json()
 
         # Expected JSON output
         expected_output = [
@@ -64,8 +83,8 @@ class TestNewsApp(unittest.TestCase):
             }
         ]
 
-        self.assertEqual(response.status_code, 201)
-        self.assertEqual(response.get_json(), expected_output)
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"]["articles"], expected_output)
 
         # Verify database insertion was called
         mock_cursor.execute.assert_called()
@@ -102,6 +121,112 @@ class TestNewsApp(unittest.TestCase):
         self.assertEqual(response.json[0]['summary'], "Test Summary")
         self.assertEqual(response.json[0]['link'], "http://test.com")
 
+    @patch("main.get_db_connection")
+    def test_get_news_cursor(self, mock_connect):
+        """Test keyset pagination returns a next_cursor when more rows exist."""
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.side_effect = [(3,), (3,)]
+        mock_cursor.fetchall.return_value = [
+            (5, "Headline 5", "Summary 5", "http://test.com/5"),
+            (6, "Headline 6", "Summary 6", "http://test.com/6"),
+            (7, "Headline 7", "Summary 7", "http://test.com/7"),
+        ]
+        main.invalidate_news_count()
+
+        response = self.client.get('/news?after=4&limit=2')
+        print("test_get_news_cursor response:", response.json)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['articles']), 2)
+        self.assertEqual(response.json['next_cursor'], 6)
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertIn("WHERE id > %s ORDER BY id", query)
+        self.assertEqual(params, (4, 3))
+
+    @patch("main.get_db_connection")
+    def test_search_ranked_with_cursor(self, mock_connect):
+        """Test /search uses the ranked full-text query and pages with a cursor."""
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [
+            (9, "Economy grows", "Summary", "http://test.com/9", 0.5),
+            (4, "Economy slows", "Summary", "http://test.com/4", 0.25),
+        ]
+
+        response = self.client.get('/search?q=economy&limit=1&cursor=0.75:12')
+        print("test_search_ranked_with_cursor response:", response.json)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['articles'][0]['id'], 9)
+        self.assertEqual(response.json['next_cursor'], "0.5:9")
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertIn("websearch_to_tsquery", query)
+        self.assertEqual((params['after_rank'], params['after_id'], params['limit']), (0.75, 12, 2))
+
+    def test_search_requires_query(self):
+        response = self.client.get('/search')
+        self.assertEqual(response.status_code, 400)
+
+    @patch("main.get_db_connection")
+    def test_get_headlines_by_keyword_paginated(self, mock_connect):
+        """Test /headlines matches request keywords in one parameterized query."""
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [(3, "Economy 100%"), (8, "The economy")]
+
+        response = self.client.get('/headlines?keyword=economy&keyword=100%25&limit=1')
+        print("test_get_headlines_by_keyword_paginated response:", response.json)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['headlines'], [{'id': 3, 'headline': "Economy 100%"}])
+        self.assertEqual(response.json['next_cursor'], 3)
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertIn("ILIKE ANY(%s)", query)
+        self.assertEqual(params, (["%economy%", "%100\\%%"], 0, 2))
+
+    @patch("main.get_db_connection")
+    def test_get_headlines_list_is_cached(self, mock_connect):
+        """Test the plain /headlines list stays buffered, cached and ETag'd."""
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [(3, "Economy grows"), (8, "The economy")]
+
+        first = self.client.get('/headlines?keyword=economy')
+        second = self.client.get('/headlines?keyword=economy')
+        self.assertEqual(second.json, [{'headline': "Economy grows"}, {'headline': "The economy"}])
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(mock_connect.call_count, 1)
+
+    @patch("main.get_db_connection")
+    def test_get_headlines_ndjson(self, mock_connect):
+        """Test /headlines?format=ndjson streams every match from a server-side cursor."""
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchmany.side_effect = [[(3, "Economy grows")], [(8, "The economy")], []]
+
+        response = self.client.get('/headlines?keyword=economy&format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines, [{'id': 3, 'headline': "Economy grows"}, {'id': 8, 'headline': "The economy"}])
+        mock_connect.return_value.cursor.assert_called_with(name="stream_rows")
+        mock_connect.return_value.close.assert_called_once()
+
+    @patch("main.get_db_connection")
+    def test_get_news_ndjson(self, mock_connect):
+        """Test /news?format=ndjson streams every article after the cursor, one per line."""
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchmany.side_effect = [[(5, "Headline 5", "Summary 5", "http://test.com/5"),
+                                              (6, "Headline 6", "Summary 6", "http://test.com/6")], []]
+
+        response = self.client.get('/news?format=ndjson&after=4')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line['id'] for line in lines], [5, 6])
+        query, params = mock_cursor.execute.call_args[0]
+        self.assertNotIn("LIMIT", query)
+        self.assertEqual(params, (4,))
+
     def test_index(self):
         response = self.client.get('/')
         print("test_index response:", response.json)
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from flask import Blueprint, Flask, jsonify
+from Backend import metrics
+from Backend.metrics import Histogram, Registry, SharedSnapshots, cache_collector, instrument_session, record_query
+
+class OkHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/news")
+        lines = histogram.render()
+        self.assertIn('latency_seconds_bucket{route="/news",le="0.1"} 2', lines)
+        self.assertIn('latency_seconds_bucket{route="/news",le="1.0"} 3', lines)
+        self.assertIn('latency_seconds_bucket{route="/news",le="+Inf"} 4', lines)
+        self.assertIn('latency_seconds_count{route="/news"} 4', lines)
+        self.assertIn('latency_seconds_sum{route="/news"} 3.65', lines)
+
+    def test_collectors_are_rendered(self):
+        registry = Registry()
+        registry.register_collector(cache_collector(lambda: {"response": (3, 1)}))
+        text = registry.render()
+        self.assertIn("# TYPE cache_hits_total counter", text)
+        self.assertIn('cache_hits_total{cache="response"} 3', text)
+        self.assertIn('cache_misses_total{cache="response"} 1', text)
+
+    def test_middleware_times_blueprint_routes_and_db_queries(self):
+        blueprint = Blueprint("items", __name__)
+
+        @blueprint.route("/items/<name>")
+        def item(name):
+            record_query(0.01)
+            record_query(0.02)
+            return jsonify(name=name)
+
+        app = Flask(__name__)
+        app.register_blueprint(blueprint)
+        metrics.init_app(app)
+        client = app.test_client()
+        before = metrics.REQUEST_LATENCY.count("GET", "/items/<name>", "200")
+        client.get("/items/a")
+        client.get("/items/b")
+        self.assertEqual(metrics.REQUEST_LATENCY.count("GET", "/items/<name>", "200"), before + 2)
+
+        text = client.get("/metrics").get_data(as_text=True)
+        self.assertIn('http_request_db_queries_bucket{route="/items/<name>",le="2"}', text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/items/<name>",status="200"}', text)
+
+    def test_instrumented_session_records_outbound_latency(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            host = f"127.0.0.1:{server.server_address[1]}"
+            session = instrument_session(requests.Session())
+            session.get(f"http://{host}/")
+            self.assertEqual(metrics.OUTBOUND_LATENCY.count(host, "200"), 1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_shared_snapshots_sum_workers(self):
+        """Counters and histograms of every worker are summed; gauges of exited workers are dropped."""
+        def worker_registry(requests_served, pool_size):
+            registry = Registry()
+            registry.counter("jobs_total", "Jobs.", ("kind",)).inc("scrape", amount=requests_served)
+            registry.histogram("latency_seconds", "Latency.", buckets=(1.0,)).observe(0.5)
+            registry.register_collector(lambda: [("pool_size", "gauge", "Pool size.", [({}, pool_size)])])
+            return registry
+
+        with tempfile.TemporaryDirectory() as directory:
+            # A worker that has exited since it last wrote its snapshot
+            with open(os.path.join(directory, "999999999.json"), "w") as snapshot_file:
+                json.dump(worker_registry(2, 5).snapshot(), snapshot_file)
+            shared = SharedSnapshots(worker_registry(3, 4), directory)
+            text = shared.render()
+
+        self.assertIn('jobs_total{kind="scrape"} 5', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('latency_seconds_count 2', text)
+        self.assertIn('pool_size 4', text)
+        self.assertEqual(text.count("# TYPE jobs_total counter"), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import MagicMock
+import psycopg2
+from Backend.migrations import MIGRATIONS, Migration, migrate
+
+MIGRATIONS_UNDER_TEST = [
+    Migration(1, "first", ("CREATE TABLE a (id INT)",)),
+    Migration(2, "second", ("CREATE TABLE b (id INT)", "INSERT INTO b VALUES (1)")),
+    Migration(3, "index", ("CREATE INDEX CONCURRENTLY b_idx ON b (id)",), transactional=False),
+]
+
+def make_connection(applied=()):
+    connection = MagicMock()
+    cursor = connection.cursor.return_value
+    cursor.fetchall.return_value = [(version,) for version in applied]
+    return connection, cursor
+
+def executed(cursor):
+    return [call.args[0] for call in cursor.execute.call_args_list]
+
+class TestMigrations(unittest.TestCase):
+
+    def test_pending_migrations_run_in_order_under_the_lock(self):
+        connection, cursor = make_connection(applied=[1])
+        done = migrate("dsn", MIGRATIONS_UNDER_TEST, connect=lambda dsn: connection, lock_key=7)
+
+        self.assertEqual(done, [2, 3])
+        statements = executed(cursor)
+        self.assertEqual(statements[0], "SELECT pg_advisory_lock(%s)")
+        self.assertEqual(statements[-1], "SELECT pg_advisory_unlock(%s)")
+        self.assertNotIn("CREATE TABLE a (id INT)", statements)
+        self.assertLess(statements.index("CREATE TABLE b (id INT)"),
+                        statements.index("CREATE INDEX CONCURRENTLY b_idx ON b (id)"))
+        recorded = [call.args[1][0] for call in cursor.execute.call_args_list
+                    if call.args[0].startswith("INSERT INTO schema_migrations")]
+        self.assertEqual(recorded, [2, 3])
+        # Only the transactional migration is committed; the other ran in autocommit
+        self.assertEqual(connection.commit.call_count, 1)
+        self.assertTrue(connection.autocommit)
+        connection.close.assert_called_once()
+
+    def test_up_to_date_database_runs_no_ddl(self):
+        connection, cursor = make_connection(applied=[1, 2, 3])
+        self.assertEqual(migrate("dsn", MIGRATIONS_UNDER_TEST, connect=lambda dsn: connection), [])
+        self.assertFalse([statement for statement in executed(cursor) if statement.startswith("CREATE TABLE b")])
+
+    def test_failed_migration_rolls_back_and_releases_the_lock(self):
+        connection, cursor = make_connection()
+
+        def execute(statement, vars=None):
+            if statement.startswith("INSERT INTO b"):
+                raise psycopg2.ProgrammingError("relation b does not exist")
+
+        cursor.execute.side_effect = execute
+        with self.assertRaises(psycopg2.ProgrammingError):
+            migrate("dsn", MIGRATIONS_UNDER_TEST, connect=lambda dsn: connection)
+        connection.rollback.assert_called_once()
+        self.assertEqual(executed(cursor)[-1], "SELECT pg_advisory_unlock(%s)")
+        connection.close.assert_called_once()
+
+    def test_versions_must_ascend(self):
+        with self.assertRaises(ValueError):
+            migrate("dsn", [Migration(2, "b", ()), Migration(1, "a", ())], connect=MagicMock())
+        versions = [migration.version for migration in MIGRATIONS]
+        self.assertEqual(versions, sorted(set(versions)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from Backend.pokeapi import PokeApiClient, PokeApiError
+
+class StubPokeApiHandler(BaseHTTPRequestHandler):
+    hits = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits[self.path] = cls.hits.get(self.path, 0) + 1
+        if self.path == "/pokemon/slowpoke":
+            time.sleep(0.2)
+        if self.path == "/pokemon/broken":
+            self.send_response(500)
+            self.end_headers()
+            return
+        if self.path == "/pokemon/listing":
+            # 200 without the fields of a Pokemon, like the /pokemon/ list endpoint
+            body = json.dumps({"count": 0, "results": []}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path not in ("/pokemon/pikachu", "/pokemon/slowpoke"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        name = self.path.rsplit("/", 1)[1]
+        body = json.dumps({
+            "name": name,
+            "sprites": {"front_default": f"http://example.com/{name}.png"},
+            "moves": ["padding"] * 1000,
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestPokeApiClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPokeApiHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubPokeApiHandler.hits = {}
+        handle, self.store_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.client = PokeApiClient(self.base_url, store_path=self.store_path)
+
+    def tearDown(self):
+        os.remove(self.store_path)
+
+    def test_lookup_returns_projected_record(self):
+        self.assertEqual(self.client.lookup("Pikachu"), {
+            "pokemonName": "pikachu",
+            "image": "http://example.com/pikachu.png",
+        })
+
+    def test_repeat_lookups_hit_memory(self):
+        self.client.lookup("pikachu")
+        self.client.lookup("pikachu")
+        self.assertEqual(StubPokeApiHandler.hits["/pokemon/pikachu"], 1)
+        self.assertEqual(self.client.stats["memory_hits"], 1)
+
+    def test_not_found_is_cached(self):
+        self.assertIsNone(self.client.lookup("missingno"))
+        self.assertIsNone(self.client.lookup("missingno"))
+        self.assertEqual(StubPokeApiHandler.hits["/pokemon/missingno"], 1)
+
+    def test_persistent_cache_survives_restart(self):
+        self.client.lookup("pikachu")
+        self.client.lookup("missingno")
+        restarted = PokeApiClient(self.base_url, store_path=self.store_path)
+        self.assertEqual(restarted.lookup("pikachu")["pokemonName"], "pikachu")
+        self.assertIsNone(restarted.lookup("missingno"))
+        self.assertEqual(restarted.stats["upstream_calls"], 0)
+        self.assertEqual(restarted.stats["store_hits"], 2)
+
+    def test_expired_entries_are_refetched(self):
+        client = PokeApiClient(self.base_url, ttl=0)
+        client.lookup("pikachu")
+        client.lookup("pikachu")
+        self.assertEqual(StubPokeApiHandler.hits["/pokemon/pikachu"], 2)
+
+    def test_concurrent_misses_are_coalesced(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.client.lookup("slowpoke"))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(StubPokeApiHandler.hits["/pokemon/slowpoke"], 1)
+
+    def test_upstream_errors_raise_and_are_not_cached(self):
+        with self.assertRaises(PokeApiError):
+            self.client.lookup("broken")
+        with self.assertRaises(PokeApiError):
+            self.client.lookup("broken")
+        self.assertEqual(StubPokeApiHandler.hits["/pokemon/broken"], 2)
+
+    def test_unexpected_response_raises(self):
+        with self.assertRaises(PokeApiError):
+            self.client.lookup("listing")
+
+    def test_blank_name_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.client.lookup("  ")
+        self.assertNotIn("/pokemon/", StubPokeApiHandler.hits)
+
+    def test_timeout_raises(self):
+        client = PokeApiClient(self.base_url, timeout=(1, 0.05))
+        with self.assertRaises(PokeApiError):
+            client.lookup("slowpoke")
+
+if __name__ == '__main__':
+    unittest.main()
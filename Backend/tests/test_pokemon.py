@@ -1,7 +1,11 @@
+import json
 import unittest
 import sqlite3
 from flask import Flask
+import pokemon as pokemon_module
 from pokemon import pokemon
+from Backend.pokeapi import PokeApiClient
+from Backend.cache import response_cache
 from unittest.mock import patch, MagicMock
 
 class TestPokemonAPI(unittest.TestCase):
@@ -23,6 +27,10 @@ class TestPokemonAPI(unittest.TestCase):
                               image TEXT NOT NULL)''')
             conn.commit()
 
+    def setUp(self):
+        # Fresh PokeAPI client without the on-disk cache so mocks are always hit
+        pokemon_module.pokeapi = PokeApiClient(pokemon_module.base_url)
+
     def tearDown(self):
         """Clean up after each test."""
         with sqlite3.connect('news.db') as conn:
@@ -30,7 +38,7 @@ class TestPokemonAPI(unittest.TestCase):
             cursor.execute("DELETE FROM pokemon")
             conn.commit()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_Pokemon_success(self, mock_get):
         """Test getting Pokemon details successfully."""
         mock_response = MagicMock()
@@ -49,7 +57,14 @@ class TestPokemonAPI(unittest.TestCase):
             'image': 'http://example.com/pikachu.png'
         })
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_get_Pokemon_blank_name(self, mock_get):
+        """A name of only spaces is rejected instead of requesting PokeAPI's list endpoint."""
+        response = self.client.get('/catchEm?name=%20%20')
+        self.assertEqual(response.status_code, 400)
+        mock_get.assert_not_called()
+
+    @patch('requests.Session.get')
     def test_get_Pokemon_not_found(self, mock_get):
         """Test getting Pokemon details when Pokemon is not found."""
         mock_response = MagicMock()
@@ -136,6 +151,31 @@ class TestPokemonAPI(unittest.TestCase):
         self.assertEqual(len(response.json), 1)
         self.assertEqual(response.json[0]['pokemonName'], 'pikachu')
 
+    @patch('pokemon.get_db_connection')
+    def test_get_all_Pokemon_is_cached_unless_streamed(self, mock_connect):
+        """The plain list keeps its ETag and cache entry; ?format=ndjson streams every row."""
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchall.return_value = [(1, 'ash', 'pikachu', 'http://example.com/pikachu.png')]
+        mock_cursor.fetchmany.side_effect = [[(1, 'pikachu')], []]
+        response_cache.clear()
+
+        first = self.client.get('/getPokemon?username=ash')
+        second = self.client.get('/getPokemon?username=ash')
+        self.assertEqual(second.json, first.json)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(mock_connect.call_count, 1)
+
+        response = self.client.get('/getPokemon?username=ash&fields=pokemonName&format=ndjson')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual([json.loads(line) for line in response.get_data().splitlines()], [{'pokemonName': 'pikachu'}])
+        mock_connect.return_value.cursor.assert_called_with(name="stream_rows")
+
+    def test_get_all_Pokemon_unknown_fields(self):
+        """Unknown projection fields are rejected before the database is queried."""
+        response = self.client.get('/getPokemon?fields=pokemonName,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json, {'error': 'Unknown fields: password'})
+
     def test_change_profile_photo_success(self):
         """Test changing the profile photo of a Pokemon successfully."""
         # First, save a Pokemon to update
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import MagicMock
+from flask import Flask, jsonify
+from psycopg2 import extensions
+from Backend import profiler as profiler_module
+from Backend.profiler import QueryProfiler, param_shape
+
+def make_cursor(rowcount=3, status=extensions.TRANSACTION_STATUS_INTRANS, plan=("Seq Scan on news",)):
+    cursor = MagicMock()
+    cursor.rowcount = rowcount
+    cursor.connection.get_transaction_status.return_value = status
+    explain_cursor = cursor.connection.cursor.return_value
+    explain_cursor.mogrify.side_effect = lambda query, vars: query.encode()
+    explain_cursor.fetchall.return_value = [(line,) for line in plan]
+    return cursor, explain_cursor
+
+class TestQueryProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = profiler_module.profiler
+        self.saved = (self.profiler.enabled, self.profiler.slow_threshold, self.profiler.server_timing)
+        self.profiler.reset()
+
+    def tearDown(self):
+        self.profiler.enabled, self.profiler.slow_threshold, self.profiler.server_timing = self.saved
+        self.profiler.reset()
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = QueryProfiler()
+        cursor, explain_cursor = make_cursor()
+        profiler.observe(cursor, "SELECT 1", None, 5.0)
+        self.assertEqual(profiler.stats()["statements"], 0)
+        explain_cursor.execute.assert_not_called()
+
+    def test_param_shape_hides_values(self):
+        self.assertEqual(param_shape(("secret", 3)), ["str", "int"])
+        self.assertEqual(param_shape({"name": "ash"}), {"name": "str"})
+        self.assertEqual(param_shape([("a", 1), ("b", 2)], many=True), {"rows": 2, "row": ["str", "int"]})
+        self.assertIsNone(param_shape(None))
+
+    def test_slow_query_is_logged_with_plan_inside_a_savepoint(self):
+        profiler = QueryProfiler(enabled=True, slow_threshold=0.1)
+        cursor, explain_cursor = make_cursor()
+        with self.assertLogs("Backend.profiler", "WARNING") as captured:
+            profiler.observe(cursor, "SELECT *\n  FROM news WHERE headline LIKE %s", ("%trump%",), 0.5)
+        self.assertIn("SELECT * FROM news WHERE headline LIKE %s", captured.output[0])
+        self.assertIn("Seq Scan on news", captured.output[0])
+        self.assertNotIn("%trump%", captured.output[0])
+        statements = [call.args[0] for call in explain_cursor.execute.call_args_list]
+        self.assertEqual(statements[0], "SAVEPOINT query_profiler")
+        self.assertTrue(statements[1].startswith(b"EXPLAIN SELECT"))
+        self.assertEqual(statements[2], "RELEASE SAVEPOINT query_profiler")
+
+    def test_failed_transactions_and_ddl_are_not_explained(self):
+        profiler = QueryProfiler(enabled=True, slow_threshold=0.1)
+        cursor, explain_cursor = make_cursor(status=extensions.TRANSACTION_STATUS_INERROR)
+        with self.assertLogs("Backend.profiler", "WARNING"):
+            profiler.observe(cursor, "SELECT 1", None, 0.5)
+        cursor, explain_cursor = make_cursor()
+        with self.assertLogs("Backend.profiler", "WARNING"):
+            profiler.observe(cursor, "CREATE INDEX ON news (headline)", None, 0.5)
+        explain_cursor.execute.assert_not_called()
+
+    def test_stats_aggregate_per_statement(self):
+        profiler = QueryProfiler(enabled=True, slow_threshold=10)
+        cursor, _ = make_cursor(rowcount=2)
+        for seconds in (0.01, 0.03):
+            profiler.observe(cursor, "SELECT * FROM news", None, seconds)
+        profiler.observe(cursor, "SELECT 1", None, 0.001)
+        top = profiler.stats()["top"]
+        self.assertEqual(top[0]["sql"], "SELECT * FROM news")
+        self.assertEqual(top[0]["calls"], 2)
+        self.assertEqual(top[0]["rows"], 4)
+        self.assertAlmostEqual(top[0]["max"], 0.03)
+        self.assertAlmostEqual(top[0]["avg"], 0.02)
+
+    def test_request_queries_and_server_timing(self):
+        app = Flask(__name__)
+        profiler_module.init_app(app, enabled=True, slow_threshold=10, server_timing=True, serve_stats=True)
+        cursor, _ = make_cursor(rowcount=1)
+
+        @app.route("/news")
+        def news():
+            self.profiler.observe(cursor, "SELECT COUNT(*) FROM news", None, 0.004)
+            self.profiler.observe(cursor, "SELECT * FROM news LIMIT %s", (10,), 0.006)
+            return jsonify(self.profiler.request_queries())
+
+        response = app.test_client().get("/news")
+        queries = response.get_json()
+        self.assertEqual([query["sql"] for query in queries],
+                         ["SELECT COUNT(*) FROM news", "SELECT * FROM news LIMIT %s"])
+        self.assertEqual(queries[1]["params"], ["int"])
+        self.assertIn('db;dur=10.0;desc="2 queries"', response.headers["Server-Timing"])
+
+        stats = app.test_client().get("/queryStats").get_json()
+        self.assertEqual(stats["statements"], 2)
+
+    def test_query_stats_are_not_served_by_default(self):
+        app = Flask(__name__)
+        profiler_module.init_app(app, enabled=True)
+        self.assertEqual(app.test_client().get("/queryStats").status_code, 404)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from Backend.recaptcha import CircuitBreaker, RecaptchaUnavailable, RecaptchaVerifier
+
+class StubSiteverifyHandler(BaseHTTPRequestHandler):
+    hits = 0
+    mode = "ok"
+    lock = threading.Lock()
+
+    def do_POST(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits += 1
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if cls.mode == "slow":
+            time.sleep(0.3)
+        if cls.mode == "error":
+            self.send_response(500)
+            self.end_headers()
+            return
+        success = form.get("secret") == ["secret"] and form.get("response") == ["good-token"]
+        body = json.dumps({"success": success} if success else
+                          {"success": False, "error-codes": ["invalid-input-response"]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestRecaptchaVerifier(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSiteverifyHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/recaptcha/api/siteverify"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubSiteverifyHandler.hits = 0
+        StubSiteverifyHandler.mode = "ok"
+        self.clock = FakeClock()
+        self.verifier = RecaptchaVerifier("secret", url=self.url, timeout=(1, 0.1),
+                                          breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=self.clock))
+
+    def test_verify(self):
+        self.assertTrue(self.verifier.verify("good-token")["success"])
+        self.assertFalse(self.verifier.verify("bad-token")["success"])
+
+    def test_rejections_are_cached_by_token(self):
+        self.verifier.verify("bad-token")
+        self.assertFalse(self.verifier.verify("bad-token")["success"])
+        self.assertEqual(StubSiteverifyHandler.hits, 1)
+        stats = self.verifier.stats()
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(stats["upstream_calls"], 1)
+        self.assertEqual(stats["latency_samples"], 1)
+        self.assertIn("latency_p95", stats)
+
+    def test_successes_are_not_cached(self):
+        """A solved token is single-use: every replay is checked with siteverify again."""
+        self.assertTrue(self.verifier.verify("good-token")["success"])
+        self.verifier.verify("good-token")
+        self.assertEqual(StubSiteverifyHandler.hits, 2)
+        self.assertEqual(self.verifier.stats()["cache_hits"], 0)
+
+    def test_timeout_raises_unavailable(self):
+        StubSiteverifyHandler.mode = "slow"
+        with self.assertRaises(RecaptchaUnavailable):
+            self.verifier.verify("good-token")
+        self.assertEqual(self.verifier.stats()["failures"], 1)
+
+    def test_failures_are_not_cached(self):
+        StubSiteverifyHandler.mode = "error"
+        with self.assertRaises(RecaptchaUnavailable):
+            self.verifier.verify("good-token")
+        StubSiteverifyHandler.mode = "ok"
+        self.assertTrue(self.verifier.verify("good-token")["success"])
+
+    def test_circuit_opens_and_fails_fast(self):
+        StubSiteverifyHandler.mode = "error"
+        for token in ("a", "b"):
+            with self.assertRaises(RecaptchaUnavailable):
+                self.verifier.verify(token)
+        self.assertEqual(self.verifier.stats()["circuit"], "open")
+
+        # Open circuit: no request reaches the upstream
+        with self.assertRaises(RecaptchaUnavailable):
+            self.verifier.verify("c")
+        self.assertEqual(StubSiteverifyHandler.hits, 2)
+        self.assertEqual(self.verifier.stats()["short_circuits"], 1)
+
+        # After the reset timeout one trial call goes through and closes it again
+        StubSiteverifyHandler.mode = "ok"
+        self.clock.now += 30
+        self.assertTrue(self.verifier.verify("good-token")["success"])
+        self.assertEqual(self.verifier.stats()["circuit"], "closed")
+
+    def test_failed_trial_reopens_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=self.clock)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.clock.now += 10
+        self.assertTrue(breaker.allow())
+        # Only one trial at a time while half-open
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import psycopg2
+from Backend.scheduler import AdvisoryLock, ScheduleStore, ScrapeScheduler
+from Backend.scraper import Source
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FakeLock:
+    def __init__(self, held=True):
+        self.held = held
+
+    def acquire(self):
+        return self.held
+
+    def release(self):
+        self.held = False
+
+class TestScrapeScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.calls = []
+        self.outcome = {}
+        self.sources = [Source(name="a", url="unused", interval=60), Source(name="b", url="unused")]
+
+    def run_scrape(self, names):
+        self.calls.append(names)
+        return {"sources": [{"source": name, "error": None, "unchanged": False, **self.outcome.get(name, {})}
+                            for name in names]}
+
+    def make_scheduler(self, **kwargs):
+        options = dict(default_interval=300, jitter=0, lock=FakeLock(), clock=self.clock)
+        options.update(kwargs)
+        return ScrapeScheduler(self.run_scrape, lambda: self.sources, **options)
+
+    def test_runs_each_source_on_its_own_interval(self):
+        scheduler = self.make_scheduler()
+        scheduler.tick()
+        self.assertEqual(self.calls, [["a", "b"]])
+        self.clock.now += 60
+        scheduler.tick()
+        self.assertEqual(self.calls[-1], ["a"])
+        self.clock.now += 240
+        scheduler.tick()
+        self.assertEqual(self.calls[-1], ["a", "b"])
+
+    def test_nothing_due_does_not_run(self):
+        scheduler = self.make_scheduler()
+        scheduler.tick()
+        self.clock.now += 10
+        self.assertIsNone(scheduler.tick())
+        self.assertEqual(len(self.calls), 1)
+
+    def test_unchanged_and_failing_sources_back_off(self):
+        self.outcome = {"a": {"unchanged": True}, "b": {"error": "HTTP 503"}}
+        scheduler = self.make_scheduler(max_backoff=4)
+        for _ in range(4):
+            scheduler.tick()
+            self.clock.now = min(schedule.next_run for schedule in scheduler.schedules.values())
+        a = scheduler.schedules["a"]
+        self.assertEqual(a.last_status, "unchanged")
+        self.assertEqual(a.next_run - a.last_run, 60 * 4)
+        self.assertEqual(scheduler.schedules["b"].last_status, "error")
+
+        # A run with new articles resets the cadence
+        self.outcome = {}
+        self.clock.now = a.next_run
+        scheduler.tick()
+        self.assertEqual(a.idle_runs, 0)
+        self.assertEqual(a.next_run - a.last_run, 60)
+
+    def test_failed_run_counts_as_error(self):
+        def broken(names):
+            raise RuntimeError("all sources failed")
+        scheduler = ScrapeScheduler(broken, lambda: self.sources, jitter=0, clock=self.clock)
+        scheduler.tick()
+        self.assertEqual(scheduler.schedules["a"].last_status, "error")
+        self.assertEqual(scheduler.schedules["a"].idle_runs, 1)
+
+    def test_jitter_spreads_next_run(self):
+        scheduler = self.make_scheduler(jitter=0.1)
+        delays = set()
+        scheduler.tick()
+        for _ in range(20):
+            # First runs are spread over up to 10% of the interval too
+            self.clock.now = max(schedule.next_run for schedule in scheduler.schedules.values())
+            scheduler.tick()
+            a = scheduler.schedules["a"]
+            delays.add(round(a.next_run - a.last_run, 6))
+            self.assertTrue(54 <= a.next_run - a.last_run <= 66)
+        self.assertGreater(len(delays), 1)
+
+    def test_only_the_leader_scrapes(self):
+        scheduler = self.make_scheduler(lock=FakeLock(held=False))
+        self.assertIsNone(scheduler.tick())
+        self.assertEqual(self.calls, [])
+        self.assertFalse(scheduler.status()["leader"])
+
+    def test_status_reports_last_and_next_run(self):
+        scheduler = self.make_scheduler()
+        self.clock.now = 1000.0
+        scheduler.tick()
+        status = scheduler.status()
+        self.assertTrue(status["leader"])
+        a = status["sources"][0]
+        self.assertEqual(a["name"], "a")
+        self.assertEqual(a["last_run"], 1000.0)
+        self.assertEqual(a["next_run"], 1060.0)
+        self.assertEqual(a["last_duration"], 0.0)
+
+    def test_new_leader_resumes_stored_schedule(self):
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        try:
+            self.make_scheduler(store=ScheduleStore(path)).tick()
+            follower = self.make_scheduler(store=ScheduleStore(path), lock=FakeLock(held=False))
+            follower.tick()
+            self.assertEqual([source["name"] for source in follower.status()["sources"]], ["a", "b"])
+
+            # The old leader died; the next one must not re-scrape everything at once
+            follower.lock.held = True
+            self.clock.now += 1
+            follower.tick()
+            self.assertEqual(len(self.calls), 1)
+        finally:
+            os.remove(path)
+
+class TestAdvisoryLock(unittest.TestCase):
+
+    def test_acquire_and_keep_leadership(self):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchone.return_value = (True,)
+        lock = AdvisoryLock("dsn", key=42, connect=lambda dsn: connection)
+        self.assertTrue(lock.acquire())
+        cursor.execute.assert_called_with("SELECT pg_try_advisory_lock(%s)", (42,))
+        self.assertTrue(lock.acquire())
+        cursor.execute.assert_called_with("SELECT 1")
+
+    def test_lost_connection_drops_leadership(self):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchone.return_value = (True,)
+        lock = AdvisoryLock("dsn", connect=lambda dsn: connection)
+        lock.acquire()
+        cursor.execute.side_effect = psycopg2.OperationalError("server closed the connection")
+        self.assertFalse(lock.acquire())
+        self.assertFalse(lock.held)
+
+    def test_lock_held_elsewhere(self):
+        connection = MagicMock()
+        connection.cursor.return_value.fetchone.return_value = (False,)
+        lock = AdvisoryLock("dsn", connect=lambda dsn: connection)
+        self.assertFalse(lock.acquire())
+
+if __name__ == '__main__':
+    unittest.main()
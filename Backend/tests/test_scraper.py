@@ -0,0 +1,244 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from Backend.parsers import PARSERS, get_parser, parse_stream
+from Backend.scraper import Article, FetchState, FetchStateStore, ScrapeEngine, Source, extract_articles, get_sources, iter_articles
+
+FIXTURE_PAGE = b"""
+<html>
+    <body>
+        <article>
+            <h2>First Headline</h2>
+            <p>First Summary</p>
+            <a href="https://example.com/first"></a>
+        </article>
+        <article>
+            <h2>Second Headline</h2>
+            <p>Second Summary</p>
+            <a href="https://example.com/second"></a>
+        </article>
+    </body>
+</html>
+"""
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    hits = {}
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits[self.path] = cls.hits.get(self.path, 0) + 1
+            hits = cls.hits[self.path]
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if self.path == "/flaky" and hits == 1:
+                self.send_response(503)
+                self.end_headers()
+                return
+            if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            if self.path == "/lastmod" and self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                self.send_response(304)
+                self.end_headers()
+                return
+            if self.path == "/missing":
+                self.send_response(404)
+                self.end_headers()
+                return
+            page = FIXTURE_PAGE
+            if self.path == "/noisy":
+                # Markup changes on every request, the articles do not
+                page += f"<!-- rendered {hits} -->".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(page)))
+            if self.path == "/etag":
+                self.send_header("ETag", '"v1"')
+            if self.path == "/lastmod":
+                self.send_header("Last-Modified", LAST_MODIFIED)
+            self.end_headers()
+            self.wfile.write(page)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+class TestScrapeEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FixtureHandler.hits = {}
+        FixtureHandler.max_active = 0
+
+    def test_extract_articles(self):
+        articles = extract_articles(FIXTURE_PAGE, Source(name="fixture", url="unused"))
+        self.assertEqual(articles[0], Article("First Headline", "First Summary", "https://example.com/first"))
+        self.assertEqual(len(articles), 2)
+
+    def test_missing_fields_stay_with_their_article(self):
+        page = b"""
+            <article><h2>No summary</h2><a href="/one"></a></article>
+            <article><p>No headline</p><a href="/ignored"></a></article>
+            <article><h2>No link</h2><p>Second summary</p></article>
+            <article><h2>Complete</h2><p>Third summary</p><a href="/three"></a></article>
+        """
+        expected = [
+            Article("No summary", "", "/one"),
+            Article("No link", "Second summary", ""),
+            Article("Complete", "Third summary", "/three"),
+        ]
+        for name in PARSERS:
+            with self.subTest(parser=name):
+                articles = iter_articles(page, Source(name="fixture", url="unused"), name)
+                self.assertNotIsInstance(articles, list)
+                self.assertEqual(list(articles), expected)
+
+    def test_every_parser_backend_extracts_the_same_articles(self):
+        source = Source(name="fixture", url="unused")
+        expected = extract_articles(FIXTURE_PAGE, source, "html.parser")
+        for name in PARSERS:
+            with self.subTest(parser=name):
+                self.assertEqual(extract_articles(FIXTURE_PAGE, source, name), expected)
+
+    def test_stream_parser_handles_chunk_boundaries(self):
+        page = "<article><h2>Caf\u00e9 news</h2><p>Summary</p><a href='/x'></a></article>".encode()
+        chunks = [page[i:i + 3] for i in range(0, len(page), 3)]
+        articles = list(parse_stream(chunks, Source(name="fixture", url="unused")))
+        self.assertEqual(articles, [("Caf\u00e9 news", "Summary", "/x")])
+
+    def test_unknown_parser(self):
+        with self.assertRaises(ValueError):
+            get_parser("nope")
+
+    def test_streaming_fetch(self):
+        engine = ScrapeEngine(backoff=0, parser="stream")
+        result = engine.run([Source(name="a", url=f"{self.base_url}/a")])[0]
+        self.assertTrue(result.ok)
+        self.assertEqual(len(result.articles), 2)
+
+    def scrape_twice(self, path, parser="auto"):
+        engine = ScrapeEngine(backoff=0, parser=parser, state=FetchStateStore())
+        source = Source(name="cond", url=f"{self.base_url}{path}")
+        first = engine.run([source])[0]
+        engine.remember([first])
+        return first, engine.run([source])[0]
+
+    def test_etag_revalidation_skips_download(self):
+        first, second = self.scrape_twice("/etag")
+        self.assertFalse(first.unchanged)
+        self.assertEqual(first.bytes, len(FIXTURE_PAGE))
+        self.assertEqual(second.status_code, 304)
+        self.assertTrue(second.unchanged)
+        self.assertEqual(second.articles, [])
+        self.assertEqual(second.bytes, 0)
+        self.assertEqual(second.saved_bytes, len(FIXTURE_PAGE))
+        self.assertNotIn("parse", second.timings)
+
+    def test_last_modified_revalidation(self):
+        _, second = self.scrape_twice("/lastmod")
+        self.assertEqual(second.status_code, 304)
+        self.assertTrue(second.unchanged)
+
+    def test_identical_body_skips_parsing(self):
+        _, second = self.scrape_twice("/same")
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.unchanged)
+        self.assertNotIn("parse", second.timings)
+
+    def test_identical_articles_are_unchanged(self):
+        for parser in ("auto", "stream"):
+            with self.subTest(parser=parser):
+                _, second = self.scrape_twice("/noisy", parser)
+                self.assertTrue(second.unchanged)
+                self.assertEqual(len(second.articles), 2)
+
+    def test_state_is_only_used_once_remembered(self):
+        engine = ScrapeEngine(backoff=0, state=FetchStateStore())
+        source = Source(name="cond", url=f"{self.base_url}/etag")
+        engine.run([source])
+        second = engine.run([source])[0]
+        self.assertEqual(second.status_code, 200)
+        self.assertFalse(second.unchanged)
+
+    def test_state_store_persists_in_sqlite(self):
+        handle, path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        try:
+            state = FetchState(etag='"v1"', body_hash="abc", articles_hash="def", size=10, parse_time=0.5)
+            FetchStateStore(path).put("http://example.com", state)
+            self.assertEqual(FetchStateStore(path).get("http://example.com"), state)
+            self.assertIsNone(FetchStateStore(path).get("http://example.com/other"))
+        finally:
+            os.remove(path)
+
+    def test_default_registry_contains_atlantic(self):
+        self.assertEqual([source.name for source in get_sources()][:1], ["atlantic"])
+        with self.assertRaises(KeyError):
+            get_sources(["nope"])
+
+    def test_run_returns_results_with_timings(self):
+        engine = ScrapeEngine(backoff=0)
+        results = engine.run([Source(name="a", url=f"{self.base_url}/a"), Source(name="b", url=f"{self.base_url}/b")])
+        self.assertEqual([result.source for result in results], ["a", "b"])
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertEqual(len(result.articles), 2)
+            self.assertIn("fetch", result.timings)
+            self.assertIn("parse", result.timings)
+            self.assertIn("total", result.timings)
+
+    def test_sources_are_fetched_concurrently_within_host_limit(self):
+        engine = ScrapeEngine(max_workers=8, per_host_limit=2, backoff=0)
+        sources = [Source(name=f"s{i}", url=f"{self.base_url}/slow{i}") for i in range(6)]
+        start = time.perf_counter()
+        results = engine.run(sources)
+        elapsed = time.perf_counter() - start
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLessEqual(FixtureHandler.max_active, 2)
+        # 6 requests of 0.2s with 2 in flight take ~0.6s, not 1.2s
+        self.assertLess(elapsed, 1.1)
+
+    def test_retries_transient_errors(self):
+        engine = ScrapeEngine(retries=2, backoff=0)
+        result = engine.run([Source(name="flaky", url=f"{self.base_url}/flaky")])[0]
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 2)
+
+    def test_client_errors_are_reported_not_retried(self):
+        engine = ScrapeEngine(retries=2, backoff=0)
+        result = engine.run([Source(name="missing", url=f"{self.base_url}/missing")])[0]
+        self.assertFalse(result.ok)
+        self.assertEqual(result.status_code, 404)
+        self.assertEqual(result.attempts, 1)
+
+    def test_timeout_is_reported(self):
+        engine = ScrapeEngine(retries=0, timeout=0.05, backoff=0)
+        result = engine.run([Source(name="slow", url=f"{self.base_url}/slow")])[0]
+        self.assertFalse(result.ok)
+
+if __name__ == '__main__':
+    unittest.main()
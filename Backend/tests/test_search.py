@@ -0,0 +1,123 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+from Backend.search import SearchIndex, escape_like, parse_search_cursor, tokenize
+
+ARTICLES = [
+    (1, "The Economy Is Slowing", "Economists warn about inflation and jobs.", "http://test.com/1"),
+    (2, "America's Schools", "Teachers talk about the economy of education.", "http://test.com/2"),
+    (3, "Climate Court Ruling", "A court ruled on climate policy.", "http://test.com/3"),
+    (4, "Economic Anxiety in America", "Voters and the economy.", "http://test.com/4"),
+]
+
+class TestSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SearchIndex()
+        for article in ARTICLES:
+            self.index.add(*article)
+
+    def ids(self, results):
+        return [result[1] for result in results]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("America's Economy!"), ["america", "s", "economy"])
+
+    def test_escape_like(self):
+        self.assertEqual(escape_like("100%_sure"), "100\\%\\_sure")
+
+    def test_and_query(self):
+        results = self.index.search("economy slowing", "")
+        self.assertEqual(self.ids(results), [1])
+
+    def test_or_query(self):
+        results = self.index.search("climate or schools", "")
+        self.assertEqual(sorted(self.ids(results)), [2, 3])
+
+    def test_prefix_query(self):
+        results = self.index.search("econ*", "")
+        self.assertEqual(sorted(self.ids(results)), [1, 4])
+
+    def test_headline_matches_rank_above_summary_matches(self):
+        results = self.index.search("economy", "economy")
+        self.assertEqual(self.ids(results)[0], 1)
+        self.assertEqual(sorted(self.ids(results)), [1, 2, 4])
+
+    def test_cursor_pagination(self):
+        first_page = self.index.search("economy", "economy", limit=2)
+        rank, doc_id = first_page[-1][0], first_page[-1][1]
+        cursor = parse_search_cursor(f"{rank!r}:{doc_id}")
+        second_page = self.index.search("economy", "economy", limit=2, after=cursor)
+        self.assertEqual(len(second_page), 1)
+        self.assertEqual(set(self.ids(first_page + second_page)), {1, 2, 4})
+        # limit=None is every match after the cursor, as streamed by /search?format=ndjson
+        self.assertEqual(self.index.search("economy", "economy", limit=None, after=cursor), second_page)
+        self.assertEqual(self.index.search("economy", "economy", limit=None), first_page + second_page)
+
+    def test_update_and_remove(self):
+        self.index.add(3, "Climate Summit", "Leaders meet.", "http://test.com/3")
+        self.assertEqual(self.index.search("court", ""), [])
+        self.assertEqual(self.ids(self.index.search("summit", "")), [3])
+        self.index.remove(3)
+        self.assertEqual(self.index.search("climate", ""), [])
+        self.assertEqual(len(self.index), 3)
+
+    def test_headline_matches(self):
+        self.assertEqual(self.index.headline_matches(["America", "DOGE"]), [2, 4])
+
+    def test_headline_matches_multi_word_and_punctuated_keywords(self):
+        self.index.add(5, "White House Statement", "", "http://test.com/5")
+        self.index.add(6, "Prices up 100% at the White Sands", "", "http://test.com/6")
+        self.assertEqual(self.index.headline_matches(["White House"]), [5])
+        self.assertEqual(self.index.headline_matches(["100%"]), [6])
+        # Words must start a headline word, unlike ILIKE '%conomy%'
+        self.assertEqual(self.index.headline_matches(["conomy"]), [])
+
+    def test_rebuild_does_not_block_queries(self):
+        """Rows are read from the database without holding the lock queries need."""
+        index = SearchIndex()
+        index.add(*ARTICLES[0])
+        results = []
+        cursor = MagicMock()
+
+        def fetchmany(size):
+            # Another thread querying mid-rebuild is answered from the old index
+            thread = threading.Thread(target=lambda: results.append(index.search("economy", "")))
+            thread.start()
+            thread.join(1)
+            cursor.fetchmany.side_effect = [[]]
+            return ARTICLES
+
+        cursor.fetchmany.side_effect = fetchmany
+        connection = MagicMock()
+        connection.cursor.return_value = cursor
+        index.load(connection)
+        self.assertEqual([self.ids(result) for result in results], [[1]])
+        self.assertEqual(len(index), 4)
+
+    def test_refresh_indexes_new_rows(self):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(5, "Economy rebounds", "Good news.", "http://test.com/5")]
+        connection = MagicMock()
+        connection.cursor.return_value = cursor
+
+        self.assertEqual(self.index.refresh(connection), 1)
+        self.assertEqual(cursor.execute.call_args[0][1], (4,))
+        self.assertIn(5, self.ids(self.index.search("rebounds", "")))
+
+    def test_ensure_current_loads_once(self):
+        index = SearchIndex(refresh_interval=60)
+        cursor = MagicMock()
+        cursor.fetchmany.side_effect = [ARTICLES, []]
+        connection = MagicMock()
+        connection.cursor.return_value = cursor
+        get_connection = MagicMock(return_value=connection)
+
+        index.ensure_current(get_connection)
+        index.ensure_current(get_connection)
+        self.assertEqual(get_connection.call_count, 1)
+        connection.close.assert_called_once()
+        self.assertEqual(len(index), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+from flask import Flask
+from Backend.cache import MemoryBackend, ResponseCache
+from Backend.streaming import ENCODERS, get_encoder, json_array, ndjson_lines, stream_json, stream_rows
+
+class TestStreaming(unittest.TestCase):
+
+    def test_json_array_is_valid_in_chunks(self):
+        items = [{"id": i, "name": f"item {i}"} for i in range(500)]
+        chunks = list(json_array(iter(items), chunk_size=256))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < 256 + 64 for chunk in chunks))
+        self.assertEqual(json.loads(b"".join(chunks)), items)
+
+    def test_json_array_empty(self):
+        self.assertEqual(b"".join(json_array(iter([]))), b"[]")
+
+    def test_ndjson_lines(self):
+        items = [{"id": i} for i in range(3)]
+        body = b"".join(ndjson_lines(iter(items), chunk_size=8))
+        self.assertEqual([json.loads(line) for line in body.splitlines()], items)
+
+    def test_encoders_agree(self):
+        item = {"id": 1, "headline": "Caf\u00e9 \"news\"", "rank": 0.5, "tags": None}
+        for name in ENCODERS:
+            self.assertEqual(json.loads(get_encoder(name)(item)), item)
+        self.assertIn(get_encoder("auto"), ENCODERS.values())
+        with self.assertRaises(ValueError):
+            get_encoder("yaml")
+
+    def test_stream_rows_fetches_in_batches_and_closes(self):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+        rows = stream_rows(connection, "SELECT id FROM pokemon", batch_size=2)
+        cursor.execute.assert_called_once_with("SELECT id FROM pokemon", None)
+        connection.close.assert_not_called()
+        self.assertEqual(list(rows), [(1,), (2,), (3,)])
+        cursor.fetchmany.assert_called_with(2)
+        connection.close.assert_called_once()
+
+    def test_stream_json_is_not_cached(self):
+        app = Flask(__name__)
+        cache = ResponseCache(MemoryBackend())
+        calls = []
+
+        @app.route("/items")
+        @cache.cached(tags=["items"])
+        def items():
+            calls.append(1)
+            return stream_json({"id": i} for i in range(3))
+
+        client = app.test_client()
+        for _ in range(2):
+            response = client.get("/items")
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(response.json, [{"id": 0}, {"id": 1}, {"id": 2}])
+        self.assertEqual(len(calls), 2)
+
+        response = client.get("/items?format=ndjson")
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in response.get_data().splitlines()],
+                         [{"id": 0}, {"id": 1}, {"id": 2}])
+
+if __name__ == '__main__':
+    unittest.main()